@@ -2,9 +2,13 @@
 Aplicación principal Flask (Application Factory Pattern)
 Crea y configura la app con blueprints, extensiones y endpoints base
 """
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, abort, jsonify, send_from_directory
 from config import ActiveConfig
-from extensions import db, migrate, jwt, cors
+from extensions import db, jwt, cors, init_migrate
+from utils.db_routing import init_read_replica
+from utils.request_id import init_request_id
+from utils.slow_queries import init_slow_query_log
+from utils.tracing import init_tracing
 import os
 
 def create_app(config_class=None):
@@ -25,9 +29,25 @@ def create_app(config_class=None):
 
     # Inicializar extensiones (base de datos, migraciones, JWT, CORS)
     db.init_app(app)
-    migrate.init_app(app, db)
+    if app.config.get("ENABLE_MIGRATIONS", True):
+        init_migrate(app)
     jwt.init_app(app)
+    from utils.token_revocation import init_token_revocation
+    init_token_revocation(jwt)  # Logout / revocación de sesiones (verificación en memoria)
+    from utils.passwords import init_passwords
+    init_passwords(app)  # PASSWORD_HASH_METHOD inválido: error al arrancar, no en cada login
     cors.init_app(app, resources={r"/api/*": {"origins": app.config.get("CORS_ORIGINS").split(",")}})
+    init_read_replica(app)  # No-op si DATABASE_URL_READ no está configurada
+    init_request_id(app)  # X-Request-ID para correlacionar logs
+    init_slow_query_log(app, db)  # Consultas > SLOW_QUERY_MS con endpoint y fingerprint
+    init_tracing(app, db)  # Spans por request muestreado (TRACING_ENABLED, TRACE_SAMPLE_RATE)
+    from utils.invalidation import init_invalidation_bus
+    init_invalidation_bus(app)  # Purgas de caché a los demás workers después de cada commit
+    from utils.notifications import init_notifications
+    init_notifications(app)  # Digest de contacto / reintento de emails fallidos (thread por worker)
+    if app.config.get("UPLOADS_GC_INTERVAL_HOURS"):
+        from utils.uploads_gc import init_uploads_gc
+        init_uploads_gc(app)  # GC periódico de archivos huérfanos en uploads/
 
     # Registrar blueprints (rutas organizadas por módulo)
     from routes.auth_routes import bp as auth_bp
@@ -38,7 +58,8 @@ def create_app(config_class=None):
     from routes.usuarios_routes import bp as usuarios_bp
     from routes.dashboard_routes import bp as dashboard_bp
     from routes.upload_routes import bp as upload_bp
-    from routes.test_routes import bp as test_bp
+    from routes.feeds_routes import bp as feeds_bp
+    from routes.batch_routes import bp as batch_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(pub_bp)
@@ -48,7 +69,13 @@ def create_app(config_class=None):
     app.register_blueprint(usuarios_bp)
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(upload_bp)
-    app.register_blueprint(test_bp)
+    app.register_blueprint(feeds_bp)
+    app.register_blueprint(batch_bp)
+
+    # Endpoints de prueba sin JWT: solo si el entorno lo habilita (nunca en producción)
+    if app.config.get("ENABLE_TEST_ROUTES"):
+        from routes.test_routes import bp as test_bp
+        app.register_blueprint(test_bp)
 
     @app.route("/api/")
     def index():
@@ -64,17 +91,32 @@ def create_app(config_class=None):
                 "publicaciones": "/api/publicaciones",
                 "categorias": "/api/categorias",
                 "galeria": "/api/galeria",
-                "mensajes": "/api/mensajes_contacto"
+                "mensajes": "/api/mensajes_contacto",
+                "sitemap": "/api/sitemap.xml",
+                "feed": "/api/feed.xml",
+                "batch": "/api/batch"
             }
         })
 
     @app.route("/api/health")
     def health():
-        """Health check endpoint - usado por Docker para verificar que el servicio está activo"""
+        """Liveness: el proceso responde (constante, no consulta dependencias)"""
         return jsonify({
             "status": "healthy",
             "environment": app.config.get("FLASK_ENV", "unknown")
         })
+
+    @app.route("/api/health/ready")
+    def readiness():
+        """
+        Readiness: BD (latencia y pool), disco de uploads y trabajos pendientes
+        Devuelve el último resultado del chequeo en segundo plano (utils/health.py);
+        503 si alguna dependencia requerida falla (Render/Docker no envían tráfico)
+        """
+        from utils.health import health_monitor
+
+        snapshot = health_monitor.snapshot(app)
+        return jsonify(snapshot), 200 if snapshot["ready"] else 503
     
     @app.route("/uploads/<path:subpath>")
     def serve_uploads(subpath):
@@ -83,7 +125,11 @@ def create_app(config_class=None):
         URL: /uploads/galeria/imagen_123456.jpg
         
         NOTA: En producción usar Nginx/Apache para servir archivos estáticos
+        (con la misma regla: nada que empiece con punto)
         """
+        # Entradas ocultas (.quarantine del GC, .gc.lock...) nunca son públicas
+        if any(part.startswith(".") for part in subpath.replace("\\", "/").split("/")):
+            abort(404)
         uploads_dir = os.path.join(app.root_path, 'uploads')
         return send_from_directory(uploads_dir, subpath)
 
@@ -3,18 +3,29 @@ Extensiones de Flask inicializadas globalmente
 Se inicializan aquí para evitar importaciones circulares, luego se vinculan a la app en app.py
 """
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from utils.db_routing import RoutingSession
 
 # SQLAlchemy: ORM para manejar modelos y base de datos PostgreSQL
-db = SQLAlchemy()
+# RoutingSession envía los GET públicos a la réplica de lectura (si está configurada)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 # Flask-Migrate: maneja migraciones de esquema de BD (como Alembic)
-migrate = Migrate()
+# Se crea bajo demanda en init_migrate(): importar alembic suma ~130ms al arranque
+# y el servidor web (Gunicorn) no lo necesita, solo los comandos `flask db ...`
+migrate = None
 
 # JWTManager: autenticación basada en tokens JWT
 jwt = JWTManager()
 
 # CORS: permite peticiones desde orígenes diferentes (frontend → API)
 cors = CORS()
+
+
+def init_migrate(app):
+    """Inicializa Flask-Migrate (import diferido de flask_migrate/alembic)"""
+    global migrate
+    from flask_migrate import Migrate
+    migrate = Migrate(app, db)
+    return migrate
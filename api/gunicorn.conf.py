@@ -0,0 +1,62 @@
+"""
+Configuración de Gunicorn (producción)
+Uso: gunicorn -c gunicorn.conf.py "app:create_app()"
+
+preload_app: la app se crea UNA vez en el proceso master y los workers se
+forkean después, compartiendo la memoria (copy-on-write) en lugar de que
+cada worker importe Flask/SQLAlchemy/blueprints por su cuenta.
+
+worker_class gthread: cada request ocupa un thread, no un proceso. Las
+conexiones SSE del dashboard (/api/dashboard/events) pasan la mayor parte del
+tiempo esperando en una cola, pero cada una retiene su thread: se limitan a
+threads - SSE_RESERVED_THREADS por worker. Con GUNICORN_WORKER_CLASS=gevent
+(pip install gevent) escalan a miles de conexiones por worker.
+"""
+import gc
+import os
+
+# El servidor web no necesita Flask-Migrate/alembic (solo `flask db ...`)
+os.environ.setdefault("ENABLE_MIGRATIONS", "0")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = 120
+preload_app = True
+
+# Tope de conexiones SSE por worker: cada una ocupa un thread hasta SSE_MAX_DURATION,
+# así que se dejan SSE_RESERVED_THREADS libres para health checks y tráfico público.
+# Con workers async (gevent/eventlet) no hay tope por threads (solo SSE_MAX_CLIENTS)
+if worker_class in ("gthread", "sync"):
+    _pool = threads if worker_class == "gthread" else 1
+    os.environ.setdefault(
+        "SSE_THREAD_BUDGET", str(max(_pool - int(os.environ.get("SSE_RESERVED_THREADS", 4)), 0))
+    )
+
+accesslog = "-"
+# Como el default pero con la ruta sin query string (%(U)s): ningún token o ticket llega a los logs
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+errorlog = "-"
+loglevel = "info"
+
+
+def pre_fork(server, worker):
+    """
+    Congela los objetos creados en el master (gc.freeze): el GC de los workers
+    no los recorre ni modifica sus headers, así las páginas siguen compartidas
+    """
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """
+    Cada worker abre sus propias conexiones: los sockets del pool creado en
+    el master no pueden compartirse entre procesos
+    """
+    from extensions import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -1,17 +1,25 @@
 """
 CLI de gestión de la aplicación (comandos administrativos)
-Usa Click para crear comandos: create_db, drop_db, create_admin
+Usa Click para crear comandos: create_db, drop_db, create_admin, render_content,
+reindex_messages, backfill_notified, send_contact_digest, gc_uploads, bench_login, generate_data,
+profile_startup
 Ejecutar: python manage.py <comando> [opciones]
 """
 import click
-from app import create_app
-from extensions import db
-from models.user import User
-from werkzeug.security import generate_password_hash
 
 
-# Crear instancia de la app para usar en comandos
-app = create_app()
+# La app se crea bajo demanda: `python manage.py --help` no debe importar
+# blueprints, modelos ni abrir engines de base de datos
+_app = None
+
+
+def get_app():
+    """Devuelve la instancia de la app (la crea en la primera llamada)"""
+    global _app
+    if _app is None:
+        from app import create_app
+        _app = create_app()
+    return _app
 
 
 @click.group()
@@ -26,7 +34,9 @@ def create_db():
     Crea todas las tablas definidas en los modelos (db.create_all())
     Uso: python manage.py create_db
     """
-    with app.app_context():
+    from extensions import db
+
+    with get_app().app_context():
         db.create_all()
         print("Tablas creadas.")
 
@@ -38,7 +48,9 @@ def drop_db():
     ⚠️ CUIDADO: Borra todos los datos
     Uso: python manage.py drop_db
     """
-    with app.app_context():
+    from extensions import db
+
+    with get_app().app_context():
         db.drop_all()
         print("Tablas eliminadas.")
 
@@ -51,16 +63,20 @@ def create_admin(email, password):
     Crea un usuario administrador en la BD
     Uso: python manage.py create_admin --email admin@example.com --password secret
     """
-    with app.app_context():
+    from extensions import db
+    from models.user import User
+    from utils.passwords import hash_password
+
+    with get_app().app_context():
         # Verificar si ya existe un admin con ese email
         if User.query.filter_by(email=email).first():
             print("El admin ya existe.")
             return
-        
+
         # Crear nuevo usuario admin con password hasheada
         u = User(
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=hash_password(password),
             name="Admin",
             role="admin"
         )
@@ -69,5 +85,315 @@ def create_admin(email, password):
         print(f"Admin creado: {u.id}")
 
 
+@cli.command("render_content")
+@click.option("--batch-size", default=200, help="Publicaciones por transacción")
+def render_content(batch_size):
+    """
+    Procesa el contenido de publicaciones existentes (HTML sanitizado, texto, excerpt, lectura)
+    Solo filas sin content_html (guardadas antes del render al escribir)
+    Uso: python manage.py render_content
+    """
+    from extensions import db
+    from models.publication import Publication
+    from utils.content import process_content
+
+    with get_app().app_context():
+        total = 0
+        while True:
+            pubs = Publication.query.filter(Publication.content_html.is_(None))\
+                .order_by(Publication.id).limit(batch_size).all()
+            if not pubs:
+                break
+            for pub in pubs:
+                processed = process_content(pub.content)
+                pub.content_html = processed["content_html"]
+                pub.content_text = processed["content_text"]
+                pub.reading_time = processed["reading_time"]
+                if not pub.excerpt:
+                    pub.excerpt = processed["excerpt"]
+            db.session.commit()
+            total += len(pubs)
+        print(f"Publicaciones procesadas: {total}")
+
+
+@cli.command("reindex_messages")
+@click.option("--batch-size", default=500, help="Mensajes por transacción")
+def reindex_messages(batch_size):
+    """
+    Completa search_text de mensajes de contacto guardados antes de la búsqueda
+    (los triggers de SQLite y el índice GIN de PostgreSQL se actualizan solos)
+    Uso: python manage.py reindex_messages
+    """
+    from extensions import db
+    from models.contact_message import ContactMessage
+    from utils.inbox_search import build_search_text
+
+    with get_app().app_context():
+        total = 0
+        while True:
+            messages = ContactMessage.query.filter(ContactMessage.search_text.is_(None))\
+                .order_by(ContactMessage.id).limit(batch_size).all()
+            if not messages:
+                break
+            for m in messages:
+                m.search_text = build_search_text(m.name, m.email, m.subject, m.message)
+            db.session.commit()
+            total += len(messages)
+        print(f"Mensajes reindexados: {total}")
+
+
+@cli.command("backfill_notified")
+def backfill_notified():
+    """
+    Marca como ya notificados los mensajes guardados antes del digest (notified_at = created_at)
+    Correr una vez al desplegar: sin esto quedan como pendientes de notificar
+    Uso: python manage.py backfill_notified
+    """
+    from utils.notifications import backfill_notified as mark_notified
+
+    with get_app().app_context():
+        print(f"Mensajes marcados como notificados: {mark_notified()}")
+
+
+@cli.command("send_contact_digest")
+@click.option("--force", is_flag=True, help="Enviar los pendientes aunque no corresponda según el modo")
+def send_contact_digest(force):
+    """
+    Envía en un solo email los mensajes de contacto pendientes de notificar
+    Pensado para un cron (ej: Render Cron Job cada 15 minutos o diario)
+    Uso: python manage.py send_contact_digest [--force]
+    """
+    from utils.notifications import digest_due, send_pending_digest
+
+    with get_app().app_context():
+        if not force and not digest_due():
+            print("Nada para enviar todavía.")
+            return
+        print(f"Mensajes enviados en el digest: {send_pending_digest()}")
+
+
+@cli.command("gc_uploads")
+@click.option("--mode", type=click.Choice(["dry-run", "quarantine", "delete"]), default="dry-run",
+              help="dry-run: solo reporte; quarantine: mover a uploads/.quarantine; delete: borrar")
+@click.option("--grace-hours", default=None, type=int, help="No tocar archivos más nuevos (default: UPLOADS_GC_GRACE_HOURS)")
+@click.option("--batch-size", default=1000, help="Filas por consulta de referencias")
+@click.option("--purge-quarantine", is_flag=True, help="Borrar también cuarentenas más viejas que UPLOADS_GC_QUARANTINE_DAYS")
+def gc_uploads(mode, grace_hours, batch_size, purge_quarantine):
+    """
+    Busca archivos de uploads/ que ninguna fila referencia (galeria.url, publicaciones.image_url)
+    Por defecto solo reporta (dry-run) cuántos hay y cuántos bytes se recuperarían
+    Uso: python manage.py gc_uploads [--mode quarantine|delete] [--grace-hours 48]
+    """
+    import os
+    from utils.uploads_gc import collect_orphans, purge_quarantine as purge
+
+    app = get_app()
+    root = os.path.join(app.root_path, "uploads")
+    if grace_hours is None:
+        grace_hours = app.config.get("UPLOADS_GC_GRACE_HOURS", 24)
+
+    with app.app_context():
+        report = collect_orphans(root, mode=mode, grace_hours=grace_hours, batch_size=batch_size)
+
+    print(f"Archivos revisados: {report['scanned']}")
+    print(f"Huérfanos (más viejos que {grace_hours} h): {report['orphans']} "
+          f"({report['orphan_bytes'] / (1024 * 1024):.1f} MB)")
+    print(f"Huérfanos recientes (período de gracia): {report['skipped_recent']}")
+    for path in report["sample"]:
+        print(f"  {path}")
+    if report["orphans"] > len(report["sample"]):
+        print(f"  ... y {report['orphans'] - len(report['sample'])} más")
+    if mode == "dry-run":
+        print("Dry-run: no se modificó nada. Usa --mode quarantine o --mode delete.")
+    else:
+        action = "Movidos a cuarentena" if mode == "quarantine" else "Eliminados"
+        print(f"{action}: {report['removed']} (errores: {report['errors']})")
+    if purge_quarantine:
+        print(f"Cuarentenas eliminadas: {purge(root, app.config.get('UPLOADS_GC_QUARANTINE_DAYS', 30))}")
+
+
+@cli.command("bench_login")
+@click.option("--requests", "count", default=20, help="Requests por escenario")
+@click.option("--method", "methods", multiple=True,
+              help="Método de hash a comparar (repetible; default: PASSWORD_HASH_METHOD)")
+def bench_login(count, methods):
+    """
+    Throughput de autenticación por worker (1 thread, como un worker sync de gunicorn):
+    login (verificación del hash) vs refresh (sin contraseña), por método de hash
+    Usa una base SQLite temporal: no toca la base configurada
+    Uso: python manage.py bench_login --method scrypt --method pbkdf2:sha256:600000
+    """
+    import os
+    import tempfile
+    import time
+    from app import create_app
+    from config import ActiveConfig
+
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        for method in methods or (ActiveConfig.PASSWORD_HASH_METHOD,):
+            class BenchConfig(ActiveConfig):
+                SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+                SQLALCHEMY_BINDS = {}
+                SQLALCHEMY_ENGINE_OPTIONS = {}
+                PASSWORD_HASH_METHOD = method
+                JWT_SECRET_KEY = ActiveConfig.JWT_SECRET_KEY or "bench-secret-key-bench-secret-key"
+                SLOW_QUERY_MS = 0
+                INVALIDATION_BUS_ENABLED = False
+
+            app = create_app(BenchConfig)
+            from extensions import db
+            from models.user import User
+            from utils.passwords import hash_password
+
+            with app.app_context():
+                db.drop_all()
+                db.create_all()
+                db.session.add(User(email="bench@example.com", password_hash=hash_password("bench-password"),
+                                    name="Bench", role="admin"))
+                db.session.commit()
+
+            client = app.test_client()
+            credentials = {"email": "bench@example.com", "password": "bench-password"}
+
+            started = time.perf_counter()
+            for _ in range(count):
+                response = client.post("/api/administracion/login", json=credentials)
+                assert response.status_code == 200, response.get_json()
+            login_s = time.perf_counter() - started
+            refresh_token = response.get_json()["refresh_token"]
+
+            started = time.perf_counter()
+            for _ in range(count):
+                response = client.post("/api/administracion/refresh",
+                                       headers={"Authorization": f"Bearer {refresh_token}"})
+                assert response.status_code == 200, response.get_json()
+                refresh_token = response.get_json()["refresh_token"]
+            refresh_s = time.perf_counter() - started
+
+            print(f"{method}:")
+            print(f"  login   {count / login_s:8.1f} req/s  ({login_s / count * 1000:7.1f} ms/req)")
+            print(f"  refresh {count / refresh_s:8.1f} req/s  ({refresh_s / count * 1000:7.1f} ms/req)")
+    finally:
+        os.remove(db_path)
+
+
+@cli.command("generate_data")
+@click.option("--categories", default=20, help="Categorías a generar")
+@click.option("--users", default=50, help="Usuarios (editores/admins) a generar")
+@click.option("--publications", default=10000, help="Publicaciones a generar")
+@click.option("--gallery", default=5000, help="Items de galería a generar")
+@click.option("--messages", default=20000, help="Mensajes de contacto a generar")
+@click.option("--seed", default=42, help="Semilla: la misma semilla genera los mismos datos")
+@click.option("--batch-size", default=5000, help="Filas por INSERT/transacción")
+@click.option("--until", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Fecha más reciente generada (default: 2026-01-01, fija para reproducir)")
+@click.option("--purge", is_flag=True, help="Borrar antes los datos sintéticos generados previamente")
+@click.option("--i-know", "i_know", is_flag=True,
+              help="Permitir correr en producción o contra una BD que no es local")
+def generate_data(categories, users, publications, gallery, messages, seed, batch_size, until, purge, i_know):
+    """
+    Genera datos sintéticos para pruebas de escala (PostgreSQL o SQLite)
+    Texto en español, fechas realistas e INSERT masivos por lotes; deterministas por semilla
+    Uso: python manage.py generate_data --publications 1000000 --messages 1000000 --purge
+    """
+    import time
+    from utils.invalidation import bus
+    from utils.synthetic_data import SyntheticDataExists, generate, is_local_database, purge_synthetic
+
+    def progress(table, total, elapsed):
+        print(f"\r  {table}: {total} filas ({total / max(elapsed, 1e-9):.0f} filas/s)", end="", flush=True)
+
+    app = get_app()
+    production = app.config.get("FLASK_ENV") == "production"
+    if not i_know and (production or not is_local_database(app.config["SQLALCHEMY_DATABASE_URI"])):
+        raise click.ClickException(
+            "generate_data escribe (y con --purge borra) miles de filas: en producción o contra una BD "
+            "que no es local hay que confirmarlo con --i-know")
+    with app.app_context():
+        if purge:
+            removed = purge_synthetic()
+            print("Datos sintéticos borrados: " + ", ".join(f"{k}={v}" for k, v in removed.items()))
+        started = time.perf_counter()
+        try:
+            result = generate(
+                {"categories": categories, "users": users, "publications": publications,
+                 "gallery": gallery, "messages": messages},
+                seed=seed, batch_size=batch_size, progress=progress, until=until
+            )
+        except SyntheticDataExists as e:
+            raise click.ClickException(str(e))
+        elapsed = time.perf_counter() - started
+        print()
+        # Los INSERT masivos no pasan por los eventos del ORM: invalidar las cachés de los workers
+        if app.config.get("INVALIDATION_BUS_ENABLED", True):
+            bus.publish(["categories", "publications", "gallery", "users"])
+
+    total = sum(result.values())
+    print("Filas insertadas: " + ", ".join(f"{k}={v}" for k, v in result.items()))
+    print(f"Total: {total} filas en {elapsed:.1f} s ({total / max(elapsed, 1e-9):.0f} filas/s, semilla {seed})")
+
+
+# Script que se ejecuta en un proceso limpio para medir el arranque real
+_STARTUP_PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+from app import create_app
+create_app()
+print(json.dumps({
+    "ms": (time.perf_counter() - t0) * 1000,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+}))
+"""
+
+
+@cli.command("profile_startup")
+@click.option("--top", default=15, help="Cantidad de módulos a mostrar")
+@click.option("--runs", default=3, help="Repeticiones para promediar el tiempo de arranque")
+def profile_startup(top, runs):
+    """
+    Mide el arranque en frío de la API (import + create_app) en procesos limpios
+    Reporta tiempo, RSS máximo, módulos cargados y los imports más costosos (-X importtime)
+    Uso: python manage.py profile_startup --top 20
+    """
+    import json
+    import os
+    import subprocess
+    import sys
+
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    importtime = ""
+    for i in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _STARTUP_PROBE],
+            cwd=cwd, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise click.ClickException(proc.stderr.strip().splitlines()[-1])
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        importtime = proc.stderr
+
+    # Formato de -X importtime: "import time: self [us] | cumulative | nombre"
+    modules = []
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+    ms = sorted(s["ms"] for s in samples)
+    print(f"Arranque (import + create_app): mediana {ms[len(ms) // 2]:.0f} ms "
+          f"(min {ms[0]:.0f} / max {ms[-1]:.0f}, {runs} corridas)")
+    print(f"RSS máximo por proceso: {max(s['rss_mb'] for s in samples):.1f} MB")
+    print(f"Módulos cargados: {samples[-1]['modules']}")
+    print(f"\nTop {top} imports por tiempo acumulado:")
+    print(f"{'acumulado':>12} {'propio':>10}  módulo")
+    for cumulative_us, self_us, name in sorted(modules, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name}")
+
+
 if __name__ == "__main__":
     cli()
@@ -3,6 +3,7 @@ Modelo Category (Categorías para publicaciones)
 Tabla: categorias
 Permite clasificar publicaciones (ej: Noticias, Eventos, Anuncios)
 """
+from datetime import datetime
 from extensions import db
 
 
@@ -14,3 +15,4 @@ class Category(db.Model):
     slug = db.Column(db.String(120), unique=True, nullable=False, index=True)  # URL-friendly ID (ej: noticias)
     name = db.Column(db.String(150), nullable=False)  # Nombre mostrado (ej: Noticias)
     description = db.Column(db.String(500))  # Descripción opcional
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Versión para ETag/Last-Modified
@@ -2,9 +2,15 @@
 Modelo ContactMessage (Mensajes del formulario de contacto)
 Tabla: mensajes_contacto
 Almacena consultas/mensajes enviados desde el sitio web
+
+Búsqueda (utils/inbox_search.py): search_text guarda nombre, email, asunto y
+mensaje en minúsculas y sin tildes; se indexa con GIN (tsvector) en PostgreSQL
+y con una tabla FTS5 sincronizada por triggers en SQLite
 """
 from datetime import datetime
+from sqlalchemy import DDL, event
 from extensions import db
+from utils.inbox_search import build_search_text, search_vector
 
 
 class ContactMessage(db.Model):
@@ -17,8 +23,29 @@ class ContactMessage(db.Model):
     phone = db.Column(db.String(60))  # Teléfono opcional
     subject = db.Column(db.String(250))  # Asunto del mensaje
     message = db.Column(db.Text, nullable=False)  # Contenido del mensaje
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Fecha de envío
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Fecha de envío
     leido = db.Column(db.Boolean, default=False)  # Si el mensaje fue leído
+    
+    # Detección de duplicados/spam (utils/dedup.py)
+    fingerprint = db.Column(db.String(64), index=True)  # sha256 de email + texto normalizados
+    minhash = db.Column(db.Text)  # Firma MinHash (near-duplicates)
+    duplicate_count = db.Column(db.Integer, default=0, nullable=False, server_default="0")  # Reenvíos colapsados
+    last_seen_at = db.Column(db.DateTime, index=True)  # Último reenvío recibido
+    # Casi igual a mensajes de OTROS remitentes (posible spam): id del primero del grupo
+    spam_cluster_id = db.Column(db.Integer, index=True)
+    
+    notified_at = db.Column(db.DateTime, index=True)  # Email al admin enviado (NULL = pendiente de digest)
+    
+    search_text = db.Column(db.Text)  # Texto normalizado para búsqueda (se completa al guardar)
+
+    __table_args__ = (
+        # Índice GIN sobre la expresión: la consulta debe usar la misma to_tsvector(...)
+        db.Index(
+            "ix_mensajes_contacto_search",
+            search_vector(search_text),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
 
     def to_dict(self):
         """Serializar mensaje a diccionario para JSON"""
@@ -30,5 +57,36 @@ class ContactMessage(db.Model):
             "subject": self.subject,
             "message": self.message,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-            "leido": self.leido
+            "leido": self.leido,
+            "duplicate_count": self.duplicate_count,
+            "spam_cluster_id": self.spam_cluster_id,
+            "last_seen_at": self.last_seen_at.isoformat() if self.last_seen_at else None
         }
+
+
+@event.listens_for(ContactMessage, "before_insert")
+@event.listens_for(ContactMessage, "before_update")
+def _update_search_text(mapper, connection, target):
+    """Mantiene search_text sincronizado con los campos buscables"""
+    target.search_text = build_search_text(target.name, target.email, target.subject, target.message)
+
+
+# SQLite: índice FTS5 (external content) mantenido por triggers
+for _statement in (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS mensajes_contacto_fts USING fts5("
+    "search_text, content='mensajes_contacto', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS mensajes_contacto_fts_ai AFTER INSERT ON mensajes_contacto BEGIN "
+    "INSERT INTO mensajes_contacto_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS mensajes_contacto_fts_ad AFTER DELETE ON mensajes_contacto BEGIN "
+    "INSERT INTO mensajes_contacto_fts(mensajes_contacto_fts, rowid, search_text) "
+    "VALUES ('delete', old.id, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS mensajes_contacto_fts_au AFTER UPDATE OF search_text ON mensajes_contacto BEGIN "
+    "INSERT INTO mensajes_contacto_fts(mensajes_contacto_fts, rowid, search_text) "
+    "VALUES ('delete', old.id, old.search_text); "
+    "INSERT INTO mensajes_contacto_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+):
+    event.listen(ContactMessage.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    ContactMessage.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS mensajes_contacto_fts").execute_if(dialect="sqlite")
+)
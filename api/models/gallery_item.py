@@ -15,5 +15,6 @@ class GalleryItem(db.Model):
     title = db.Column(db.String(200))  # Título del item
     url = db.Column(db.String(500))  # URL de la imagen/video
     caption = db.Column(db.String(500))  # Descripción/pie de foto
-    category = db.Column(db.String(120))  # Categoría de galería (ej: eventos, instalaciones)
+    category = db.Column(db.String(120), index=True)  # Categoría de galería (ej: eventos, instalaciones) - índice para filtros/facets
     created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Fecha de subida
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Versión para ETag/Last-Modified
@@ -16,7 +16,10 @@ class Publication(db.Model):
     title = db.Column(db.String(300), nullable=False)  # Título de la publicación
     slug = db.Column(db.String(300), unique=True, nullable=False, index=True)  # URL-friendly (ej: mi-noticia-2025)
     excerpt = db.Column(db.String(500))  # Resumen corto
-    content = db.Column(db.Text)  # Contenido completo (HTML/Markdown)
+    content = db.Column(db.Text)  # Contenido completo (HTML/Markdown) tal como lo envió el editor
+    content_html = db.Column(db.Text)  # HTML renderizado y sanitizado al guardar (utils/content.py)
+    content_text = db.Column(db.Text)  # Texto plano (para búsqueda)
+    reading_time = db.Column(db.Integer)  # Minutos de lectura estimados
     status = db.Column(db.String(50), default="Publicado")  # Estado: Borrador, Publicado, Archivado
     published_at = db.Column(db.DateTime)  # Fecha de publicación
     
@@ -29,7 +32,7 @@ class Publication(db.Model):
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Índice: max(updated_at) en O(1) para ETag
 
     # Relaciones ORM
     author = db.relationship("User", backref="publicaciones")  # publication.author → User
@@ -43,6 +46,8 @@ class Publication(db.Model):
             "slug": self.slug,
             "excerpt": self.excerpt,
             "content": self.content,
+            "content_html": self.content_html,
+            "reading_time": self.reading_time,
             "status": self.status,
             "image_url": self.image_url,
             "published_at": self.published_at.isoformat() if self.published_at else None,
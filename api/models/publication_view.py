@@ -0,0 +1,20 @@
+"""
+Modelo PublicationView (Vistas de publicaciones por día)
+Tabla: publicaciones_vistas
+Contadores agregados: los incrementos se acumulan en memoria por worker
+y se escriben en lotes (ver utils/view_counter.py)
+"""
+from extensions import db
+
+
+class PublicationView(db.Model):
+    """Cantidad de vistas de una publicación en un día (UTC)"""
+    __tablename__ = "publicaciones_vistas"
+    
+    publication_id = db.Column(
+        db.Integer,
+        db.ForeignKey("publicaciones.id", ondelete="CASCADE"),  # Borrar la publicación borra sus contadores
+        primary_key=True
+    )
+    day = db.Column(db.Date, primary_key=True, index=True)  # Día de las vistas (índice: ventana de trending)
+    views = db.Column(db.Integer, nullable=False, default=0)  # Vistas acumuladas en el día
@@ -0,0 +1,29 @@
+"""
+Modelo RefreshSession (Familias de refresh tokens)
+Tabla: sesiones_refresh
+Cada login crea una familia; cada uso del refresh token lo rota (current_jti cambia).
+Presentar un refresh token ya rotado = reutilización (robo probable): se revoca
+la familia completa. Ver routes/auth_routes.py
+"""
+from datetime import datetime
+from extensions import db
+
+
+class RefreshSession(db.Model):
+    """Sesión de refresh (familia de tokens rotados desde un mismo login)"""
+    __tablename__ = "sesiones_refresh"
+
+    id = db.Column(db.String(36), primary_key=True)  # Identificador de la familia (claim "fam")
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("usuarios.id", ondelete="CASCADE"),  # Borrar el usuario borra sus sesiones
+        nullable=False,
+        index=True
+    )
+    current_jti = db.Column(db.String(64), nullable=False)  # Único refresh token válido de la familia
+    previous_jti = db.Column(db.String(64))  # El anterior (tolerado unos segundos: pestañas en paralelo)
+    rotated_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime)  # Logout o reutilización detectada
+    user_agent = db.Column(db.String(255))
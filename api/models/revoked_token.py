@@ -0,0 +1,22 @@
+"""
+Modelo RevokedToken (Tokens JWT revocados)
+Tabla: tokens_revocados
+- Fila con jti: ese token puntual fue revocado (logout)
+- Fila sin jti: todos los tokens del usuario emitidos antes de revoked_at
+  (revocar sesiones, usuario eliminado o con rol cambiado)
+Las filas vencidas (expires_at pasado) ya no hacen falta: el token expiró solo.
+La verificación por request es en memoria (ver utils/token_revocation.py)
+"""
+from datetime import datetime
+from extensions import db
+
+
+class RevokedToken(db.Model):
+    """Revocación de un token (jti) o de todos los tokens de un usuario"""
+    __tablename__ = "tokens_revocados"
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(64), unique=True, index=True)  # Identificador del token (NULL = todos los del usuario)
+    user_id = db.Column(db.Integer, index=True)  # Sin FK: la revocación sobrevive al borrado del usuario
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)  # Ventana de relectura
+    expires_at = db.Column(db.DateTime, index=True)  # Cuándo deja de importar (NULL = tokens sin vencimiento)
@@ -1,20 +1,45 @@
 """
 Rutas de Autenticación (Login y obtener usuario actual)
-Endpoints: POST /api/administracion/login, GET /api/administracion/auth-user
+Endpoints: POST /api/administracion/login, GET /api/administracion/auth-user,
+POST /api/administracion/refresh, POST /api/administracion/logout,
+POST /api/administracion/logout-all
 Genera tokens JWT para acceso protegido
+
+Sesiones: access token corto (JWT_ACCESS_TOKEN_EXPIRES) + refresh token que
+rota en cada uso. /refresh no verifica la contraseña (el hash es la parte
+más costosa del login); presentar un refresh token ya rotado revoca la sesión.
 """
-from flask import Blueprint, request, jsonify
-from werkzeug.security import check_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+import uuid
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import (
+    create_access_token, create_refresh_token, decode_token, jwt_required, get_jwt_identity, get_jwt
+)
 from extensions import db
+from models.refresh_session import RefreshSession
+from models.revoked_token import RevokedToken
 from models.user import User
+from utils.passwords import verify_password
+from utils.token_revocation import revoke_token, revoke_all_for_user
 
 bp = Blueprint("auth", __name__, url_prefix="/api/administracion")
 
 
+def _issue_tokens(user_id, family_id, refresh_jti):
+    """Par access + refresh de una familia (ambos llevan el claim "fam" para el logout)"""
+    access = create_access_token(identity=str(user_id), fresh=False, additional_claims={"fam": family_id})
+    refresh = create_refresh_token(identity=str(user_id), additional_claims={"fam": family_id, "jti": refresh_jti})
+    expires = current_app.config["JWT_ACCESS_TOKEN_EXPIRES"]
+    return {
+        "access_token": access,
+        "refresh_token": refresh,
+        "expires_in": int(expires.total_seconds()) if expires else None
+    }
+
+
 @bp.route("/login", methods=["POST"])
 def login():
-    """POST /api/administracion/login - Autenticación y generación de token JWT"""
+    """POST /api/administracion/login - Autenticación y generación de tokens JWT (access + refresh)"""
     data = request.json or {}
     email = data.get("email")
     password = data.get("password")
@@ -25,16 +50,76 @@ def login():
     
     # Buscar usuario y verificar password
     user = User.query.filter_by(email=email).first()
-    if not user or not check_password_hash(user.password_hash, password):
+    ok, new_hash = verify_password(user.password_hash, password) if user else (False, None)
+    if not ok:
         return jsonify({"msg": "Credenciales inválidas"}), 401
     
-    # Crear token JWT con identity como STRING (fix para CSRF validation)
-    token = create_access_token(identity=str(user.id), fresh=False)
+    # Cambió PASSWORD_HASH_METHOD: se guarda el hash con los parámetros nuevos
+    if new_hash:
+        user.password_hash = new_hash
+    
+    # Nueva familia de refresh tokens (y limpieza de las vencidas del usuario)
+    now = datetime.utcnow()
+    RefreshSession.query.filter(RefreshSession.user_id == user.id, RefreshSession.expires_at < now)\
+        .delete(synchronize_session=False)
+    session = RefreshSession(
+        id=str(uuid.uuid4()),
+        user_id=user.id,
+        current_jti=str(uuid.uuid4()),
+        expires_at=now + current_app.config["JWT_REFRESH_TOKEN_EXPIRES"],
+        user_agent=(request.headers.get("User-Agent") or "")[:255]
+    )
+    db.session.add(session)
+    db.session.commit()
+    
+    # Identity como STRING (fix para CSRF validation)
+    tokens = _issue_tokens(user.id, session.id, session.current_jti)
+    return jsonify(dict(tokens, user=user.to_dict()))
+
+
+@bp.route("/refresh", methods=["POST"])
+@jwt_required(refresh=True)
+def refresh():
+    """
+    POST /api/administracion/refresh - Nuevo par de tokens (Authorization: Bearer <refresh_token>)
+    El refresh token usado queda invalidado (rotación). Respuestas:
+    - 401: sesión vencida/revocada, o refresh token reutilizado (se revoca la sesión)
+    - 409: otra pestaña acaba de renovar con este mismo token (usar el token nuevo)
+    """
+    claims = get_jwt()
+    jti = claims["jti"]
+    now = datetime.utcnow()
+    session = db.session.get(RefreshSession, claims.get("fam") or "")
+    if session is None or session.revoked_at or session.expires_at < now:
+        return jsonify({"msg": "Sesión expirada. Inicia sesión nuevamente"}), 401
+    
+    if session.current_jti != jti:
+        grace = current_app.config.get("REFRESH_REUSE_GRACE_SECONDS", 10)
+        if jti == session.previous_jti and session.rotated_at and (now - session.rotated_at).total_seconds() <= grace:
+            return jsonify({"msg": "Token ya renovado"}), 409
+        # Token viejo presentado de nuevo: probablemente robado → revocar toda la familia
+        session.revoked_at = now
+        db.session.commit()
+        current_app.logger.warning(f"Refresh token reutilizado (usuario {session.user_id}, sesión {session.id}): sesión revocada")
+        return jsonify({"msg": "Sesión revocada. Inicia sesión nuevamente"}), 401
+    
+    # Rotación atómica: si dos requests llegan con el mismo token, solo uno gana
+    new_jti = str(uuid.uuid4())
+    rotated = RefreshSession.query.filter(
+        RefreshSession.id == session.id,
+        RefreshSession.current_jti == jti,
+        RefreshSession.revoked_at.is_(None)
+    ).update({
+        "current_jti": new_jti,
+        "previous_jti": jti,
+        "rotated_at": now,
+        "expires_at": now + current_app.config["JWT_REFRESH_TOKEN_EXPIRES"]
+    }, synchronize_session=False)
+    db.session.commit()
+    if not rotated:
+        return jsonify({"msg": "Token ya renovado"}), 409
     
-    return jsonify({
-        "access_token": token,
-        "user": user.to_dict()
-    })
+    return jsonify(_issue_tokens(session.user_id, session.id, new_jti))
 
 
 @bp.route("/mi-perfil", methods=["GET"])
@@ -46,3 +131,39 @@ def me():
     if not user:
         return jsonify({"msg": "No autorizado"}), 401
     return jsonify(user.to_dict())
+
+
+@bp.route("/logout", methods=["POST"])
+@jwt_required(verify_type=False)
+def logout():
+    """
+    POST /api/administracion/logout - Revoca el token presentado y su sesión de refresh
+    Acepta el access o el refresh token: el access vence a los pocos minutos y, con la
+    sesión inactiva, el refresh es lo único vigente. Body opcional {"access_token"}:
+    revoca también ese access token si sigue vigente (mismo usuario)
+    """
+    claims = get_jwt()
+    revoke_token(claims)
+    access_token = (request.get_json(silent=True) or {}).get("access_token")
+    if access_token and claims.get("type") == "refresh":
+        try:
+            access_claims = decode_token(access_token)
+        except Exception:
+            access_claims = None  # Vencido o inválido: no hace falta revocarlo
+        if access_claims and access_claims.get("sub") == claims.get("sub") and \
+                not RevokedToken.query.filter_by(jti=access_claims["jti"]).first():
+            revoke_token(access_claims)
+    if claims.get("fam"):
+        RefreshSession.query.filter_by(id=claims["fam"], revoked_at=None)\
+            .update({"revoked_at": datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+    return jsonify({"msg": "Sesión cerrada"})
+
+
+@bp.route("/logout-all", methods=["POST"])
+@jwt_required()
+def logout_all():
+    """POST /api/administracion/logout-all - Revoca todos los tokens del usuario (todas sus sesiones)"""
+    revoke_all_for_user(int(get_jwt_identity()))
+    db.session.commit()
+    return jsonify({"msg": "Todas las sesiones fueron cerradas"})
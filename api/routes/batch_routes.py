@@ -0,0 +1,113 @@
+"""
+Rutas de Batch (varias lecturas en un solo request)
+Endpoint: POST /api/batch
+
+- Cada sub-request GET se despacha internamente contra los blueprints
+  registrados (sin HTTP extra, sin preflight CORS por recurso)
+- Cada sub-request corre en su propio app context: `g` (request_id, trazas,
+  réplica de lectura...) y la sesión de base de datos no se comparten con el
+  batch ni entre sub-requests
+- Respuesta con status por item (un error en uno no afecta al resto)
+
+Body:
+    {"requests": [
+        {"id": "pubs", "path": "/api/publicaciones?per_page=6"},
+        {"id": "cats", "path": "/api/categorias"}
+    ]}
+
+Permisos:
+- Público. El header Authorization (si viene) se reenvía a cada sub-request,
+  así que cada endpoint aplica sus propios permisos.
+"""
+from flask import Blueprint, current_app, g, jsonify, request
+from werkzeug.test import EnvironBuilder
+from extensions import db
+
+bp = Blueprint("batch", __name__, url_prefix="/api")
+
+BATCH_PATH = "/api/batch"
+# Headers del request original que se propagan a cada sub-request
+FORWARDED_HEADERS = ("Authorization", "Accept-Language", "X-Request-ID", "User-Agent")
+
+
+def _dispatch(path, headers):
+    """
+    Ejecuta GET `path` dentro de la app (full_dispatch_request: before/after_request,
+    manejo de errores y permisos igual que un request real)
+    """
+    app = current_app._get_current_object()
+    builder = EnvironBuilder(
+        path=path,
+        base_url=request.host_url,
+        method="GET",
+        headers=headers,
+        environ_base={"REMOTE_ADDR": request.remote_addr},
+    )
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+
+    # App context propio: un `g` y una sesión de BD nuevos por sub-request
+    with app.app_context(), app.request_context(environ):
+        try:
+            response = app.full_dispatch_request()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception(f"Error en sub-request de batch {path}: {e}")
+            return 500, {"msg": "Error interno"}
+        # Las respuestas en streaming (sitemap, feeds) se consumen dentro del contexto
+        status = response.status_code
+        if response.mimetype == "text/event-stream":
+            # Conexiones de eventos (SSE) no terminan: no pueden ir en un batch
+            response.close()
+            return 400, {"msg": "Endpoint de eventos no soportado en batch"}
+        if response.is_json:
+            body = response.get_json(silent=True)
+        else:
+            body = response.get_data(as_text=True)
+        response.close()
+    return status, body
+
+
+@bp.route("/batch", methods=["POST"])
+def batch():
+    """
+    POST /api/batch
+    Máximo BATCH_MAX_REQUESTS sub-requests, solo GET a rutas /api/*
+    """
+    data = request.get_json() or {}
+    items = data.get("requests")
+    if not isinstance(items, list) or not items:
+        return jsonify({"msg": "requests (lista) es requerido"}), 400
+
+    max_requests = current_app.config.get("BATCH_MAX_REQUESTS", 10)
+    if len(items) > max_requests:
+        return jsonify({"msg": f"Máximo {max_requests} sub-requests por batch"}), 400
+
+    headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+    # Mismo X-Request-ID en todas las sub-requests (correlación de logs)
+    if "X-Request-ID" not in headers and g.get("request_id"):
+        headers["X-Request-ID"] = g.request_id
+
+    responses = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            responses.append({"id": index, "status": 400, "body": {"msg": "Sub-request inválida"}})
+            continue
+
+        item_id = item.get("id", index)
+        path = item.get("path") or ""
+        method = (item.get("method") or "GET").upper()
+
+        if method != "GET":
+            responses.append({"id": item_id, "status": 405, "body": {"msg": "Solo se permiten GET en batch"}})
+            continue
+        if not path.startswith("/api/") or path.split("?", 1)[0].rstrip("/") == BATCH_PATH:
+            responses.append({"id": item_id, "status": 400, "body": {"msg": "path inválido"}})
+            continue
+
+        status, body = _dispatch(path, headers)
+        responses.append({"id": item_id, "status": status, "body": body})
+
+    return jsonify({"responses": responses}), 200
@@ -6,10 +6,11 @@ Permisos:
 - GET (list, detail): Público
 - POST, PUT, DELETE: Solo admins (@admin_required)
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, abort
 from extensions import db
 from models.category import Category
 from utils.decorators import admin_required, public_endpoint
+from utils.http_cache import collection_version, make_etag, not_modified, cacheable, purge_surrogate_keys
 
 bp = Blueprint("categorias", __name__, url_prefix="/api/categorias")
 
@@ -17,6 +18,12 @@ bp = Blueprint("categorias", __name__, url_prefix="/api/categorias")
 @bp.route("", methods=["GET"])
 def list_categorias():
     """GET /api/categorias - Lista todas las categorías"""
+    count, last_modified = collection_version(Category)
+    etag = make_etag("categories", count, last_modified)
+    cached = not_modified(etag, last_modified, ["categories"])
+    if cached:
+        return cached
+
     items = Category.query.all()
     data = [
         {
@@ -27,12 +34,22 @@ def list_categorias():
         }
         for c in items
     ]
-    return jsonify(data)
+    keys = ["categories"] + [f"category-{c.id}" for c in items]
+    return cacheable(jsonify(data), etag, last_modified, keys)
 
 
 @bp.route("/<int:cat_id>", methods=["GET"])
 def get_categoria(cat_id):
     """GET /api/categorias/<id> - Obtiene una categoría por ID"""
+    version = db.session.query(Category.updated_at).filter(Category.id == cat_id).first()
+    if version is None:
+        abort(404)
+    etag = make_etag("category", cat_id, version.updated_at)
+    keys = ["categories", f"category-{cat_id}"]
+    cached = not_modified(etag, version.updated_at, keys)
+    if cached:
+        return cached
+
     cat = Category.query.get_or_404(cat_id)
     data = {
         "id": cat.id,
@@ -40,7 +57,7 @@ def get_categoria(cat_id):
         "name": cat.name,
         "description": cat.description
     }
-    return jsonify(data)
+    return cacheable(jsonify(data), etag, version.updated_at, keys)
 
 
 @bp.route("", methods=["POST"])
@@ -67,6 +84,7 @@ def create_categoria():
     )
     db.session.add(c)
     db.session.commit()
+    purge_surrogate_keys("categories", f"category-{c.id}")
     
     return jsonify({
         "id": c.id,
@@ -97,6 +115,7 @@ def update_categoria(cat_id):
         cat.description = data["description"]
     
     db.session.commit()
+    purge_surrogate_keys("categories", f"category-{cat.id}")
     
     return jsonify({
         "id": cat.id,
@@ -113,4 +132,5 @@ def delete_categoria(cat_id):
     cat = Category.query.get_or_404(cat_id)
     db.session.delete(cat)
     db.session.commit()
+    purge_surrogate_keys("categories", f"category-{cat_id}")
     return jsonify({"msg": "categoría eliminada"})
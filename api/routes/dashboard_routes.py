@@ -2,14 +2,23 @@
 Dashboard Routes
 Endpoints para el dashboard del admin con estadísticas
 """
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+import json
+import queue
+import time
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
 from extensions import db
 from models.publication import Publication
 from models.category import Category
 from models.gallery_item import GalleryItem
 from models.contact_message import ContactMessage
 from models.user import User
+from utils.decorators import admin_required
+from utils.slow_queries import get_slow_query_stats, reset_slow_query_stats
+from utils.events import broker, issue_sse_ticket, sse_client_limit, uses_notify, verify_sse_ticket
+from utils.outbound import get_outbound_stats
+from utils.invalidation import bus as invalidation_bus
+from utils.tracing import get_tracing_stats
 
 bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 
@@ -64,3 +73,126 @@ def get_recent():
         
     except Exception as e:
         return jsonify({'msg': f'Error al obtener datos recientes: {str(e)}'}), 500
+
+
+@bp.route('/slow-queries', methods=['GET'])
+@admin_required
+def get_slow_queries(current_user):
+    """
+    GET /api/dashboard/slow-queries?limit=20&reset=1
+    Consultas lentas agregadas por fingerprint (del worker que atiende el request),
+    ordenadas por tiempo total: la primera es el principal culpable
+    """
+    limit = int(request.args.get('limit', 20))
+    stats = get_slow_query_stats(limit=limit)
+    if request.args.get('reset') == '1':
+        reset_slow_query_stats()
+    return jsonify({'queries': stats}), 200
+
+
+@bp.route('/outbound', methods=['GET'])
+@admin_required
+def get_outbound(current_user):
+    """
+    GET /api/dashboard/outbound
+    Estado de los servicios externos (Resend, Cloudinary) en el worker que atiende:
+    circuito (closed/open/half_open), llamadas, fallas, rechazos y latencias
+    """
+    return jsonify({'providers': get_outbound_stats()}), 200
+
+
+@bp.route('/invalidation', methods=['GET'])
+@admin_required
+def get_invalidation(current_user):
+    """
+    GET /api/dashboard/invalidation
+    Bus de invalidación de cachés del worker que atiende: transporte (notify/unix_socket),
+    purgas publicadas y recibidas, y latencia de propagación desde otros workers
+    """
+    return jsonify(invalidation_bus.stats()), 200
+
+
+@bp.route('/tracing', methods=['GET'])
+@admin_required
+def get_tracing(current_user):
+    """
+    GET /api/dashboard/tracing
+    Trazas del worker que atiende: muestreadas, exportadas y descartadas (cola llena)
+    """
+    return jsonify(get_tracing_stats(current_app)), 200
+
+
+@bp.route('/events/ticket', methods=['POST'])
+@jwt_required()
+def create_events_ticket():
+    """
+    POST /api/dashboard/events/ticket
+    Ticket de un solo propósito y SSE_TICKET_SECONDS de vida para abrir el stream:
+    EventSource no permite headers y un JWT en la URL terminaría en los logs
+    """
+    return jsonify({
+        'ticket': issue_sse_ticket(get_jwt_identity()),
+        'expires_in': current_app.config.get('SSE_TICKET_SECONDS', 30)
+    }), 200
+
+
+@bp.route('/events', methods=['GET'])
+def stream_events():
+    """
+    GET /api/dashboard/events?ticket=<ticket> (text/event-stream)
+    Eventos de cambios: message.created, message.read, message.deleted,
+    publication.created, publication.updated, publication.deleted
+
+    - Autenticación: ?ticket= (POST /events/ticket) o header Authorization con el JWT
+    - La conexión se cierra a los SSE_MAX_DURATION segundos; al reconectar el
+      cliente pide un ticket nuevo (con Last-Event-ID recibe los eventos que se perdió)
+    - Sin eventos solo se envía un comentario de keep-alive; no se consulta la BD
+    """
+    ticket = request.args.get('ticket')
+    if ticket:
+        if verify_sse_ticket(ticket) is None:
+            return jsonify({'msg': 'Ticket inválido o vencido'}), 401
+    else:
+        verify_jwt_in_request()
+
+    if broker.client_count >= sse_client_limit():
+        # El dashboard vuelve a hacer polling de /stats y /recent
+        response = jsonify({'msg': 'Demasiadas conexiones de eventos, reintentar luego'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+
+    if uses_notify():
+        broker.ensure_listener(current_app._get_current_object())
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if last_event_id and not last_event_id.isdigit():
+        last_event_id = None
+
+    heartbeat = current_app.config.get('SSE_HEARTBEAT', 15)
+    max_duration = current_app.config.get('SSE_MAX_DURATION', 55)
+
+    # La conexión abierta no debe retener una conexión del pool de la BD
+    db.session.close()
+
+    def generate():
+        q = broker.subscribe(last_event_id)
+        try:
+            yield 'retry: 3000\n\n'
+            deadline = time.monotonic() + max_duration
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = q.get(timeout=min(heartbeat, remaining))
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            broker.unsubscribe(q)
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Sin buffering en Nginx/proxies
+    return response
@@ -0,0 +1,213 @@
+"""
+Rutas de descubrimiento para buscadores y lectores de feeds
+Endpoints: GET /api/sitemap.xml, GET /api/sitemap-<n>.xml, GET /api/feed.xml (RSS), GET /api/feed.atom
+
+- Se generan desde Publication.slug/updated_at (solo publicadas)
+- Se transmiten en streaming por bloques de filas (yield_per), sin armar el XML en memoria
+- ETag/Last-Modified + surrogate key "publications": con publicaciones sin cambios
+  el cliente/CDN recibe 304 y no se regenera nada
+
+Permisos:
+- Todos públicos
+"""
+from email.utils import format_datetime
+from datetime import datetime, timezone
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+from flask import Blueprint, Response, current_app, request, stream_with_context
+from sqlalchemy import func, select
+from extensions import db
+from models.publication import Publication
+from utils.http_cache import collection_version, make_etag, not_modified, cacheable
+
+bp = Blueprint("feeds", __name__, url_prefix="/api")
+
+# Máximo de URLs por sitemap (límite del protocolo: 50.000)
+SITEMAP_SHARD_SIZE = 50000
+# Filas por bloque enviado al cliente
+STREAM_CHUNK_ROWS = 1000
+# Publicaciones en los feeds RSS/Atom
+FEED_SIZE = 20
+
+
+def _published():
+    return Publication.status == "Publicado"
+
+
+def _publication_url(slug):
+    """URL pública de la publicación en el frontend (Next.js: /blog/<slug>)"""
+    return f"{current_app.config['SITE_URL'].rstrip('/')}/blog/{quote(slug)}"
+
+
+def _api_url():
+    """URL pública de la API (API_URL o, si no está configurada, la del request)"""
+    return (current_app.config.get("API_URL") or f"{request.url_root.rstrip('/')}/api").rstrip("/")
+
+
+def _w3c_date(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ") if value else None
+
+
+def _stream(head, rows, render_row, tail):
+    """Genera el XML por bloques: encabezado, filas (de a STREAM_CHUNK_ROWS) y cierre"""
+    yield head
+    chunk = []
+    for row in rows:
+        chunk.append(render_row(row))
+        if len(chunk) >= STREAM_CHUNK_ROWS:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+    yield tail
+
+
+def _xml_response(generator, mimetype, etag, last_modified):
+    response = Response(stream_with_context(generator), mimetype=mimetype)
+    return cacheable(response, etag, last_modified, ["publications"])
+
+
+def _conditional(name):
+    """Validadores compartidos por todos los documentos (cambian con cualquier escritura)"""
+    count, last_modified = collection_version(Publication)
+    etag = make_etag(name, count, last_modified, current_app.config["SITE_URL"])
+    return etag, last_modified, not_modified(etag, last_modified, ["publications"])
+
+
+def _urlset(first_id=None, last_id=None):
+    """<urlset> con las publicaciones (opcionalmente de un rango de ids = un shard)"""
+    stmt = select(Publication.slug, Publication.updated_at).where(_published()).order_by(Publication.id)
+    if first_id is not None:
+        stmt = stmt.where(Publication.id.between(first_id, last_id))
+    rows = db.session.execute(stmt.execution_options(yield_per=STREAM_CHUNK_ROWS))
+
+    def render(row):
+        lastmod = _w3c_date(row.updated_at)
+        return (
+            f"<url><loc>{escape(_publication_url(row.slug))}</loc>"
+            + (f"<lastmod>{lastmod}</lastmod>" if lastmod else "")
+            + "</url>\n"
+        )
+
+    return _stream(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+        rows, render, "</urlset>\n"
+    )
+
+
+@bp.route("/sitemap.xml", methods=["GET"])
+def sitemap():
+    """
+    GET /api/sitemap.xml
+    Hasta SITEMAP_SHARD_SIZE publicaciones: <urlset> directo.
+    Por encima: <sitemapindex> que apunta a /api/sitemap-<n>.xml (shards por rango de id)
+    """
+    etag, last_modified, cached = _conditional("sitemap")
+    if cached:
+        return cached
+
+    max_id = db.session.query(func.max(Publication.id)).filter(_published()).scalar() or 0
+    if max_id <= SITEMAP_SHARD_SIZE:
+        return _xml_response(_urlset(), "application/xml", etag, last_modified)
+
+    # lastmod por shard en una sola consulta agrupada
+    shard = ((Publication.id - 1) // SITEMAP_SHARD_SIZE).label("shard")
+    shards = db.session.query(shard, func.max(Publication.updated_at))\
+        .filter(_published()).group_by(shard).order_by(shard).all()
+
+    api_url = _api_url()
+
+    def render(row):
+        lastmod = _w3c_date(row[1])
+        return (
+            f"<sitemap><loc>{escape(api_url)}/sitemap-{int(row[0])}.xml</loc>"
+            + (f"<lastmod>{lastmod}</lastmod>" if lastmod else "")
+            + "</sitemap>\n"
+        )
+
+    generator = _stream(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+        shards, render, "</sitemapindex>\n"
+    )
+    return _xml_response(generator, "application/xml", etag, last_modified)
+
+
+@bp.route("/sitemap-<int:shard>.xml", methods=["GET"])
+def sitemap_shard(shard):
+    """GET /api/sitemap-<n>.xml - Shard n: publicaciones con id en [n*50000+1, (n+1)*50000]"""
+    etag, last_modified, cached = _conditional(f"sitemap-{shard}")
+    if cached:
+        return cached
+
+    first_id = shard * SITEMAP_SHARD_SIZE + 1
+    generator = _urlset(first_id, first_id + SITEMAP_SHARD_SIZE - 1)
+    return _xml_response(generator, "application/xml", etag, last_modified)
+
+
+def _latest():
+    """Últimas FEED_SIZE publicaciones publicadas (streaming)"""
+    published = func.coalesce(Publication.published_at, Publication.created_at).label("published")
+    stmt = select(
+        Publication.title, Publication.slug, Publication.excerpt, Publication.updated_at, published
+    ).where(_published()).order_by(published.desc()).limit(FEED_SIZE)
+    return db.session.execute(stmt.execution_options(yield_per=FEED_SIZE))
+
+
+@bp.route("/feed.xml", methods=["GET"])
+def rss_feed():
+    """GET /api/feed.xml - Feed RSS 2.0 de las últimas publicaciones"""
+    etag, last_modified, cached = _conditional("rss")
+    if cached:
+        return cached
+
+    site_url = current_app.config["SITE_URL"].rstrip("/")
+    site_name = escape(current_app.config["SITE_NAME"])
+
+    def render(row):
+        pub_date = row.published.replace(tzinfo=timezone.utc) if row.published else None
+        url = escape(_publication_url(row.slug))
+        return (
+            f"<item><title>{escape(row.title)}</title><link>{url}</link><guid>{url}</guid>"
+            + (f"<description>{escape(row.excerpt)}</description>" if row.excerpt else "")
+            + (f"<pubDate>{format_datetime(pub_date)}</pubDate>" if pub_date else "")
+            + "</item>\n"
+        )
+
+    generator = _stream(
+        '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>\n'
+        f"<title>{site_name}</title><link>{escape(site_url)}/blog</link>"
+        f"<description>Últimas publicaciones de {site_name}</description>\n",
+        _latest(), render, "</channel></rss>\n"
+    )
+    return _xml_response(generator, "application/rss+xml", etag, last_modified)
+
+
+@bp.route("/feed.atom", methods=["GET"])
+def atom_feed():
+    """GET /api/feed.atom - Feed Atom de las últimas publicaciones"""
+    etag, last_modified, cached = _conditional("atom")
+    if cached:
+        return cached
+
+    site_url = current_app.config["SITE_URL"].rstrip("/")
+    feed_url = f"{_api_url()}/feed.atom"
+
+    def render(row):
+        url = escape(_publication_url(row.slug))
+        return (
+            f"<entry><title>{escape(row.title)}</title><link href=\"{url}\"/><id>{url}</id>"
+            f"<updated>{_w3c_date(row.updated_at or row.published)}</updated>"
+            + (f"<summary>{escape(row.excerpt)}</summary>" if row.excerpt else "")
+            + "</entry>\n"
+        )
+
+    generator = _stream(
+        '<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n'
+        f"<title>{escape(current_app.config['SITE_NAME'])}</title>"
+        f"<link href=\"{escape(site_url)}/blog\"/><link rel=\"self\" href=\"{escape(feed_url)}\"/>"
+        f"<id>{escape(feed_url)}</id><updated>{_w3c_date(last_modified or datetime.utcnow())}</updated>\n",
+        _latest(), render, "</feed>\n"
+    )
+    return _xml_response(generator, "application/atom+xml", etag, last_modified)
@@ -2,15 +2,21 @@
 Rutas API para Galería (imágenes y videos)
 Endpoints: GET /api/galeria, POST /api/galeria (con upload), PUT/DELETE /api/galeria/<id>
 Soporta Cloudinary (CDN) y almacenamiento local
+Con IMAGE_PROXY_ENABLED, las URLs externas se sirven también por GET /api/galeria/proxy
 
 Permisos:
-- GET (list, detail): Público
+- GET (list, detail, proxy): Público
 - POST, PUT, DELETE: Solo admins (@admin_required)
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, abort, current_app, send_file
+from sqlalchemy import func
 from extensions import db
 from models.gallery_item import GalleryItem
 from utils.decorators import admin_required, public_endpoint
+from utils.http_cache import collection_version, make_etag, not_modified, cacheable, purge_surrogate_keys
+from utils.cache import cache
+from utils.image_proxy import ImageProxyError, proxy_url, verify_signature, get_image
+from utils.outbound import ProviderUnavailable
 import os
 
 bp = Blueprint("galeria", __name__, url_prefix="/api/galeria")
@@ -21,8 +27,19 @@ UPLOAD_METHOD = os.environ.get("UPLOAD_METHOD", "local")  # "cloudinary" o "loca
 
 @bp.route("", methods=["GET"])
 def list_galeria():
-    """GET /api/galeria - Lista todos los items de galería"""
-    items = GalleryItem.query.all()
+    """GET /api/galeria?category=eventos - Lista los items de galería (opcionalmente de una categoría)"""
+    category = request.args.get("category")
+
+    count, last_modified = collection_version(GalleryItem)
+    etag = make_etag("gallery", count, last_modified, category)
+    cached = not_modified(etag, last_modified, ["gallery"])
+    if cached:
+        return cached
+
+    query = GalleryItem.query
+    if category:
+        query = query.filter(GalleryItem.category == category)
+    items = query.all()
     data = [
         {
             "id": g.id,
@@ -30,16 +47,114 @@ def list_galeria():
             "url": g.url,
             "caption": g.caption,
             "category": g.category,
+            "proxy_url": proxy_url(g.url),
             "created_at": g.created_at.isoformat() if g.created_at else None
         }
         for g in items
     ]
-    return jsonify(data)
+    keys = ["gallery"] + [f"gallery-{g.id}" for g in items]
+    return cacheable(jsonify(data), etag, last_modified, keys)
+
+
+def _build_facets():
+    """
+    Categorías de galería con cantidad de items y portada (último item) en UNA consulta:
+    GROUP BY category → count + max(id), y join para traer la fila de la portada
+    """
+    grouped = db.session.query(
+        GalleryItem.category.label("category"),
+        func.count(GalleryItem.id).label("total"),
+        func.max(GalleryItem.id).label("cover_id")
+    ).group_by(GalleryItem.category).subquery()
+
+    rows = db.session.query(
+        grouped.c.category,
+        grouped.c.total,
+        GalleryItem.id,
+        GalleryItem.title,
+        GalleryItem.url
+    ).join(GalleryItem, GalleryItem.id == grouped.c.cover_id)\
+     .order_by(grouped.c.total.desc(), grouped.c.category).all()
+
+    return [
+        {
+            "category": r.category,
+            "count": r.total,
+            "cover": {"id": r.id, "title": r.title, "url": r.url}
+        }
+        for r in rows
+    ]
+
+
+@bp.route("/facets", methods=["GET"])
+def galeria_facets():
+    """
+    GET /api/galeria/facets - Categorías con cantidad de items y portada
+    Para la portada de la galería sin descargar todas las filas.
+    Cacheado en memoria; se invalida con cualquier escritura de galería (surrogate key "gallery")
+    """
+    count, last_modified = collection_version(GalleryItem)
+    etag = make_etag("gallery-facets", count, last_modified)
+    cached = not_modified(etag, last_modified, ["gallery"])
+    if cached:
+        return cached
+
+    facets = cache.get_or_set("gallery:facets", _build_facets, ttl=600, tags=["gallery"])
+    return cacheable(jsonify({"facets": facets, "total": count}), etag, last_modified, ["gallery"])
+
+
+@bp.route("/proxy", methods=["GET"])
+def proxy_imagen():
+    """
+    GET /api/galeria/proxy?url=...&w=640&sig=... - Imagen externa servida desde la caché en disco
+    Solo URLs firmadas por la API (campo "proxy_url" de los items); el cliente agrega `w`,
+    que debe ser uno de IMAGE_PROXY_WIDTHS (la firma cubre solo la URL de origen).
+    Respuesta cacheable por navegador/CDN (max-age = IMAGE_PROXY_TTL, ETag → 304)
+    """
+    config = current_app.config
+    if not config.get("IMAGE_PROXY_ENABLED"):
+        abort(404)
+
+    url = request.args.get("url", "")
+    width = request.args.get("w", type=int)
+    if width is not None and width not in config.get("IMAGE_PROXY_WIDTHS", ()):
+        return jsonify({"msg": "Ancho no permitido", "widths": list(config.get("IMAGE_PROXY_WIDTHS", ()))}), 400
+    if not url or not verify_signature(url, request.args.get("sig")):
+        return jsonify({"msg": "Firma inválida"}), 403
+
+    try:
+        path, meta = get_image(url, width)
+    except ImageProxyError as e:
+        return jsonify({"msg": str(e)}), e.status
+    except ProviderUnavailable as e:
+        response = jsonify({"msg": str(e)})
+        response.headers["Retry-After"] = str(config.get("OUTBOUND_BREAKER_RESET", 30))
+        return response, 503
+    except Exception as e:
+        return jsonify({"msg": f"No se pudo obtener la imagen: {e}"}), 502
+
+    response = send_file(path, mimetype=meta["content_type"], conditional=True, etag=meta["etag"],
+                         max_age=config.get("IMAGE_PROXY_TTL", 604800))
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    # Contenido de terceros servido desde el origen de la API: sin scripts ni recursos
+    response.headers["Content-Security-Policy"] = "default-src 'none'; sandbox"
+    return response
 
 
 @bp.route("/<int:item_id>", methods=["GET"])
 def get_galeria_item(item_id):
     """GET /api/galeria/<id> - Obtiene un item de galería por ID"""
+    version = db.session.query(GalleryItem.updated_at).filter(GalleryItem.id == item_id).first()
+    if version is None:
+        abort(404)
+    etag = make_etag("gallery-item", item_id, version.updated_at)
+    keys = ["gallery", f"gallery-{item_id}"]
+    cached = not_modified(etag, version.updated_at, keys)
+    if cached:
+        return cached
+
     item = GalleryItem.query.get_or_404(item_id)
     data = {
         "id": item.id,
@@ -47,14 +162,15 @@ def get_galeria_item(item_id):
         "url": item.url,
         "caption": item.caption,
         "category": item.category,
+        "proxy_url": proxy_url(item.url),
         "created_at": item.created_at.isoformat() if item.created_at else None
     }
-    return jsonify(data)
+    return cacheable(jsonify(data), etag, version.updated_at, keys)
 
 
 @bp.route("", methods=["POST"])
 @admin_required
-def create_galeria_item():
+def create_galeria_item(current_user):
     """
     POST /api/galeria - Crea un nuevo item de galería (requiere JWT)
     
@@ -114,6 +230,7 @@ def create_galeria_item():
             
             db.session.add(g)
             db.session.commit()
+            purge_surrogate_keys("gallery", f"gallery-{g.id}")
             
             return jsonify({
                 "id": g.id,
@@ -150,6 +267,7 @@ def create_galeria_item():
         
         db.session.add(g)
         db.session.commit()
+        purge_surrogate_keys("gallery", f"gallery-{g.id}")
         
         return jsonify({
             "id": g.id,
@@ -161,7 +279,7 @@ def create_galeria_item():
 
 @bp.route("/<int:item_id>", methods=["PUT"])
 @admin_required
-def update_galeria_item(item_id):
+def update_galeria_item(current_user, item_id):
     """PUT /api/galeria/<id> - Actualiza un item de galería (solo admins)"""
     item = GalleryItem.query.get_or_404(item_id)
     data = request.json or {}
@@ -177,6 +295,7 @@ def update_galeria_item(item_id):
         item.category = data["category"]
     
     db.session.commit()
+    purge_surrogate_keys("gallery", f"gallery-{item.id}")
     
     return jsonify({
         "id": item.id,
@@ -188,7 +307,7 @@ def update_galeria_item(item_id):
 
 @bp.route("/<int:item_id>", methods=["DELETE"])
 @admin_required
-def delete_galeria_item(item_id):
+def delete_galeria_item(current_user, item_id):
     """
     DELETE /api/galeria/<id> - Elimina un item de galería (solo admins)
     
@@ -213,4 +332,5 @@ def delete_galeria_item(item_id):
     
     db.session.delete(item)
     db.session.commit()
+    purge_surrogate_keys("gallery", f"gallery-{item_id}")
     return jsonify({"msg": "item de galería eliminado"})
@@ -4,21 +4,74 @@ Endpoints: POST /api/mensajes_contacto (crear mensaje - público), GET /api/mens
 
 Permisos:
 - POST (enviar mensaje): Público (cualquiera puede contactar)
-- GET (list, detail), DELETE: Solo admins (@admin_required)
+- GET (list, search, export, detail), PATCH (marcar leído), DELETE: Solo admins (@admin_required)
 
 Notificaciones:
-- Al recibir mensaje, envía email al admin configurado
+- Al recibir mensaje, email al admin: inmediato o agrupado en un digest
+  (CONTACT_NOTIFY_MODE, ver utils/notifications.py)
+- Reenvíos iguales o casi iguales del mismo remitente dentro de
+  CONTACT_DEDUP_WINDOW_HOURS no crean otra fila ni otro email: se suman a
+  duplicate_count del mensaje original
+- Textos largos casi iguales de remitentes distintos se guardan igual (no se
+  pierde una consulta legítima) y se marcan con spam_cluster_id
+- Eventos para el dashboard (SSE): message.created, message.read, message.deleted
 """
-from flask import Blueprint, request, jsonify
+from datetime import datetime, timedelta
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from sqlalchemy import or_
 from extensions import db
 from models.contact_message import ContactMessage
+from utils.dedup import content_fingerprint, minhash_signature, similarity, normalize_email, word_count
 from utils.decorators import admin_required, public_endpoint
-from utils.email import send_contact_notification
-import os
+from utils.notifications import notify_new_message
+from utils.events import publish_event
+from utils.inbox_search import apply_search
+from utils.export import CHUNK_ROWS, stream_csv, stream_xlsx
 
 bp = Blueprint("mensajes_contacto", __name__, url_prefix="/api/mensajes_contacto")
 
 
+def _find_duplicate(email, message, fingerprint, signature):
+    """
+    (reenvío, spam_cluster_id) de un mensaje nuevo
+    - reenvío: mensaje reciente del MISMO remitente del que este es una copia
+      (huella exacta, que incluye el email, o MinHash entre los últimos
+      CONTACT_DEDUP_SCAN mensajes) → se colapsa en él
+    - spam_cluster_id: si el texto es largo y casi igual al de OTRO remitente
+      (spam con script), id del primer mensaje del grupo; el mensaje se guarda
+    """
+    config = current_app.config
+    since = datetime.utcnow() - timedelta(hours=config.get("CONTACT_DEDUP_WINDOW_HOURS", 24))
+    recent = or_(ContactMessage.created_at >= since, ContactMessage.last_seen_at >= since)
+
+    exact = ContactMessage.query.filter(ContactMessage.fingerprint == fingerprint, recent)\
+        .order_by(ContactMessage.id.desc()).first()
+    if exact or signature is None:
+        return exact, None
+
+    sender = normalize_email(email)
+    long_message = word_count(message) >= config.get("CONTACT_NEAR_DUP_MIN_WORDS", 12)
+    threshold = config.get("CONTACT_NEAR_DUP_THRESHOLD", 0.8)
+    candidates = db.session.query(ContactMessage.id, ContactMessage.email, ContactMessage.minhash,
+                                  ContactMessage.spam_cluster_id)\
+        .filter(recent, ContactMessage.minhash.isnot(None))\
+        .order_by(ContactMessage.id.desc())\
+        .limit(config.get("CONTACT_DEDUP_SCAN", 500))
+    cluster_id = None
+    for msg_id, msg_email, msg_minhash, msg_cluster in candidates:
+        if similarity(signature, msg_minhash) < threshold:
+            continue
+        if normalize_email(msg_email) == sender:
+            return db.session.get(ContactMessage, msg_id), None
+        if long_message and cluster_id is None:
+            cluster_id = msg_cluster or msg_id
+            if msg_cluster is None:
+                # El primero del grupo también queda marcado
+                ContactMessage.query.filter_by(id=msg_id).update({"spam_cluster_id": msg_id},
+                                                                 synchronize_session=False)
+    return None, cluster_id
+
+
 @bp.route("", methods=["POST"])
 @public_endpoint
 def enviar_mensaje():
@@ -32,27 +85,41 @@ def enviar_mensaje():
     if not name or not email or not message:
         return jsonify({"msg": "name, email y message son requeridos"}), 400
     
+    # Reenvío (doble click, script): sumar al mensaje existente, sin fila ni email nuevos
+    fingerprint = content_fingerprint(email, message)
+    signature = minhash_signature(message)
+    duplicate, spam_cluster_id = _find_duplicate(email, message, fingerprint, signature)
+    if duplicate:
+        ContactMessage.query.filter_by(id=duplicate.id).update({
+            "duplicate_count": ContactMessage.duplicate_count + 1,
+            "last_seen_at": datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+        return jsonify({"id": duplicate.id, "msg": "mensaje enviado correctamente", "duplicate": True}), 200
+    
     # Crear mensaje
     m = ContactMessage(
         name=name,
         email=email,
         phone=data.get("phone"),
         subject=data.get("subject", "Sin asunto"),
-        message=message
+        message=message,
+        fingerprint=fingerprint,
+        minhash=signature,
+        spam_cluster_id=spam_cluster_id
     )
     
     db.session.add(m)
     db.session.commit()
+    publish_event("message.created", {
+        "id": m.id,
+        "name": m.name,
+        "subject": m.subject,
+        "created_at": m.created_at.isoformat() if m.created_at else None
+    })
     
-    # Enviar notificación por email al admin
-    email_result = send_contact_notification(
-        contact_name=name,
-        contact_email=email,
-        contact_phone=data.get("phone"),
-        subject=data.get("subject", "Sin asunto"),
-        message=message,
-        admin_email=os.environ.get("ADMIN_EMAIL", "delacruzantony32@gmail.com")
-    )
+    # Notificar al admin: inmediato o en el próximo digest (CONTACT_NOTIFY_MODE)
+    email_status = notify_new_message(m)
     
     # Respuesta al usuario
     response = {
@@ -61,39 +128,164 @@ def enviar_mensaje():
     }
     
     # Agregar info del email si fue enviado (solo para debug)
-    if email_result.get("success"):
+    if email_status == "sent":
         response["email_sent"] = True
+    elif email_status == "queued":
+        response["email_sent"] = False
+        response["email_queued"] = True
     else:
-        # Email falló pero el mensaje se guardó en BD
+        # Email falló pero el mensaje se guardó en BD (se reintenta con el digest)
         response["email_sent"] = False
         response["email_note"] = "Mensaje guardado, pero notificación por email falló"
     
     return jsonify(response), 201
 
 
+def _serialize(m):
+    return {
+        "id": m.id,
+        "name": m.name,
+        "email": m.email,
+        "phone": m.phone,
+        "subject": m.subject,
+        "message": m.message,
+        "leido": m.leido,
+        "duplicate_count": m.duplicate_count,
+        "spam_cluster_id": m.spam_cluster_id,
+        "created_at": m.created_at.isoformat() if m.created_at else None
+    }
+
+
+def _parse_date(value):
+    """Fecha ISO (YYYY-MM-DD o con hora) o None si no es válida"""
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _inbox_filters(query):
+    """Filtros compartidos por la bandeja y la búsqueda: ?leido=true|false&date_from=&date_to="""
+    leido = request.args.get("leido")
+    if leido in ("true", "1"):
+        query = query.filter(ContactMessage.leido.is_(True))
+    elif leido in ("false", "0"):
+        query = query.filter(or_(ContactMessage.leido.is_(False), ContactMessage.leido.is_(None)))
+
+    date_from = _parse_date(request.args.get("date_from"))
+    if date_from:
+        query = query.filter(ContactMessage.created_at >= date_from)
+    date_to = _parse_date(request.args.get("date_to"))
+    if date_to:
+        # Solo fecha: incluye todo ese día
+        if len(request.args["date_to"]) <= 10:
+            date_to += timedelta(days=1)
+        query = query.filter(ContactMessage.created_at < date_to)
+    return query
+
+
+def _paginated(query):
+    """Misma paginación que /api/publicaciones: {items, total, page, per_page}"""
+    page = int(request.args.get("page", 1))
+    per_page = min(int(request.args.get("per_page", 20)), 100)
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    return {
+        "items": [_serialize(m) for m in pagination.items],
+        "total": pagination.total,
+        "page": page,
+        "per_page": per_page
+    }
+
+
 @bp.route("", methods=["GET"])
 @admin_required
-def list_mensajes():
-    """GET /api/mensajes_contacto - Lista todos los mensajes (requiere JWT - admin)"""
-    messages = ContactMessage.query.order_by(ContactMessage.created_at.desc()).all()
-    data = [
-        {
-            "id": m.id,
-            "name": m.name,
-            "email": m.email,
-            "phone": m.phone,
-            "subject": m.subject,
-            "message": m.message,
-            "created_at": m.created_at.isoformat() if m.created_at else None
-        }
-        for m in messages
-    ]
-    return jsonify(data)
+def list_mensajes(current_user):
+    """
+    GET /api/mensajes_contacto - Lista los mensajes (requiere JWT - admin)
+    Con ?page= responde paginado ({items, total, page, per_page}); sin page, la lista completa
+    Filtros: ?leido=true|false&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
+    """
+    query = _inbox_filters(ContactMessage.query).order_by(ContactMessage.created_at.desc())
+    if "page" in request.args:
+        return jsonify(_paginated(query))
+    return jsonify([_serialize(m) for m in query.all()])
+
+
+@bp.route("/search", methods=["GET"])
+@admin_required
+def search_mensajes(current_user):
+    """
+    GET /api/mensajes_contacto/search?q=matricula&leido=false&page=1&per_page=20
+    Búsqueda en nombre, email, asunto y mensaje (sin distinguir tildes, por prefijo),
+    ordenada por relevancia y luego por fecha. Mismos filtros y paginación que la bandeja
+    """
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"msg": "q es requerido"}), 400
+
+    query, rank = apply_search(_inbox_filters(ContactMessage.query), q)
+    order = [rank] if rank is not None else []
+    query = query.order_by(*order, ContactMessage.created_at.desc())
+    return jsonify(_paginated(query))
+
+
+# Columnas exportadas: (encabezado, columna)
+EXPORT_COLUMNS = [
+    ("ID", ContactMessage.id),
+    ("Fecha", ContactMessage.created_at),
+    ("Nombre", ContactMessage.name),
+    ("Email", ContactMessage.email),
+    ("Teléfono", ContactMessage.phone),
+    ("Asunto", ContactMessage.subject),
+    ("Mensaje", ContactMessage.message),
+    ("Leído", ContactMessage.leido),
+    ("Reenvíos", ContactMessage.duplicate_count),
+    ("Grupo spam", ContactMessage.spam_cluster_id),
+]
+
+
+@bp.route("/export", methods=["GET"])
+@admin_required
+def export_mensajes(current_user):
+    """
+    GET /api/mensajes_contacto/export?format=csv|xlsx&leido=false&date_from=2025-01-01&date_to=2025-03-31
+    Exporta los mensajes (mismos filtros que la bandeja) en streaming:
+    filas leídas con un cursor del servidor (yield_per), sin objetos ORM
+    XLSX se arma completo antes de enviarse: máximo EXPORT_XLSX_MAX_ROWS filas (413 si hay más)
+    """
+    export_format = request.args.get("format", "csv").lower()
+    if export_format not in ("csv", "xlsx"):
+        return jsonify({"msg": "format debe ser csv o xlsx"}), 400
+
+    headers = [header for header, _column in EXPORT_COLUMNS]
+    query = _inbox_filters(db.session.query(*[column for _header, column in EXPORT_COLUMNS]))\
+        .order_by(ContactMessage.created_at.desc(), ContactMessage.id.desc())
+    if export_format == "xlsx":
+        max_rows = current_app.config.get("EXPORT_XLSX_MAX_ROWS", 50000)
+        if query.order_by(None).count() > max_rows:
+            return jsonify({
+                "msg": f"Demasiados mensajes para XLSX (máximo {max_rows}). Usa format=csv o filtra por fecha"
+            }), 413
+    rows = query.yield_per(CHUNK_ROWS)
+
+    filename = f"mensajes_{datetime.utcnow():%Y%m%d_%H%M}.{export_format}"
+    if export_format == "csv":
+        generator = stream_csv(headers, rows)
+        mimetype = "text/csv; charset=utf-8"
+    else:
+        generator = stream_xlsx(headers, rows, sheet_name="Mensajes")
+        mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    response = Response(stream_with_context(generator), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["Cache-Control"] = "no-store"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
 @bp.route("/<int:msg_id>", methods=["GET"])
 @admin_required
-def get_mensaje(msg_id):
+def get_mensaje(current_user, msg_id):
     """GET /api/mensajes_contacto/<id> - Obtiene un mensaje por ID (requiere JWT - admin)"""
     msg = ContactMessage.query.get_or_404(msg_id)
     data = {
@@ -103,17 +295,34 @@ def get_mensaje(msg_id):
         "phone": msg.phone,
         "subject": msg.subject,
         "message": msg.message,
+        "leido": msg.leido,
+        "duplicate_count": msg.duplicate_count,
+        "spam_cluster_id": msg.spam_cluster_id,
+        "last_seen_at": msg.last_seen_at.isoformat() if msg.last_seen_at else None,
         "created_at": msg.created_at.isoformat() if msg.created_at else None
     }
     return jsonify(data)
 
 
+@bp.route("/<int:msg_id>", methods=["PATCH"])
+@admin_required
+def marcar_leido(current_user, msg_id):
+    """PATCH /api/mensajes_contacto/<id> - Marca un mensaje como leído/no leído (requiere JWT - admin)"""
+    msg = ContactMessage.query.get_or_404(msg_id)
+    data = request.json or {}
+    msg.leido = bool(data.get("leido", True))
+    db.session.commit()
+    publish_event("message.read", {"id": msg.id, "leido": msg.leido})
+    return jsonify({"id": msg.id, "leido": msg.leido, "msg": "mensaje actualizado"})
+
+
 @bp.route("/<int:msg_id>", methods=["DELETE"])
 @admin_required
-def delete_mensaje(msg_id):
+def delete_mensaje(current_user, msg_id):
     """DELETE /api/mensajes_contacto/<id> - Elimina un mensaje (requiere JWT - admin)"""
     msg = ContactMessage.query.get_or_404(msg_id)
     db.session.delete(msg)
     db.session.commit()
+    publish_event("message.deleted", {"id": msg_id})
     return jsonify({"msg": "mensaje eliminado"})
 
@@ -7,22 +7,80 @@ Permisos:
 - GET (list, detail): Público
 - POST, PUT, DELETE: Solo admins (@admin_required)
 """
-from flask import Blueprint, request, jsonify
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, abort, current_app
+from sqlalchemy import func, case
 from extensions import db
 from models.publication import Publication
+from models.publication_view import PublicationView
 from utils.decorators import admin_required, public_endpoint
+from utils.http_cache import collection_version, make_etag, not_modified, cacheable, purge_surrogate_keys
+from utils.suggest import get_suggest_index
+from utils.view_counter import record_view
+from utils.events import publish_event
+from utils.cache import cache
+from utils.content import process_content, make_excerpt, render_html
 
 bp = Blueprint("publications", __name__, url_prefix="/api/publicaciones")
 
 
+def _publication_facets(q, status, category_id):
+    """
+    Conteos por categoría y por status para el contexto actual de búsqueda, en UNA consulta:
+    GROUP BY (category_id, status) sobre las filas que cumplen `q`.
+
+    Cada faceta excluye su propio filtro (facetas disyuntivas):
+    - categorías: cuenta dentro del status activo (para "N noticias en esta categoría")
+    - status: cuenta dentro de la categoría activa (si hay una)
+    """
+    query = db.session.query(
+        Publication.category_id,
+        Publication.status,
+        func.count(Publication.id)
+    ).group_by(Publication.category_id, Publication.status)
+
+    if q:
+        query = query.filter(Publication.title.ilike(f"%{q}%"))
+
+    by_category = {}
+    by_status = {}
+    for row_category_id, row_status, total in query.all():
+        if row_status == status:
+            by_category[row_category_id] = by_category.get(row_category_id, 0) + total
+        if category_id is None or row_category_id == category_id:
+            by_status[row_status] = by_status.get(row_status, 0) + total
+
+    return {
+        "categories": [
+            {"category_id": cid, "count": n}
+            for cid, n in sorted(by_category.items(), key=lambda kv: -kv[1])
+        ],
+        "status": [
+            {"status": st, "count": n}
+            for st, n in sorted(by_status.items(), key=lambda kv: -kv[1])
+        ]
+    }
+
+
 @bp.route("", methods=["GET"])
 def list_publications():
-    """GET /api/publicaciones - Lista publicaciones con paginación (solo publicadas para público)"""
+    """
+    GET /api/publicaciones - Lista publicaciones con paginación (solo publicadas para público)
+    ?facets=1 agrega conteos por categoría y status para la búsqueda/filtros actuales
+    """
     page = int(request.args.get("page", 1))
     per_page = int(request.args.get("per_page", 10))
     q = request.args.get("q")
     category_id = request.args.get("category_id")
     status = request.args.get("status")  # Nuevo: filtro por status
+
+    # GET condicional: versión de la tabla (count + max(updated_at)) en una sola consulta
+    count, last_modified = collection_version(Publication)
+    etag = make_etag("publications", count, last_modified, request.query_string.decode())
+    keys = ["publications"] + ([f"category-{category_id}"] if category_id else [])
+    cached = not_modified(etag, last_modified, keys)
+    if cached:
+        return cached
     
     # Solo mostrar publicadas por defecto (público)
     # Si se pasa status explícitamente, respetar ese filtro (para admin)
@@ -38,6 +96,7 @@ def list_publications():
     if q:
         query = query.filter(Publication.title.ilike(f"%{q}%"))
 
+    category_id_int = None
     if category_id:
         try:
             category_id_int = int(category_id)
@@ -59,22 +118,139 @@ def list_publications():
             "category_id": p.category_id,
             "image_url": p.image_url,
             "status": p.status,
+            "reading_time": p.reading_time,
             "created_at": p.created_at.isoformat() if p.created_at else None
         }
         for p in pagination.items
     ]
-    return jsonify({"items": items, "total": pagination.total, "page": page, "per_page": per_page})
+    keys += [f"publication-{p.id}" for p in pagination.items]
+    data = {"items": items, "total": pagination.total, "page": page, "per_page": per_page}
+    if request.args.get("facets") in ("1", "true"):
+        data["facets"] = _publication_facets(q, status or "Publicado", category_id_int)
+    response = jsonify(data)
+    return cacheable(response, etag, last_modified, keys)
+
+
+def _int_arg(name, default, low, high):
+    """Parámetro entero de la query acotado a [low, high]; None si no es un entero"""
+    try:
+        value = int(request.args.get(name, default))
+    except (TypeError, ValueError):
+        return None
+    return min(max(value, low), high)
+
+
+@bp.route("/suggest", methods=["GET"])
+def suggest_publications():
+    """
+    GET /api/publicaciones/suggest?q=matri&limit=8 - Sugerencias para el buscador (type-ahead)
+    Responde desde un índice en memoria de títulos/categorías (sin consultar la BD por tecla),
+    con fallback por trigramas para errores de tipeo
+    """
+    q = (request.args.get("q") or "").strip()
+    limit = _int_arg("limit", 8, 1, 20)
+    if limit is None:
+        return jsonify({"msg": "limit debe ser un número entero"}), 400
+    if not q:
+        return jsonify({"items": [], "fuzzy": False})
+
+    docs, fuzzy = get_suggest_index().search(q, limit=limit)
+    items = [
+        {"id": d["id"], "title": d["title"], "slug": d["slug"], "category": d["category"]}
+        for d in docs
+    ]
+    # ETag del resultado (la versión del índice es un contador por worker: no sirve entre workers)
+    etag = make_etag("suggest", fuzzy, *(f"{i['id']}:{i['title']}:{i['slug']}:{i['category']}" for i in items))
+    cached = not_modified(etag, None, ["publications"])
+    if cached:
+        return cached
+    return cacheable(jsonify({"items": items, "fuzzy": fuzzy}), etag, None, ["publications"])
+
+
+def _build_trending(limit, window_days, half_life_days, order):
+    """
+    Ranking desde los contadores diarios ya persistidos, en una consulta agrupada:
+    score = Σ vistas_del_día × 0.5^(antigüedad_en_días / half_life)
+    Los pesos por día se calculan aquí y van como CASE (portable PostgreSQL/SQLite)
+    """
+    today = datetime.utcnow().date()
+    weights = {today - timedelta(days=age): 0.5 ** (age / half_life_days) for age in range(window_days)}
+    views = func.sum(PublicationView.views).label("views")
+    score = func.sum(PublicationView.views * case(weights, value=PublicationView.day, else_=0)).label("score")
+
+    rows = db.session.query(
+        Publication.id, Publication.title, Publication.slug, Publication.image_url, views, score
+    ).join(PublicationView, PublicationView.publication_id == Publication.id)\
+     .filter(Publication.status == "Publicado", PublicationView.day > today - timedelta(days=window_days))\
+     .group_by(Publication.id, Publication.title, Publication.slug, Publication.image_url)\
+     .order_by((views if order == "views" else score).desc())\
+     .limit(limit).all()
+
+    return [
+        {
+            "id": r.id,
+            "title": r.title,
+            "slug": r.slug,
+            "image_url": r.image_url,
+            "views": int(r.views),
+            "score": round(float(r.score), 2)
+        }
+        for r in rows
+    ]
+
+
+@bp.route("/trending", methods=["GET"])
+def trending_publications():
+    """
+    GET /api/publicaciones/trending?limit=5&days=14&order=score|views
+    - order=score (default): tendencia, vistas recientes pesan más (decaimiento exponencial)
+    - order=views: más leídas de la ventana
+    Cacheado en memoria (los contadores se escriben en lotes, no cambian por request)
+    """
+    limit = _int_arg("limit", 5, 1, 50)
+    window_days = _int_arg("days", current_app.config.get("TRENDING_WINDOW_DAYS", 14), 1, 365)
+    if limit is None or window_days is None:
+        return jsonify({"msg": "limit y days deben ser números enteros"}), 400
+    order = "views" if request.args.get("order") == "views" else "score"
+    half_life = current_app.config.get("TRENDING_HALF_LIFE_DAYS", 3)
+
+    items = cache.get_or_set(
+        f"publications:trending:{limit}:{window_days}:{order}",
+        lambda: _build_trending(limit, window_days, half_life, order),
+        ttl=current_app.config.get("TRENDING_CACHE_TTL", 300),
+        tags=["publications"]
+    )
+    response = jsonify({"items": items, "days": window_days, "order": order})
+    response.headers["Cache-Control"] = "public, max-age=60"
+    return response
 
 
 @bp.route("/<int:pub_id>", methods=["GET"])
 def get_publication(pub_id):
     """GET /api/publicaciones/<id> - Obtiene una publicación por ID"""
+    # Validador barato: solo se lee updated_at; la fila completa se carga si cambió
+    version = db.session.query(Publication.updated_at).filter(Publication.id == pub_id).first()
+    if version is None:
+        abort(404)
+    # Vista contada en memoria (sin I/O); se persiste en lotes
+    record_view(pub_id)
+
+    etag = make_etag("publication", pub_id, version.updated_at)
+    keys = ["publications", f"publication-{pub_id}"]
+    cached = not_modified(etag, version.updated_at, keys)
+    if cached:
+        return cached
+
     pub = Publication.query.get_or_404(pub_id)
     data = {
         "id": pub.id,
         "title": pub.title,
         "slug": pub.slug,
         "content": pub.content,
+        # HTML precalculado al guardar; filas antiguas sin procesar se sanitizan al leer
+        # (nunca devolver `content` crudo en este campo: ver manage.py render_content)
+        "content_html": pub.content_html if pub.content_html is not None else render_html(pub.content),
+        "reading_time": pub.reading_time,
         "excerpt": pub.excerpt,
         "author_id": pub.author_id,
         "category_id": pub.category_id,
@@ -82,7 +258,9 @@ def get_publication(pub_id):
         "created_at": pub.created_at.isoformat() if pub.created_at else None,
         "updated_at": pub.updated_at.isoformat() if pub.updated_at else None
     }
-    return jsonify(data)
+    if pub.category_id:
+        keys.append(f"category-{pub.category_id}")
+    return cacheable(jsonify(data), etag, pub.updated_at, keys)
 
 
 @bp.route("", methods=["POST"])
@@ -100,13 +278,19 @@ def create_publication(current_user):
     
     # Usar el ID del usuario autenticado como autor
     author_id = current_user.id
+
+    # Render + sanitización una sola vez (al escribir)
+    processed = process_content(content)
     
     # Crear publicación
     pub = Publication(
         title=title,
         slug=data.get("slug", title.lower().replace(" ", "-")),
         content=content,
-        excerpt=data.get("excerpt"),
+        content_html=processed["content_html"],
+        content_text=processed["content_text"],
+        reading_time=processed["reading_time"],
+        excerpt=data.get("excerpt") or processed["excerpt"],  # Excerpt automático si no viene
         author_id=author_id,
         category_id=data.get("category_id"),
         image_url=data.get("image_url")
@@ -114,6 +298,8 @@ def create_publication(current_user):
     
     db.session.add(pub)
     db.session.commit()
+    purge_surrogate_keys("publications", f"publication-{pub.id}", f"category-{pub.category_id}" if pub.category_id else None)
+    publish_event("publication.created", {"id": pub.id, "title": pub.title, "status": pub.status})
     
     return jsonify({
         "id": pub.id,
@@ -129,6 +315,7 @@ def update_publication(current_user, pub_id):
     """PUT /api/publicaciones/<id> - Actualiza una publicación (solo admins)"""
     pub = Publication.query.get_or_404(pub_id)
     data = request.json or {}
+    old_category_id = pub.category_id
     
     # Actualizar campos si vienen en el request
     if "title" in data:
@@ -136,9 +323,17 @@ def update_publication(current_user, pub_id):
     if "slug" in data:
         pub.slug = data["slug"]
     if "content" in data:
+        # Si el excerpt actual era el automático, se regenera con el nuevo contenido
+        auto_excerpt = not pub.excerpt or (pub.content_text and pub.excerpt == make_excerpt(pub.content_text))
+        processed = process_content(data["content"])
         pub.content = data["content"]
+        pub.content_html = processed["content_html"]
+        pub.content_text = processed["content_text"]
+        pub.reading_time = processed["reading_time"]
+        if auto_excerpt and "excerpt" not in data:
+            pub.excerpt = processed["excerpt"]
     if "excerpt" in data:
-        pub.excerpt = data["excerpt"]
+        pub.excerpt = data["excerpt"] or (make_excerpt(pub.content_text) if pub.content_text else None)
     if "author_id" in data:
         pub.author_id = data["author_id"]
     if "category_id" in data:
@@ -147,6 +342,13 @@ def update_publication(current_user, pub_id):
         pub.image_url = data["image_url"]
     
     db.session.commit()
+    purge_surrogate_keys(
+        "publications",
+        f"publication-{pub.id}",
+        f"category-{old_category_id}" if old_category_id else None,
+        f"category-{pub.category_id}" if pub.category_id else None
+    )
+    publish_event("publication.updated", {"id": pub.id, "title": pub.title, "status": pub.status})
     
     return jsonify({
         "id": pub.id,
@@ -161,6 +363,9 @@ def update_publication(current_user, pub_id):
 def delete_publication(current_user, pub_id):
     """DELETE /api/publicaciones/<id> - Elimina una publicación (solo admins)"""
     pub = Publication.query.get_or_404(pub_id)
+    category_id = pub.category_id
     db.session.delete(pub)
     db.session.commit()
+    purge_surrogate_keys("publications", f"publication-{pub_id}", f"category-{category_id}" if category_id else None)
+    publish_event("publication.deleted", {"id": pub_id})
     return jsonify({"msg": "publicación eliminada"})
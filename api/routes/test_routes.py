@@ -4,6 +4,7 @@ Test endpoint para verificar creación de categoría sin JWT
 from flask import Blueprint, request, jsonify
 from extensions import db
 from models.category import Category
+from utils.http_cache import purge_surrogate_keys
 
 bp = Blueprint("test", __name__, url_prefix="/api/test")
 
@@ -29,6 +30,7 @@ def test_create_categoria():
     
     db.session.add(c)
     db.session.commit()
+    purge_surrogate_keys("categories", f"category-{c.id}")
     
     return jsonify({
         "id": c.id,
@@ -1,23 +1,26 @@
 """
 Rutas API para gestión de Usuarios (CRUD completo)
-Endpoints: GET /api/usuarios, POST /api/usuarios, PUT/DELETE /api/usuarios/<id>
+Endpoints: GET /api/usuarios, POST /api/usuarios, PUT/DELETE /api/usuarios/<id>,
+POST /api/usuarios/<id>/revocar-sesiones
 
 Permisos:
 - Todos los endpoints: Solo admins (@admin_required)
 - No hay registro público de usuarios (solo admins crean usuarios)
+- Eliminar un usuario o cambiar su rol/contraseña revoca sus tokens vigentes
 """
 from flask import Blueprint, request, jsonify
 from extensions import db
 from models.user import User
-from werkzeug.security import generate_password_hash
 from utils.decorators import admin_required, superadmin_required, public_endpoint
+from utils.passwords import hash_password
+from utils.token_revocation import revoke_all_for_user
 
 bp = Blueprint("usuarios", __name__, url_prefix="/api/usuarios")
 
 
 @bp.route("", methods=["GET"])
 @admin_required
-def list_usuarios():
+def list_usuarios(current_user):
     """GET /api/usuarios - Lista todos los usuarios (solo admins)"""
     users = User.query.all()
     data = [u.to_dict() for u in users]
@@ -53,7 +56,7 @@ def create_usuario(current_user):
         return jsonify({"msg": "email ya registrado"}), 400
     
     # Crear usuario con password hasheada
-    hashed = generate_password_hash(password)
+    hashed = hash_password(password)
     u = User(email=email, password_hash=hashed, name=name, role=role)
     db.session.add(u)
     db.session.commit()
@@ -62,7 +65,7 @@ def create_usuario(current_user):
 
 @bp.route("/<int:user_id>", methods=["PUT"])
 @admin_required
-def update_usuario(user_id):
+def update_usuario(current_user, user_id):
     """PUT /api/usuarios/<id> - Actualiza un usuario (requiere JWT)"""
     u = User.query.get_or_404(user_id)
     data = request.json or {}
@@ -72,13 +75,19 @@ def update_usuario(user_id):
         if data["email"] != u.email and User.query.filter_by(email=data["email"]).first():
             return jsonify({"msg": "email ya registrado"}), 400
         u.email = data["email"]
+    revoke = False
     if "password" in data and data.get("password"):
-        u.password_hash = generate_password_hash(data.get("password"))
+        u.password_hash = hash_password(data.get("password"))
+        revoke = True
     if "name" in data:
         u.name = data.get("name")
     if "role" in data:
+        revoke = revoke or data.get("role") != u.role
         u.role = data.get("role")
     
+    # Cambio de rol o contraseña: los tokens ya emitidos dejan de valer
+    if revoke:
+        revoke_all_for_user(u.id)
     db.session.commit()
     return jsonify(u.to_dict())
 
@@ -98,6 +107,17 @@ def delete_usuario(current_user, user_id):
         return jsonify({"msg": "No se puede eliminar al superadmin"}), 403
     
     db.session.delete(u)
+    revoke_all_for_user(user_id)
     db.session.commit()
     return jsonify({"msg": "usuario eliminado"})
 
+
+@bp.route("/<int:user_id>/revocar-sesiones", methods=["POST"])
+@superadmin_required
+def revocar_sesiones(current_user, user_id):
+    """POST /api/usuarios/<id>/revocar-sesiones - Revoca todos los tokens del usuario (requiere JWT superadmin)"""
+    u = User.query.get_or_404(user_id)
+    revoke_all_for_user(u.id)
+    db.session.commit()
+    return jsonify({"msg": "sesiones revocadas"})
+
@@ -0,0 +1,64 @@
+"""
+Fixtures compartidas de los tests (SQLite temporal, sin servicios externos)
+Ejecutar desde api/: python -m pytest -q
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret-key-de-al-menos-32-bytes")
+os.environ.setdefault("ENABLE_MIGRATIONS", "0")
+
+import pytest
+from werkzeug.security import generate_password_hash
+from config import DevelopmentConfig
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Configuración de prueba (cada test puede ajustar atributos antes de crear la app)"""
+
+    class TestConfig(DevelopmentConfig):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        SQLALCHEMY_BINDS = {}
+        JWT_SECRET_KEY = os.environ["JWT_SECRET_KEY"]
+        SECRET_KEY = "test-secret"
+        INVALIDATION_BUS_ENABLED = False
+        INVALIDATION_SOCKET_DIR = str(tmp_path / "sockets")
+        SLOW_QUERY_MS = 0
+        PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"  # Rápido: los tests no miden el hash
+
+    return TestConfig
+
+
+@pytest.fixture
+def app(config):
+    from app import create_app
+    from extensions import db
+    from models.user import User
+
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(email="admin@test.com", password_hash=generate_password_hash("pw"),
+                            name="Admin", role="superadmin"))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    response = client.post("/api/administracion/login", json={"email": "admin@test.com", "password": "pw"})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json['access_token']}"}
@@ -0,0 +1,45 @@
+"""
+Sesiones: logout con el refresh token y validación de PASSWORD_HASH_METHOD
+"""
+from datetime import timedelta
+
+import pytest
+
+
+def _login(client):
+    response = client.post("/api/administracion/login", json={"email": "admin@test.com", "password": "pw"})
+    assert response.status_code == 200
+    return response.json
+
+
+def _bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_logout_with_refresh_token_after_access_expired(app, client):
+    app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(seconds=-1)  # Access ya vencido (sesión inactiva)
+    tokens = _login(client)
+    assert client.get("/api/dashboard/stats", headers=_bearer(tokens["access_token"])).status_code == 401
+
+    response = client.post("/api/administracion/logout", headers=_bearer(tokens["refresh_token"]))
+
+    assert response.status_code == 200
+    assert client.post("/api/administracion/refresh", headers=_bearer(tokens["refresh_token"])).status_code == 401
+
+
+def test_logout_with_refresh_token_also_revokes_access_token(client):
+    tokens = _login(client)
+
+    response = client.post("/api/administracion/logout", headers=_bearer(tokens["refresh_token"]),
+                           json={"access_token": tokens["access_token"]})
+
+    assert response.status_code == 200
+    assert client.get("/api/dashboard/stats", headers=_bearer(tokens["access_token"])).status_code == 401
+
+
+def test_invalid_password_hash_method_fails_at_startup(config):
+    from app import create_app
+
+    config.PASSWORD_HASH_METHOD = "bogus"
+    with pytest.raises(ValueError, match="PASSWORD_HASH_METHOD"):
+        create_app(config)
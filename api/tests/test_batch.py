@@ -0,0 +1,37 @@
+"""
+Batch (routes/batch_routes.py): aislamiento de `g` entre sub-requests y el batch
+"""
+from flask import g, jsonify, request
+
+
+def test_sub_requests_do_not_share_g(app, client):
+    parent_marker = []
+
+    def probe():
+        seen = g.get("marker")
+        g.marker = request.args.get("v")
+        return jsonify({"seen": seen, "request_id": g.get("request_id")})
+
+    def capture(exc):
+        if request.path == "/api/batch":
+            parent_marker.append(g.get("marker"))
+
+    app.add_url_rule("/api/_probe", "probe", probe)
+    app.teardown_request(capture)
+
+    response = client.post("/api/batch", json={"requests": [
+        {"id": "a", "path": "/api/_probe?v=a"},
+        {"id": "b", "path": "/api/_probe?v=b"},
+    ]})
+
+    bodies = {item["id"]: item["body"] for item in response.json["responses"]}
+    assert bodies["a"]["seen"] is None and bodies["b"]["seen"] is None
+    assert parent_marker == [None]
+    # El X-Request-ID del batch se reenvía: misma correlación en los logs
+    assert bodies["a"]["request_id"] == bodies["b"]["request_id"] == response.headers.get("X-Request-ID")
+
+
+def test_sub_requests_still_read_the_database(client):
+    response = client.post("/api/batch", json={"requests": [{"id": "cats", "path": "/api/categorias"}]})
+
+    assert response.json["responses"][0]["status"] == 200
@@ -0,0 +1,173 @@
+"""
+Proxy de imágenes externas (utils/image_proxy.py) contra un servidor HTTP local
+"""
+import io
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode
+
+import pytest
+
+PIL = pytest.importorskip("PIL.Image")
+
+
+def _png(width=1280, height=640):
+    output = io.BytesIO()
+    PIL.new("RGB", (width, height), (200, 30, 30)).save(output, "PNG")
+    return output.getvalue()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    routes = {}
+    hits = {}
+
+    def do_GET(self):
+        _StubHandler.hits[self.path] = _StubHandler.hits.get(self.path, 0) + 1
+        status, content_type, body = _StubHandler.routes.get(self.path, (404, "text/plain", b"no"))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    _StubHandler.routes = {
+        "/foto.png": (200, "image/png", _png()),
+        "/logo.svg": (200, "image/svg+xml", b"<svg xmlns='http://www.w3.org/2000/svg'><script>alert(1)</script></svg>"),
+        "/pagina.html": (200, "text/html", b"<html></html>"),
+    }
+    _StubHandler.hits = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def config(config, tmp_path):
+    config.IMAGE_PROXY_ENABLED = True
+    config.IMAGE_PROXY_ALLOW_PRIVATE = True
+    config.IMAGE_PROXY_CACHE_DIR = str(tmp_path / "proxy-cache")
+    config.OUTBOUND_BREAKER_FAILURES = 2
+    return config
+
+
+@pytest.fixture(autouse=True)
+def _reset_singletons():
+    """La caché y los proveedores son por proceso: cada test empieza limpio"""
+    from utils import image_proxy, outbound
+    image_proxy._cache = None
+    outbound._providers.clear()
+    yield
+    image_proxy._cache = None
+    outbound._providers.clear()
+
+
+def _proxy_path(app, url, width=None):
+    from utils.image_proxy import proxy_url
+    with app.test_request_context():
+        return proxy_url(url, width)
+
+
+def _closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_fetches_once_and_serves_from_cache(app, client, stub):
+    url = f"http://127.0.0.1:{stub.server_port}/foto.png"
+    path = _proxy_path(app, url)
+
+    first = client.get(path)
+    second = client.get(path)
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.mimetype == "image/png"
+    assert first.data == second.data
+    assert _StubHandler.hits["/foto.png"] == 1
+    assert "immutable" in first.headers["Cache-Control"]
+    assert first.headers["Content-Security-Policy"] == "default-src 'none'; sandbox"
+
+
+def test_resized_variant_from_cached_original(app, client, stub):
+    url = f"http://127.0.0.1:{stub.server_port}/foto.png"
+    client.get(_proxy_path(app, url))
+
+    response = client.get(_proxy_path(app, url, 640))
+
+    assert response.status_code == 200
+    with PIL.open(io.BytesIO(response.data)) as image:
+        assert image.size == (640, 320)
+    assert _StubHandler.hits["/foto.png"] == 1
+
+
+def test_resized_variant_from_public_item_json(app, client, stub):
+    from extensions import db
+    from models.gallery_item import GalleryItem
+
+    with app.app_context():
+        item = GalleryItem(title="Foto", url=f"http://127.0.0.1:{stub.server_port}/foto.png")
+        db.session.add(item)
+        db.session.commit()
+        item_id = item.id
+
+    proxied = client.get(f"/api/galeria/{item_id}").json["proxy_url"]
+    response = client.get(proxied + "&w=640")
+
+    assert response.status_code == 200
+    with PIL.open(io.BytesIO(response.data)) as image:
+        assert image.width == 640
+    assert client.get(proxied + "&w=123").status_code == 400
+
+
+def test_etag_revalidation_returns_304(app, client, stub):
+    path = _proxy_path(app, f"http://127.0.0.1:{stub.server_port}/foto.png")
+    etag = client.get(path).headers["ETag"]
+
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_rejects_bad_signature_and_width(app, client, stub):
+    url = f"http://127.0.0.1:{stub.server_port}/foto.png"
+
+    forged = "/api/galeria/proxy?" + urlencode({"url": url, "sig": "0" * 32})
+    assert client.get(forged).status_code == 403
+    unsigned_width = _proxy_path(app, url) + "&w=123"
+    assert client.get(unsigned_width).status_code == 400
+
+
+@pytest.mark.parametrize("route", ["/logo.svg", "/pagina.html"])
+def test_only_raster_images_are_served(app, client, stub, route):
+    response = client.get(_proxy_path(app, f"http://127.0.0.1:{stub.server_port}{route}"))
+
+    assert response.status_code == 415
+
+
+def test_dead_host_does_not_open_breaker_for_other_hosts(app, client, stub):
+    dead = _proxy_path(app, f"http://127.0.0.1:{_closed_port()}/foto.png")
+    for _ in range(3):
+        assert client.get(dead).status_code in (502, 503)
+    assert client.get(dead).status_code == 503  # Circuito abierto para ese host
+
+    alive = _proxy_path(app, f"http://localhost:{stub.server_port}/foto.png")
+    assert client.get(alive).status_code == 200
+
+
+def test_default_cache_dir_is_not_publicly_served(app, config):
+    from utils.image_proxy import get_cache
+
+    config.IMAGE_PROXY_CACHE_DIR = None
+    app.config["IMAGE_PROXY_CACHE_DIR"] = None
+    with app.app_context():
+        directory = get_cache().directory
+
+    uploads = app.root_path + "/uploads"
+    assert not directory.startswith(uploads)
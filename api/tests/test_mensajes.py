@@ -0,0 +1,64 @@
+"""
+Mensajes de contacto (routes/mensajes_routes.py): reenvíos y near-duplicates entre remitentes
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+TEMPLATE = ("Buenos días quisiera información sobre la matrícula para el próximo año escolar de mi hijo "
+            "en el nivel secundaria y los requisitos que debo presentar en la oficina")
+
+
+@pytest.fixture(autouse=True)
+def _no_emails(monkeypatch):
+    from utils import notifications
+    monkeypatch.setattr(notifications, "send_contact_notification", lambda **kwargs: {"success": True})
+
+
+def _send(client, email, message=TEMPLATE, name="Ana"):
+    return client.post("/api/mensajes_contacto", json={"name": name, "email": email, "message": message})
+
+
+def test_same_sender_resend_is_collapsed(client):
+    first = _send(client, "ana@example.com")
+    again = _send(client, "Ana+form@example.com", TEMPLATE + " gracias")
+
+    assert first.status_code == 201
+    assert again.status_code == 200 and again.json["duplicate"] is True
+    assert again.json["id"] == first.json["id"]
+
+
+def test_other_sender_near_duplicate_is_kept_and_flagged(app, client):
+    from models.contact_message import ContactMessage
+
+    first = _send(client, "ana@example.com")
+    other = _send(client, "luis@example.com", TEMPLATE + " gracias", name="Luis")
+    third = _send(client, "rosa@example.com", TEMPLATE, name="Rosa")
+
+    assert other.status_code == 201 and third.status_code == 201
+    assert len({first.json["id"], other.json["id"], third.json["id"]}) == 3
+    with app.app_context():
+        rows = {m.email: m for m in ContactMessage.query}
+        assert rows["luis@example.com"].name == "Luis"
+        assert {m.spam_cluster_id for m in rows.values()} == {first.json["id"]}
+        assert all(m.duplicate_count == 0 for m in rows.values())
+
+
+def test_short_near_duplicate_from_other_sender_is_not_flagged(app, client):
+    from models.contact_message import ContactMessage
+
+    _send(client, "ana@example.com", "Hola quisiera información")
+    _send(client, "luis@example.com", "Hola quisiera información!")
+
+    with app.app_context():
+        assert ContactMessage.query.filter(ContactMessage.spam_cluster_id.isnot(None)).count() == 0
+
+
+def test_dedup_does_not_import_suggest_index():
+    """utils.suggest carga el modelo Publication y registra un handler de purga"""
+    code = "import sys, utils.dedup; print('utils.suggest' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,41 @@
+"""
+Notificaciones de contacto (utils/notifications.py): mensajes anteriores al digest
+"""
+from datetime import datetime, timedelta
+
+
+def _message(created_at, notified_at=None):
+    from models.contact_message import ContactMessage
+    return ContactMessage(name="Ana", email="ana@example.com", message="Hola", created_at=created_at,
+                          notified_at=notified_at)
+
+
+def test_historical_unnotified_rows_do_not_trigger_digest(app):
+    from extensions import db
+    from utils.notifications import digest_due
+
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.add_all([_message(now - timedelta(days=400)), _message(now - timedelta(days=30))])
+        db.session.commit()
+
+        assert not digest_due(now)
+
+        db.session.add(_message(now - timedelta(minutes=10)))
+        db.session.commit()
+        assert digest_due(now)
+
+
+def test_backfill_marks_old_rows_as_notified(app):
+    from extensions import db
+    from models.contact_message import ContactMessage
+    from utils.notifications import backfill_notified
+
+    created = datetime(2024, 3, 1, 10, 0)
+    with app.app_context():
+        db.session.add_all([_message(created), _message(created, notified_at=created + timedelta(hours=1))])
+        db.session.commit()
+
+        assert backfill_notified() == 1
+        assert ContactMessage.query.filter(ContactMessage.notified_at.is_(None)).count() == 0
+        assert {m.notified_at for m in ContactMessage.query} == {created, created + timedelta(hours=1)}
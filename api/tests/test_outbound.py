@@ -0,0 +1,181 @@
+"""
+Llamadas salientes (utils/outbound.py) contra un servidor HTTP falso local:
+Resend (RESEND_API_URL) y Cloudinary (CLOUDINARY_UPLOAD_PREFIX)
+"""
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import outbound
+from utils.outbound import Provider, ProviderUnavailable
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    status = 200
+    body = {}
+    delay = 0
+    requests = []
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        _FakeHandler.requests.append((self.path, dict(self.headers), self.rfile.read(length)))
+        if _FakeHandler.delay:
+            time.sleep(_FakeHandler.delay)
+        payload = json.dumps(_FakeHandler.body).encode("utf-8")
+        try:
+            self.send_response(_FakeHandler.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except OSError:
+            pass  # El cliente cortó por timeout
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake():
+    _FakeHandler.status, _FakeHandler.body, _FakeHandler.delay = 200, {"id": "email-1"}, 0
+    _FakeHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def config(config):
+    config.OUTBOUND_BREAKER_FAILURES = 3
+    config.OUTBOUND_BREAKER_RESET = 30
+    config.OUTBOUND_READ_TIMEOUT = 0.3
+    return config
+
+
+@pytest.fixture(autouse=True)
+def _reset_providers():
+    outbound._providers.clear()
+    yield
+    outbound._providers.clear()
+
+
+def _send(app, fake):
+    from utils.email import _send_email
+
+    app.config["RESEND_API_URL"] = f"http://127.0.0.1:{fake.server_port}"
+    with app.app_context():
+        return _send_email("re_test", "admin@test.com", "Asunto", "<p>Hola</p>")
+
+
+def test_resend_success_against_fake_server(app, fake):
+    result = _send(app, fake)
+
+    assert result["success"] is True and result["email_id"] == "email-1"
+    path, headers, body = _FakeHandler.requests[0]
+    assert path == "/emails"
+    assert headers["Authorization"] == "Bearer re_test"
+    assert json.loads(body)["to"] == ["admin@test.com"]
+
+
+def test_breaker_opens_after_configured_failures(app, fake):
+    _FakeHandler.status = 500
+
+    for _ in range(3):
+        assert _send(app, fake)["success"] is False
+    result = _send(app, fake)
+
+    assert "no disponible" in result["error"]
+    assert len(_FakeHandler.requests) == 3  # La cuarta falló rápido, sin llamar al servidor
+    assert outbound.get_provider("resend").breaker.state == "open"
+
+
+def test_client_errors_do_not_open_breaker(app, fake):
+    _FakeHandler.status = 422
+
+    for _ in range(5):
+        assert _send(app, fake)["success"] is False
+
+    assert len(_FakeHandler.requests) == 5
+    assert outbound.get_provider("resend").breaker.state == "closed"
+
+
+def test_timeout_is_reported_and_counts_as_failure(app, fake):
+    _FakeHandler.delay = 1.0
+
+    result = _send(app, fake)
+
+    assert result["success"] is False and "conexión" in result["error"]
+    provider = outbound.get_provider("resend")
+    assert provider.failures == 1
+    assert provider.breaker._failures == 1
+
+
+def test_half_open_probe_closes_breaker_on_success():
+    provider = Provider("prueba", failure_threshold=1, reset_timeout=0.05)
+    with pytest.raises(ConnectionError):
+        with provider.guard():
+            raise ConnectionError("caído")
+    assert provider.breaker.state == "open"
+
+    time.sleep(0.06)
+    with provider.guard():
+        pass
+
+    assert provider.breaker.state == "closed"
+
+
+def test_bulkhead_rejects_calls_over_the_limit():
+    provider = Provider("prueba", max_concurrent=1)
+
+    with provider.guard():
+        with pytest.raises(ProviderUnavailable):
+            with provider.guard():
+                pass
+
+    assert provider.rejected == 1
+    with provider.guard():
+        pass  # Al salir la primera se libera el lugar
+
+
+@pytest.fixture
+def cloudinary_fake(app, fake, monkeypatch):
+    cloudinary = pytest.importorskip("cloudinary")
+    for key, value in (("CLOUDINARY_CLOUD_NAME", "demo"), ("CLOUDINARY_API_KEY", "123"),
+                       ("CLOUDINARY_API_SECRET", "secreto")):
+        monkeypatch.setenv(key, value)
+    app.config["CLOUDINARY_UPLOAD_PREFIX"] = f"http://127.0.0.1:{fake.server_port}"
+    monkeypatch.setattr(outbound, "_cloudinary_configured", False)
+    yield fake
+    cloudinary.reset_config()
+
+
+def test_cloudinary_upload_against_fake_server(app, cloudinary_fake):
+    from utils.upload import upload_to_cloudinary
+
+    _FakeHandler.body = {"secure_url": "https://res.cloudinary.com/demo/image/upload/x.png",
+                         "public_id": "colegio/x", "resource_type": "image"}
+    with app.app_context():
+        result = upload_to_cloudinary(io.BytesIO(b"\x89PNG fake"), folder="colegio")
+
+    assert result["public_id"] == "colegio/x"
+    assert _FakeHandler.requests[0][0] == "/v1_1/demo/auto/upload"
+
+
+def test_cloudinary_server_errors_open_breaker(app, cloudinary_fake):
+    from utils.upload import upload_to_cloudinary
+
+    _FakeHandler.status, _FakeHandler.body = 500, {"error": {"message": "boom"}}
+    with app.app_context():
+        for _ in range(3):
+            with pytest.raises(Exception, match="Error subiendo a Cloudinary"):
+                upload_to_cloudinary(io.BytesIO(b"x"))
+        with pytest.raises(Exception, match="no disponible"):
+            upload_to_cloudinary(io.BytesIO(b"x"))
+
+    assert len(_FakeHandler.requests) == 3
@@ -0,0 +1,89 @@
+"""
+Datos sintéticos (utils/synthetic_data.py): claves foráneas propias, firmas MinHash y re-ejecución
+"""
+import pytest
+
+from utils.synthetic_data import SyntheticDataExists, generate, purge_synthetic
+
+COUNTS = {"categories": 3, "users": 2, "publications": 40, "gallery": 5, "messages": 20}
+
+
+def test_publications_only_reference_rows_from_this_run(app):
+    from extensions import db
+    from models.category import Category
+    from models.publication import Publication
+    from models.user import User
+
+    with app.app_context():
+        db.session.add(Category(name="Real", slug="real"))
+        db.session.commit()
+        generate(COUNTS, batch_size=7)
+
+        synthetic_categories = {c.id for c in Category.query.filter(Category.slug.like("syn-%"))}
+        synthetic_users = {u.id for u in User.query.filter(User.email.like("%@datos-sinteticos.test"))}
+        publications = Publication.query.all()
+
+        assert len(publications) == COUNTS["publications"]
+        assert {p.author_id for p in publications} <= synthetic_users
+        assert {p.category_id for p in publications} - {None} <= synthetic_categories
+
+
+def test_messages_have_minhash(app):
+    from models.contact_message import ContactMessage
+
+    with app.app_context():
+        generate(COUNTS)
+
+        assert ContactMessage.query.filter(ContactMessage.minhash.is_(None)).count() == 0
+
+
+def test_rerun_without_purge_fails_before_inserting(app):
+    from models.publication import Publication
+
+    with app.app_context():
+        generate(COUNTS)
+        with pytest.raises(SyntheticDataExists):
+            generate(COUNTS)
+        assert Publication.query.count() == COUNTS["publications"]
+
+        purge_synthetic()
+        assert generate(COUNTS)["publicaciones"] == COUNTS["publications"]
+
+
+def test_synthetic_users_cannot_log_in(app, client):
+    from models.user import User
+
+    with app.app_context():
+        generate(COUNTS)
+        email = User.query.filter(User.email.like("%@datos-sinteticos.test")).first().email
+
+    for password in ("sintetico123", "!", ""):
+        response = client.post("/api/administracion/login", json={"email": email, "password": password})
+        assert response.status_code in (400, 401)
+
+
+@pytest.mark.parametrize("uri, local", [
+    ("sqlite:////tmp/x.db", True),
+    ("postgresql://u:p@localhost:5432/colegio", True),
+    ("postgresql://u:p@db.example.com:5432/colegio", False),
+])
+def test_is_local_database(uri, local):
+    from utils.synthetic_data import is_local_database
+
+    assert is_local_database(uri) is local
+
+
+def test_generate_data_refuses_production_without_flag(app, monkeypatch):
+    from click.testing import CliRunner
+    import manage
+    from models.publication import Publication
+
+    app.config["FLASK_ENV"] = "production"
+    monkeypatch.setattr(manage, "_app", app)
+
+    result = CliRunner().invoke(manage.cli, ["generate_data", "--publications", "5", "--messages", "0",
+                                             "--gallery", "0"])
+
+    assert result.exit_code != 0 and "--i-know" in result.output
+    with app.app_context():
+        assert Publication.query.count() == 0
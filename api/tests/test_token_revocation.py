@@ -0,0 +1,119 @@
+"""
+Revocación de tokens (utils/token_revocation.py): filtro de Bloom, corte por
+usuario y propagación entre workers (dos RevocationList = dos procesos)
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.token_revocation import BloomFilter, RevocationList, revoke_all_for_user, revoke_token
+
+
+def _payload(user_id=1, jti=None, iat=None):
+    now = int(datetime.utcnow().timestamp())
+    return {"sub": str(user_id), "jti": jti or uuid.uuid4().hex, "iat": now if iat is None else iat,
+            "exp": now + 900}
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    values = [uuid.uuid4().hex for _ in range(1000)]
+    for value in values:
+        bloom.add(value)
+
+    assert all(value in bloom for value in values)
+
+
+def test_bloom_filter_false_positive_rate_near_target():
+    bloom = BloomFilter(2000, 0.01)
+    for _ in range(2000):
+        bloom.add(uuid.uuid4().hex)
+
+    probes = 20000
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(probes))
+    assert false_positives / probes < 0.03
+
+
+def test_revoked_jti_is_rejected_and_others_accepted(app):
+    from extensions import db
+
+    revoked, other = _payload(), _payload()
+    revocations = RevocationList()
+    with app.app_context():
+        revoke_token(revoked)
+        db.session.commit()
+
+        assert revocations.is_revoked(revoked)
+        assert not revocations.is_revoked(other)
+
+
+def test_user_cutoff_only_affects_tokens_issued_before(app):
+    from extensions import db
+
+    revocations = RevocationList()
+    with app.app_context():
+        before = _payload(user_id=7, iat=int(datetime.utcnow().timestamp()) - 60)
+        revoke_all_for_user(7)
+        db.session.commit()
+        after = _payload(user_id=7, iat=int(datetime.utcnow().timestamp()) + 2)
+        other_user = _payload(user_id=8, iat=before["iat"])
+
+        assert revocations.is_revoked(before)
+        assert not revocations.is_revoked(after)
+        assert not revocations.is_revoked(other_user)
+
+
+def test_revocation_propagates_to_other_worker(app):
+    from extensions import db
+
+    worker_a, worker_b = RevocationList(), RevocationList()
+    token = _payload()
+    with app.app_context():
+        assert not worker_b.is_revoked(token)  # Carga inicial de B
+
+        revoke_token(token)
+        db.session.commit()
+        worker_b.mark_dirty(["token-revocations"])  # Aviso del bus de invalidación
+
+        assert worker_a.is_revoked(token)
+        assert worker_b.is_revoked(token)
+
+
+def test_out_of_order_commit_is_not_missed(app):
+    """Una fila con id menor al último visto (commit tardío) se ve en la siguiente lectura"""
+    from extensions import db
+    from models.revoked_token import RevokedToken
+
+    worker = RevocationList()
+    late, early = _payload(), _payload()
+    with app.app_context():
+        db.session.add(RevokedToken(id=10, jti=early["jti"], user_id=1,
+                                    expires_at=datetime.utcnow() + timedelta(minutes=15)))
+        db.session.commit()
+        assert worker.is_revoked(early)  # El worker ya vio el id 10
+
+        db.session.add(RevokedToken(id=9, jti=late["jti"], user_id=1,
+                                    expires_at=datetime.utcnow() + timedelta(minutes=15)))
+        db.session.commit()
+        worker.mark_dirty(["token-revocations"])
+
+        assert worker.is_revoked(late)
+
+
+def test_logout_revokes_access_token(client, auth_headers):
+    assert client.get("/api/dashboard/stats", headers=auth_headers).status_code == 200
+
+    assert client.post("/api/administracion/logout", headers=auth_headers).status_code == 200
+
+    response = client.get("/api/dashboard/stats", headers=auth_headers)
+    assert response.status_code == 401
+
+
+@pytest.fixture(autouse=True)
+def _fresh_process_revocations():
+    """La lista compartida del proceso no debe arrastrar estado entre tests (BD nueva por test)"""
+    from utils.token_revocation import revocation_list
+    revocation_list.__init__()
+    yield
+    revocation_list.__init__()
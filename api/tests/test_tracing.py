@@ -0,0 +1,93 @@
+"""
+Trazas (utils/tracing.py): traceparent entrante, rotación del archivo y propagación saliente
+"""
+import pytest
+
+from utils import outbound, tracing
+
+FORCED = "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+
+
+@pytest.fixture
+def config(config, tmp_path):
+    config.TRACING_ENABLED = True
+    config.TRACE_SAMPLE_RATE = 0.0
+    config.TRACE_EXPORT_FILE = str(tmp_path / "traces" / "traces.jsonl")
+    return config
+
+
+@pytest.fixture(autouse=True)
+def _reset_singletons():
+    tracing._forced_samples.__init__()
+    outbound._providers.clear()
+    yield
+    outbound._providers.clear()
+
+
+def test_incoming_traceparent_ignored_by_default(client):
+    response = client.get("/api/categorias", headers={"traceparent": FORCED})
+
+    assert "traceparent" not in response.headers
+
+
+def test_trusted_traceparent_forces_trace_up_to_limit(app, client):
+    app.config["TRACE_TRUST_TRACEPARENT"] = True
+    app.config["TRACE_FORCED_PER_MINUTE"] = 2
+
+    traced = [client.get("/api/categorias", headers={"traceparent": FORCED}).headers.get("traceparent")
+              for _ in range(3)]
+
+    assert traced[0].startswith("00-" + "a" * 32) and traced[1].startswith("00-" + "a" * 32)
+    assert traced[2] is None
+
+
+def test_export_file_rotates_past_max_size(tmp_path):
+    path = str(tmp_path / "nuevo" / "traces.jsonl")
+
+    tracing._append(path, "x" * 10 + "\n", max_bytes=10)
+    tracing._append(path, "segunda\n", max_bytes=10)
+
+    with open(path) as f:
+        assert f.read() == "segunda\n"
+    with open(path + ".1") as f:
+        assert f.read() == "x" * 10 + "\n"
+
+
+def test_default_export_file_is_under_instance_path(app):
+    from utils.tracing import TraceExporter
+
+    app.config["TRACE_EXPORT_FILE"] = None
+    captured = {}
+    exporter = TraceExporter()
+    exporter._run = lambda target, path, max_bytes, resource: captured.update(path=path)
+    exporter.ensure_started(app)
+
+    assert captured["path"].startswith(app.instance_path)
+
+
+def test_traceparent_only_sent_to_listed_providers(app):
+    app.config["TRACE_PROPAGATE_PROVIDERS"] = "resend"
+    with app.app_context():
+        assert outbound.get_provider("resend").propagate_trace
+        assert not outbound.get_provider("cloudinary").propagate_trace
+        assert not outbound.get_provider("images:example.com").propagate_trace
+
+
+def test_batch_sub_requests_do_not_leak_active_span(app, client):
+    from utils.tracing import current_span, exporter
+
+    app.config["TRACE_SAMPLE_RATE"] = 1.0
+    sampled_before = exporter.sampled
+    response = client.post("/api/batch", json={"requests": [
+        {"id": "cats", "path": "/api/categorias"},
+        {"id": "gal", "path": "/api/galeria"},
+    ]})
+
+    assert response.status_code == 200
+    assert "traceparent" in response.headers
+    assert exporter.sampled == sampled_before + 1  # Una traza: la del batch, con los sub-requests adentro
+    assert current_span() is None
+
+    app.config["TRACE_SAMPLE_RATE"] = 0.0
+    client.get("/api/categorias")
+    assert current_span() is None
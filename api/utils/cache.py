@@ -0,0 +1,83 @@
+# api/utils/cache.py
+"""
+Caché en memoria por proceso (worker) para respuestas costosas de calcular
+- TTL por entrada y tamaño máximo (se descarta la entrada más vieja)
+- Cada entrada lleva tags = surrogate keys (ej: "gallery", "publication-42")
+- Se invalida automáticamente con purge_surrogate_keys() de utils/http_cache.py,
+  que ya llaman todos los handlers de escritura después del commit
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from utils.http_cache import register_purge_handler
+
+
+class LocalCache:
+    """Caché LRU con TTL e invalidación por tags (thread-safe)"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key → (expires_at, value, tags)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Devuelve el valor cacheado o default si no existe / expiró"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value, _tags = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=300, tags=()):
+        """Guarda un valor con TTL (segundos) y tags para invalidación"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value, frozenset(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, key, builder, ttl=300, tags=()):
+        """
+        Devuelve el valor cacheado o lo calcula con builder() y lo guarda
+
+        Uso:
+            data = cache.get_or_set("gallery:facets", build_facets, ttl=600, tags=["gallery"])
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = builder()
+            self.set(key, value, ttl=ttl, tags=tags)
+        return value
+
+    def delete(self, key):
+        """Elimina una entrada"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_tags(self, tags):
+        """Elimina todas las entradas que tengan alguno de los tags indicados"""
+        tags = set(tags)
+        with self._lock:
+            stale = [key for key, (_exp, _val, entry_tags) in self._entries.items() if entry_tags & tags]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        """Vacía el caché"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Instancia compartida por el proceso
+cache = LocalCache()
+
+# Las purgas de surrogate keys (escrituras) invalidan también este caché
+register_purge_handler(cache.invalidate_tags)
@@ -0,0 +1,100 @@
+# api/utils/content.py
+"""
+Procesamiento del contenido de publicaciones al GUARDAR (no al leer)
+- Markdown → HTML (si el contenido no es HTML ya, ej: el editor Tiptap envía HTML)
+- Sanitización del HTML (nh3): elimina <script>, atributos on*, javascript: URLs
+- Texto plano (para búsqueda), excerpt automático y tiempo de lectura
+Los endpoints de lectura devuelven estos valores precalculados.
+"""
+
+import re
+from html.parser import HTMLParser
+
+# Velocidad de lectura promedio (palabras por minuto)
+WORDS_PER_MINUTE = 200
+# Largo máximo del excerpt automático (la columna admite 500)
+EXCERPT_LENGTH = 200
+
+# Contenido que empieza con una etiqueta HTML se trata como HTML
+_LOOKS_LIKE_HTML = re.compile(r"^\s*<[a-zA-Z!/]")
+
+# Etiquetas permitidas además de las default de nh3 (tablas, figuras del editor)
+_EXTRA_TAGS = {"figure", "figcaption"}
+
+
+def render_html(content):
+    """Devuelve HTML sanitizado a partir de Markdown o HTML"""
+    try:
+        import nh3
+    except ImportError:
+        raise Exception("nh3 no instalado. Ejecuta: pip install nh3")
+
+    content = content or ""
+    if not _LOOKS_LIKE_HTML.match(content):
+        try:
+            import markdown
+        except ImportError:
+            raise Exception("markdown no instalado. Ejecuta: pip install Markdown")
+        content = markdown.markdown(content, extensions=["extra", "sane_lists"])
+
+    return nh3.clean(
+        content,
+        tags=nh3.ALLOWED_TAGS | _EXTRA_TAGS,
+        link_rel="noopener noreferrer"
+    )
+
+
+class _TextExtractor(HTMLParser):
+    """Extrae el texto visible de un HTML (separando bloques con espacios)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        self.parts.append(" ")
+
+
+def html_to_text(html):
+    """Texto plano normalizado (espacios simples) de un HTML"""
+    parser = _TextExtractor()
+    parser.feed(html or "")
+    parser.close()
+    # convert_charrefs ya decodificó las entidades: un unescape() extra convertiría "&amp;lt;" en "<"
+    return " ".join("".join(parser.parts).split())
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    """Primeras palabras del texto, cortando en un límite de palabra"""
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(" ", 1)[0]
+    return cut.rstrip(".,;:") + "…"
+
+
+def reading_time(text):
+    """Minutos de lectura estimados (mínimo 1)"""
+    return max(1, round(len(text.split()) / WORDS_PER_MINUTE))
+
+
+def process_content(content):
+    """
+    Procesa el contenido una sola vez al escribir
+
+    Returns:
+        dict con content_html, content_text, excerpt (automático) y reading_time
+    """
+    html = render_html(content)
+    text = html_to_text(html)
+    return {
+        "content_html": html,
+        "content_text": text,
+        "excerpt": make_excerpt(text),
+        "reading_time": reading_time(text)
+    }
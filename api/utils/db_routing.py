@@ -0,0 +1,137 @@
+# api/utils/db_routing.py
+"""
+Enrutamiento de lecturas a una réplica de PostgreSQL (opcional)
+
+Si DATABASE_URL_READ está configurada:
+- Los GET de los blueprints públicos leen de la réplica (bind "read")
+  dentro de transacciones SET TRANSACTION READ ONLY
+- Las sesiones admin (JWT presente) leen siempre del primario (read-your-writes)
+- Si la réplica está caída o con lag > DB_READ_MAX_LAG, se usa el primario
+"""
+
+import threading
+import time
+from flask import g, request, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+# Bind key de la réplica dentro de SQLALCHEMY_BINDS
+READ_BIND_KEY = "read"
+
+# Estado de salud de la réplica (por proceso/worker)
+_replica_state = {"healthy": True, "lag": 0.0, "checked_at": 0.0, "error": None}
+_state_lock = threading.Lock()
+
+
+class RoutingSession(Session):
+    """
+    Sesión de Flask-SQLAlchemy que elige el engine de la réplica
+    cuando el request actual fue marcado como lectura (g.db_read_replica)
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and g.get("db_read_replica"):
+            engine = self._db.engines.get(READ_BIND_KEY)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _make_read_only(engine):
+    """Fuerza que toda transacción en la réplica sea de solo lectura"""
+    if engine.dialect.name == "postgresql":
+        @event.listens_for(engine, "begin")
+        def _set_read_only(conn):
+            conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+    elif engine.dialect.name == "sqlite":
+        # SQLite (tests locales): equivalente por conexión
+        @event.listens_for(engine, "connect")
+        def _set_query_only(dbapi_conn, _record):
+            dbapi_conn.execute("PRAGMA query_only = ON")
+
+
+def _measure_lag(engine):
+    """Devuelve el lag de replicación en segundos (0 si no es una réplica streaming)"""
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            lag = conn.execute(text(
+                "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+            )).scalar()
+            return float(lag or 0)
+        conn.execute(text("SELECT 1"))
+        return 0.0
+
+
+def replica_status(app):
+    """
+    Estado de la réplica, re-chequeado como máximo cada DB_READ_CHECK_INTERVAL segundos.
+    Un solo thread por worker hace el chequeo; el resto usa el último valor.
+    """
+    interval = app.config.get("DB_READ_CHECK_INTERVAL", 5)
+    if time.monotonic() - _replica_state["checked_at"] < interval:
+        return _replica_state
+    if not _state_lock.acquire(blocking=False):
+        return _replica_state
+    try:
+        engine = app.extensions["sqlalchemy"].engines[READ_BIND_KEY]
+        try:
+            lag = _measure_lag(engine)
+            _replica_state.update(
+                healthy=lag <= app.config.get("DB_READ_MAX_LAG", 10),
+                lag=lag,
+                error=None
+            )
+        except Exception as e:
+            _replica_state.update(healthy=False, error=str(e))
+            app.logger.warning(f"Réplica de lectura no disponible, usando primario: {e}")
+        _replica_state["checked_at"] = time.monotonic()
+    finally:
+        _state_lock.release()
+    return _replica_state
+
+
+def mark_replica_unhealthy(error):
+    """Marca la réplica como caída hasta el próximo chequeo (ej: falló una consulta)"""
+    _replica_state.update(healthy=False, error=str(error), checked_at=time.monotonic())
+
+
+def _is_admin_session():
+    """True si el request trae un JWT válido (sesión admin → leer del primario)"""
+    if not request.headers.get("Authorization"):
+        return False
+    try:
+        from flask_jwt_extended import verify_jwt_in_request
+        return verify_jwt_in_request(optional=True) is not None
+    except Exception:
+        return False
+
+
+def init_read_replica(app):
+    """
+    Configura el enrutamiento a la réplica si DATABASE_URL_READ está definida.
+    Se llama desde create_app después de db.init_app(app).
+    """
+    if READ_BIND_KEY not in app.config.get("SQLALCHEMY_BINDS", {}):
+        return
+
+    with app.app_context():
+        _make_read_only(app.extensions["sqlalchemy"].engines[READ_BIND_KEY])
+
+    read_blueprints = set(app.config.get("DB_READ_BLUEPRINTS", ()))
+
+    @app.before_request
+    def _route_reads_to_replica():
+        if request.method != "GET" or request.blueprint not in read_blueprints:
+            return
+        if _is_admin_session():
+            return
+        if replica_status(app)["healthy"]:
+            g.db_read_replica = True
+
+    @app.teardown_request
+    def _detect_replica_failure(exc):
+        # Error de conexión a la réplica → los siguientes requests van al primario
+        if exc is not None and g.get("db_read_replica"):
+            from sqlalchemy.exc import OperationalError, InterfaceError
+            if isinstance(exc, (OperationalError, InterfaceError)):
+                mark_replica_unhealthy(exc)
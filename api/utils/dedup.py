@@ -0,0 +1,81 @@
+# api/utils/dedup.py
+"""
+Huellas de mensajes de contacto para detectar duplicados y spam
+- Exacta: sha256(email normalizado + texto normalizado) → columna indexada
+- Aproximada: firma MinHash de shingles de palabras; la fracción de mínimos
+  iguales entre dos firmas estima la similitud de Jaccard de los textos
+  (detecta reenvíos con pequeñas variaciones: "hola!!" / "Hola", firmas, etc.)
+"""
+
+import hashlib
+import random
+from utils.text import normalize
+
+# Cantidad de funciones hash de la firma (más = estimación más precisa)
+MINHASH_PERMUTATIONS = 64
+# Palabras por shingle
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+# Coeficientes fijos: las firmas guardadas en la BD deben seguir siendo comparables
+_rng = random.Random(20240501)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def normalize_email(email):
+    """Minúsculas, sin espacios y sin sufijo +etiqueta (juan+spam@x.com → juan@x.com)"""
+    email = (email or "").strip().lower()
+    local, _, domain = email.partition("@")
+    return f"{local.split('+', 1)[0]}@{domain}" if domain else email
+
+
+def normalize_text(text):
+    """Palabras en minúsculas, sin tildes ni puntuación"""
+    return " ".join("".join(ch if ch.isalnum() else " " for ch in normalize(text)).split())
+
+
+def content_fingerprint(email, message):
+    """Hash del remitente + contenido normalizados (64 caracteres hex)"""
+    payload = f"{normalize_email(email)}\n{normalize_text(message)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _shingles(text):
+    words = normalize_text(text).split()
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(message):
+    """
+    Firma MinHash del mensaje como texto hex (8 caracteres por permutación)
+    Devuelve None si el mensaje no tiene palabras
+    """
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in _shingles(message)
+    ]
+    if not hashes:
+        return None
+    signature = [
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) & 0xFFFFFFFF
+        for a, b in _PERMUTATIONS
+    ]
+    return "".join(f"{value:08x}" for value in signature)
+
+
+def similarity(signature_a, signature_b):
+    """Similitud de Jaccard estimada (0 a 1) entre dos firmas"""
+    if not signature_a or not signature_b or len(signature_a) != len(signature_b):
+        return 0.0
+    chunks = range(0, len(signature_a), 8)
+    equal = sum(signature_a[i:i + 8] == signature_b[i:i + 8] for i in chunks)
+    return equal / len(chunks)
+
+
+def word_count(message):
+    return len(normalize_text(message).split())
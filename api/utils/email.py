@@ -2,13 +2,17 @@
 """
 Utilidades para envío de emails
 Usa Resend para notificaciones de mensajes de contacto
+Las llamadas pasan por utils/outbound.py (pool keep-alive + circuit breaker)
+El HTML sale de templates/email/contact_notification.html (Jinja2, compilado una vez)
 """
 
 import os
-import requests
 from typing import Optional
+from utils.outbound import get_provider, ProviderUnavailable
+from utils.tracing import traced
 
 
+@traced("email.contact_notification")
 def send_contact_notification(
     contact_name: str,
     contact_email: str,
@@ -55,82 +59,87 @@ def send_contact_notification(
             "note": "Configurar en .env: RESEND_API_KEY=re_xxxxx"
         }
     
-    # Construir el HTML del email
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                       color: white; padding: 20px; border-radius: 8px 8px 0 0; }}
-            .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 8px 8px; }}
-            .field {{ margin-bottom: 15px; }}
-            .label {{ font-weight: bold; color: #667eea; }}
-            .value {{ margin-top: 5px; padding: 10px; background: white; 
-                     border-left: 3px solid #667eea; }}
-            .message-box {{ background: white; padding: 20px; margin-top: 20px; 
-                           border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-            .footer {{ text-align: center; margin-top: 20px; color: #666; font-size: 12px; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h2>📧 Nuevo Mensaje de Contacto</h2>
-                <p>Has recibido un nuevo mensaje desde el formulario de contacto del sitio web.</p>
-            </div>
-            
-            <div class="content">
-                <div class="field">
-                    <div class="label">👤 Nombre:</div>
-                    <div class="value">{contact_name}</div>
-                </div>
-                
-                <div class="field">
-                    <div class="label">📧 Email:</div>
-                    <div class="value">
-                        <a href="mailto:{contact_email}">{contact_email}</a>
-                    </div>
-                </div>
-                
-                {f'''
-                <div class="field">
-                    <div class="label">📱 Teléfono:</div>
-                    <div class="value">{contact_phone}</div>
-                </div>
-                ''' if contact_phone else ''}
-                
-                <div class="field">
-                    <div class="label">📋 Asunto:</div>
-                    <div class="value">{subject}</div>
-                </div>
-                
-                <div class="message-box">
-                    <div class="label">💬 Mensaje:</div>
-                    <p style="margin-top: 10px; white-space: pre-wrap;">{message}</p>
-                </div>
-                
-                <div class="footer">
-                    <p>Este email fue enviado automáticamente desde el formulario de contacto.</p>
-                    <p>Para responder, usa el email: <strong>{contact_email}</strong></p>
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>
+    # Construir el HTML del email (template compilado una sola vez)
+    html_content = render_contact_email([{
+        "name": contact_name,
+        "email": contact_email,
+        "phone": contact_phone,
+        "subject": subject,
+        "message": message
+    }])
+    
+    return _send_email(
+        resend_api_key,
+        recipient_email,
+        f"Nuevo mensaje: {subject}",
+        html_content,
+        reply_to=contact_email  # Para que puedas responder directamente
+    )
+
+
+def send_contact_digest(messages: list, admin_email: str = None) -> dict:
     """
+    Envía UN email con todos los mensajes de contacto pendientes (modo batch/diario).
     
+    Args:
+        messages: lista de dicts con name, email, phone, subject, message, created_at
+        admin_email: Email del admin que recibirá la notificación
+    
+    Returns:
+        dict con status y mensaje de resultado
+    """
+    recipient_email = admin_email or os.environ.get("ADMIN_EMAIL", "delacruzantony32@gmail.com")
+    resend_api_key = os.environ.get("RESEND_API_KEY")
+    
+    if not resend_api_key:
+        return {
+            "success": False,
+            "error": "RESEND_API_KEY no configurada. Email no enviado.",
+            "note": "Configurar en .env: RESEND_API_KEY=re_xxxxx"
+        }
+    
+    if len(messages) == 1:
+        subject = f"Nuevo mensaje: {messages[0]['subject']}"
+        reply_to = messages[0]["email"]
+    else:
+        subject = f"{len(messages)} nuevos mensajes de contacto"
+        reply_to = None
+    
+    return _send_email(resend_api_key, recipient_email, subject, render_contact_email(messages), reply_to)
+
+
+# Template Jinja2 compilado (una vez por proceso, en el primer email)
+_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+_contact_template = None
+
+
+def render_contact_email(messages: list) -> str:
+    """HTML de la notificación para uno o varios mensajes (con autoescape de los datos del formulario)"""
+    global _contact_template
+    if _contact_template is None:
+        from jinja2 import Environment, FileSystemLoader, select_autoescape
+        env = Environment(
+            loader=FileSystemLoader(_TEMPLATES_DIR),
+            autoescape=select_autoescape(["html"]),
+            trim_blocks=True,
+            lstrip_blocks=True
+        )
+        _contact_template = env.get_template("email/contact_notification.html")
+    return _contact_template.render(messages=messages)
+
+
+def _send_email(resend_api_key: str, recipient_email: str, subject: str, html_content: str,
+                reply_to: Optional[str] = None) -> dict:
+    """Llamada a la API de Resend (compartida por notificación inmediata y digest)"""
     # Payload para Resend API
     payload = {
         "from": "Formulario Contacto <onboarding@resend.dev>",  # Email por defecto de Resend
         "to": [recipient_email],
-        "subject": f"Nuevo mensaje: {subject}",
-        "html": html_content,
-        "reply_to": contact_email  # Para que puedas responder directamente
+        "subject": subject,
+        "html": html_content
     }
+    if reply_to:
+        payload["reply_to"] = reply_to
     
     # Headers
     headers = {
@@ -138,14 +147,12 @@ def send_contact_notification(
         "Content-Type": "application/json"
     }
     
+    # Import diferido: requests solo se carga cuando se envía el primer email (arranque más rápido)
+    import requests
+
     try:
-        # Llamada a API de Resend
-        response = requests.post(
-            "https://api.resend.com/emails",
-            json=payload,
-            headers=headers,
-            timeout=10
-        )
+        # Llamada a API de Resend (sesión compartida; falla al instante si el circuito está abierto)
+        response = get_provider("resend").request("POST", "/emails", json=payload, headers=headers)
         
         if response.status_code == 200:
             return {
@@ -160,6 +167,11 @@ def send_contact_notification(
                 "details": response.text
             }
     
+    except ProviderUnavailable as e:
+        return {
+            "success": False,
+            "error": f"Servicio de email no disponible: {str(e)}"
+        }
     except requests.exceptions.RequestException as e:
         return {
             "success": False,
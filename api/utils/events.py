@@ -0,0 +1,182 @@
+# api/utils/events.py
+"""
+Eventos de cambios para el dashboard (Server-Sent Events)
+- publish_event() se llama DESPUÉS del commit (mensaje nuevo/leído, publicación creada/actualizada)
+- PostgreSQL: NOTIFY en el canal EVENTS_CHANNEL; cada worker tiene UN thread con
+  LISTEN que reparte los eventos a las conexiones SSE abiertas en ese proceso
+  (todos los workers reciben todos los eventos)
+- Otros motores (SQLite en desarrollo): reparto en memoria, solo dentro del proceso
+- Cada conexión SSE es una cola en memoria: esperar un evento no consulta la BD
+"""
+
+import json
+import os
+import queue
+import select
+import threading
+import time
+from collections import deque
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import text
+from extensions import db
+
+EVENTS_CHANNEL = "colegio_events"
+# Eventos recientes que se reenvían a clientes que reconectan con Last-Event-ID
+RECENT_EVENTS = 100
+# Eventos pendientes por conexión (un cliente lento no acumula memoria sin límite)
+CLIENT_QUEUE_SIZE = 100
+# Salt de los tickets SSE: firmados con SECRET_KEY, no sirven como JWT ni para otra cosa
+SSE_TICKET_SALT = "sse-ticket"
+
+
+def _ticket_serializer():
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"], salt=SSE_TICKET_SALT)
+
+
+def issue_sse_ticket(user_id):
+    """Ticket corto (SSE_TICKET_SECONDS) para abrir /api/dashboard/events sin mandar el JWT en la URL"""
+    return _ticket_serializer().dumps({"uid": user_id, "nonce": os.urandom(8).hex()})
+
+
+def verify_sse_ticket(ticket):
+    """user_id del ticket, o None si es inválido o venció"""
+    try:
+        data = _ticket_serializer().loads(ticket, max_age=current_app.config.get("SSE_TICKET_SECONDS", 30))
+    except BadSignature:
+        return None
+    return data.get("uid")
+
+
+def sse_client_limit():
+    """Conexiones SSE permitidas en este worker (SSE_MAX_CLIENTS acotado por los threads libres)"""
+    config = current_app.config
+    limit = config.get("SSE_MAX_CLIENTS", 50)
+    budget = config.get("SSE_THREAD_BUDGET")
+    return limit if budget is None else min(limit, budget)
+
+
+class EventBroker:
+    """Suscriptores SSE de este proceso y thread de LISTEN (PostgreSQL)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._recent = deque(maxlen=RECENT_EVENTS)
+        self._listener_pid = None
+
+    @property
+    def client_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self, last_event_id=None):
+        """Nueva cola para una conexión SSE (con los eventos perdidos desde last_event_id)"""
+        q = queue.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        with self._lock:
+            if last_event_id:
+                for event in self._recent:
+                    if int(event["id"]) > int(last_event_id):
+                        q.put_nowait(event)
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def dispatch(self, event):
+        """Entrega el evento a todas las conexiones de este proceso"""
+        with self._lock:
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                # Cliente que no consume: se descarta el evento (al reconectar recibe el backlog)
+                pass
+
+    def ensure_listener(self, app):
+        """
+        Arranca el thread de LISTEN la primera vez (o después de un fork:
+        los threads del master no existen en los workers de gunicorn)
+        """
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            thread = threading.Thread(target=self._listen, args=(app,), name="events-listen", daemon=True)
+            thread.start()
+
+    def _listen(self, app):
+        """Loop de LISTEN con reconexión (conexión dedicada, fuera del pool de requests)"""
+        backoff = 1
+        while True:
+            try:
+                with app.app_context():
+                    conn = db.engine.raw_connection()
+                try:
+                    backoff = 1
+                    for payload in _notifications(conn.driver_connection):
+                        try:
+                            self.dispatch(json.loads(payload))
+                        except ValueError:
+                            continue
+                finally:
+                    conn.invalidate()
+            except Exception as e:
+                app.logger.warning(f"LISTEN {EVENTS_CHANNEL} interrumpido, reintentando en {backoff}s: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+
+def _notifications(conn, channel=EVENTS_CHANNEL, timeout=30):
+    """Payloads recibidos por LISTEN en `channel` (psycopg2 o psycopg 3)"""
+    conn.autocommit = True
+    if hasattr(conn, "poll"):
+        # psycopg2: esperar a que el socket tenga datos y leer conn.notifies
+        cursor = conn.cursor()
+        cursor.execute(f"LISTEN {channel}")
+        while True:
+            select.select([conn], [], [], timeout)
+            conn.poll()
+            while conn.notifies:
+                yield conn.notifies.pop(0).payload
+    else:
+        # psycopg 3: generador bloqueante de notificaciones
+        conn.execute(f"LISTEN {channel}")
+        while True:
+            for notify in conn.notifies(timeout=timeout):
+                yield notify.payload
+
+
+# Broker compartido por el proceso
+broker = EventBroker()
+
+
+def uses_notify():
+    """True si los eventos viajan por LISTEN/NOTIFY (entre todos los workers)"""
+    return db.engine.dialect.name == "postgresql"
+
+
+def publish_event(event_type, data):
+    """
+    Publica un evento de cambio (llamar después de db.session.commit())
+    data debe ser chico: NOTIFY admite payloads de hasta 8000 bytes
+    """
+    event = {"id": str(time.time_ns()), "type": event_type, "data": data}
+    if uses_notify():
+        try:
+            # Conexión propia: no interfiere con la transacción de la sesión
+            with db.engine.begin() as conn:
+                conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": EVENTS_CHANNEL, "payload": json.dumps(event)}
+                )
+            return event
+        except Exception as e:
+            current_app.logger.warning(f"NOTIFY falló, evento solo local: {e}")
+    broker.dispatch(event)
+    return event
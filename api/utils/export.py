@@ -0,0 +1,96 @@
+# api/utils/export.py
+"""
+Exportación de filas a CSV/XLSX en streaming (memoria constante)
+- Las filas llegan de un cursor del lado del servidor (yield_per): nunca se
+  cargan todas en memoria ni se crean objetos ORM
+- CSV: se envía por bloques de CHUNK_ROWS filas (Transfer-Encoding: chunked)
+- XLSX: XlsxWriter en modo constant_memory escribe en un archivo temporal,
+  que se envía por bloques y se borra al terminar. NO es streaming real: el
+  primer byte sale recién cuando el libro está completo (el formato zip necesita
+  el archivo entero), por eso el endpoint limita las filas (EXPORT_XLSX_MAX_ROWS)
+  y para volúmenes grandes hay que usar CSV
+"""
+
+import csv
+import io
+import os
+import tempfile
+from datetime import datetime
+
+# Filas por bloque enviado al cliente
+CHUNK_ROWS = 1000
+# Bytes por bloque al enviar el XLSX
+FILE_CHUNK_BYTES = 64 * 1024
+
+# Celdas que Excel interpretaría como fórmula (datos enviados por el público)
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Sí" if value else "No"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def _csv_cell(value):
+    """
+    Celda de CSV: los textos que Excel tomaría como fórmula llevan un apóstrofo
+    (en XLSX no hace falta: strings_to_formulas=False los guarda como texto)
+    """
+    value = _cell(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(headers, rows):
+    """Genera el CSV por bloques (con BOM para que Excel detecte UTF-8)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+    count = 0
+    for row in rows:
+        writer.writerow([_csv_cell(value) for value in row])
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+def stream_xlsx(headers, rows, sheet_name="Datos"):
+    """
+    Genera el XLSX por bloques de bytes (después de escribir el libro completo)
+    Requiere XlsxWriter (pip install XlsxWriter)
+    """
+    try:
+        import xlsxwriter
+    except ImportError:
+        raise Exception("XlsxWriter no instalado. Ejecuta: pip install XlsxWriter")
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        # constant_memory: cada fila se escribe al disco apenas se completa
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "strings_to_formulas": False})
+        sheet = workbook.add_worksheet(sheet_name)
+        bold = workbook.add_format({"bold": True})
+        sheet.write_row(0, 0, headers, bold)
+        for index, row in enumerate(rows, start=1):
+            sheet.write_row(index, 0, [_cell(value) for value in row])
+        workbook.close()
+
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(FILE_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
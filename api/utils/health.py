@@ -0,0 +1,132 @@
+# api/utils/health.py
+"""
+Chequeos de dependencias para el probe de readiness (/api/health/ready)
+- Un thread por worker los ejecuta cada HEALTH_CHECK_INTERVAL segundos
+- El endpoint solo lee el último resultado (O(1)): los probes de Docker/Render
+  no agregan consultas a la base de datos
+- Liveness (/api/health) sigue siendo constante: solo indica que el proceso responde
+"""
+
+import os
+import shutil
+import threading
+import time
+from sqlalchemy import text
+from extensions import db
+from utils.view_counter import view_counter
+
+
+def _check_database(engine):
+    """Round-trip de SELECT 1 y ocupación del pool de conexiones"""
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    latency_ms = (time.perf_counter() - started) * 1000
+
+    result = {"ok": True, "latency_ms": round(latency_ms, 1)}
+    pool = engine.pool
+    if hasattr(pool, "checkedout") and hasattr(pool, "size"):
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        result["pool"] = {
+            "checked_out": pool.checkedout(),
+            "size": pool.size(),
+            "overflow": pool.overflow(),
+            "saturation": round(pool.checkedout() / capacity, 2) if capacity else None
+        }
+    return result
+
+
+def _check_disk(path, min_free_mb):
+    """Espacio libre en el volumen de uploads"""
+    os.makedirs(path, exist_ok=True)
+    usage = shutil.disk_usage(path)
+    free_mb = usage.free / (1024 * 1024)
+    return {
+        "ok": free_mb >= min_free_mb,
+        "free_mb": round(free_mb),
+        "used_percent": round(usage.used / usage.total * 100, 1) if usage.total else None
+    }
+
+
+def _check_jobs(max_backlog):
+    """Trabajo en segundo plano pendiente (vistas sin guardar en la BD)"""
+    rows, age = view_counter.backlog()
+    return {
+        "ok": rows <= max_backlog,
+        "view_counter_pending": rows,
+        "seconds_since_flush": round(age) if age is not None else None
+    }
+
+
+class HealthMonitor:
+    """Último resultado de los chequeos, refrescado en segundo plano"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._thread_pid = None
+
+    def check(self, app):
+        """Ejecuta todos los chequeos (un error en uno no afecta a los demás)"""
+        config = app.config
+        checks = {}
+        with app.app_context():
+            for name, engine in db.engines.items():
+                key = "database" if name is None else f"database_{name}"
+                try:
+                    checks[key] = _check_database(engine)
+                except Exception as e:
+                    checks[key] = {"ok": False, "error": str(e).splitlines()[0]}
+        try:
+            checks["uploads_disk"] = _check_disk(
+                os.path.join(app.root_path, "uploads"), config.get("HEALTH_MIN_DISK_FREE_MB", 200)
+            )
+        except OSError as e:
+            checks["uploads_disk"] = {"ok": False, "error": str(e)}
+        checks["jobs"] = _check_jobs(config.get("HEALTH_MAX_JOB_BACKLOG", 10000))
+
+        # La réplica de lectura es opcional: si falla, los GET vuelven al primario
+        required = [check["ok"] for key, check in checks.items() if key != "database_read"]
+        return {"ready": all(required), "checked_at": time.time(), "checks": checks}
+
+    def _refresh(self, app):
+        snapshot = self.check(app)
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def _run(self, app):
+        interval = app.config.get("HEALTH_CHECK_INTERVAL", 5)
+        while True:
+            time.sleep(interval)
+            try:
+                self._refresh(app)
+            except Exception as e:
+                app.logger.warning(f"Error en chequeos de salud: {e}")
+
+    def snapshot(self, app):
+        """
+        Último resultado; la primera llamada del worker lo calcula y arranca el thread
+        Un resultado viejo (thread detenido) se reporta como no listo
+        """
+        if self._thread_pid != os.getpid():
+            with self._lock:
+                start = self._thread_pid != os.getpid()
+                self._thread_pid = os.getpid()
+            if start:
+                threading.Thread(target=self._run, args=(app,), name="health-refresh", daemon=True).start()
+        if self._snapshot is None:
+            self._refresh(app)
+
+        with self._lock:
+            snapshot = dict(self._snapshot)
+        age = time.time() - snapshot["checked_at"]
+        snapshot["age_seconds"] = round(age, 1)
+        if age > 3 * app.config.get("HEALTH_CHECK_INTERVAL", 5):
+            snapshot["ready"] = False
+            snapshot["error"] = "Resultado de chequeos desactualizado"
+        return snapshot
+
+
+# Instancia compartida por el proceso
+health_monitor = HealthMonitor()
@@ -0,0 +1,146 @@
+# api/utils/http_cache.py
+"""
+Utilidades de caché HTTP para endpoints públicos
+- GET condicional: ETag / Last-Modified con respuesta 304
+- Cache-Control con stale-while-revalidate
+- Surrogate keys para que un CDN (o un stand-in local) purgue solo lo que cambió
+"""
+
+import hashlib
+from datetime import timezone
+from flask import request, current_app
+from sqlalchemy import func
+from extensions import db
+
+# Handlers locales de purga (ej: un caché en memoria que actúe como CDN)
+_purge_handlers = []
+
+
+def collection_version(model, column=None):
+    """
+    Obtiene (count, max(updated_at)) de una tabla en UNA sola consulta.
+
+    El count detecta eliminaciones (que no cambian max(updated_at)),
+    el max detecta inserciones y actualizaciones.
+    """
+    column = column if column is not None else model.updated_at
+    count, last_modified = db.session.query(func.count(model.id), func.max(column)).one()
+    return count, last_modified
+
+
+def make_etag(*parts):
+    """Genera un ETag corto a partir de las partes que definen la versión del recurso"""
+    raw = "|".join(str(p) for p in parts)
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()[:24]
+
+
+def _to_http_date(value):
+    """Normaliza un datetime naive (UTC) a aware y sin microsegundos (precisión HTTP)"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def _apply_headers(response, etag, last_modified, surrogate_keys, max_age, swr):
+    """Agrega validadores, Cache-Control y Surrogate-Key a la respuesta"""
+    if max_age is None:
+        max_age = current_app.config.get("HTTP_CACHE_MAX_AGE", 60)
+    if swr is None:
+        swr = current_app.config.get("HTTP_CACHE_SWR", 300)
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers["Cache-Control"] = f"public, max-age={max_age}, stale-while-revalidate={swr}"
+    if surrogate_keys:
+        response.headers["Surrogate-Key"] = " ".join(sorted(set(surrogate_keys)))
+    return response
+
+
+def not_modified(etag, last_modified=None, surrogate_keys=(), max_age=None, swr=None):
+    """
+    Devuelve una respuesta 304 si el cliente ya tiene la versión actual, o None.
+
+    Se llama ANTES de construir el payload: si el cliente está al día
+    no se carga ninguna fila ni se serializa JSON.
+
+    Uso:
+        resp = not_modified(etag, last_modified, ["publications"])
+        if resp:
+            return resp
+    """
+    last_modified = _to_http_date(last_modified)
+
+    # If-None-Match tiene prioridad sobre If-Modified-Since (RFC 9110)
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified is not None:
+        fresh = last_modified <= request.if_modified_since
+    else:
+        fresh = False
+
+    if not fresh:
+        return None
+
+    response = current_app.response_class(status=304)
+    return _apply_headers(response, etag, last_modified, surrogate_keys, max_age, swr)
+
+
+def cacheable(response, etag, last_modified=None, surrogate_keys=(), max_age=None, swr=None):
+    """
+    Marca una respuesta 200 como cacheable (validadores + Cache-Control + Surrogate-Key)
+
+    Uso:
+        return cacheable(jsonify(data), etag, last_modified, ["publications", "publication-42"])
+    """
+    return _apply_headers(response, etag, _to_http_date(last_modified), surrogate_keys, max_age, swr)
+
+
+def register_purge_handler(fn):
+    """
+    Registra un handler local de purga: fn(keys) recibe la lista de surrogate keys.
+    Útil como stand-in de un CDN (ej: un caché en memoria del propio proceso).
+    """
+    _purge_handlers.append(fn)
+    return fn
+
+
+def run_purge_handlers(keys):
+    """
+    Ejecuta solo los handlers locales de este proceso (sin CDN)
+    Lo usa también el bus de invalidación al recibir purgas de otros workers
+    """
+    for handler in list(_purge_handlers):
+        try:
+            handler(keys)
+        except Exception as e:
+            current_app.logger.warning(f"Handler de purga falló: {e}")
+
+
+def purge_surrogate_keys(*keys):
+    """
+    Emite un evento de purga para las surrogate keys indicadas.
+    Llamar DESPUÉS de db.session.commit() en los handlers de escritura.
+
+    - Ejecuta los handlers locales registrados
+    - Si CACHE_PURGE_URL está configurada, envía {"surrogate_keys": [...]} por POST
+      (ej: un worker del CDN que traduzca a su API de purga)
+    """
+    keys = sorted({k for k in keys if k})
+    if not keys:
+        return keys
+
+    run_purge_handlers(keys)
+
+    purge_url = current_app.config.get("CACHE_PURGE_URL")
+    if purge_url:
+        try:
+            import requests
+            requests.post(purge_url, json={"surrogate_keys": keys}, timeout=2)
+        except Exception as e:
+            # La purga es best-effort: el TTL corto de Cache-Control acota el dato viejo
+            current_app.logger.warning(f"No se pudo purgar CDN ({purge_url}): {e}")
+
+    return keys
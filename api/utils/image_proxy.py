@@ -0,0 +1,273 @@
+# api/utils/image_proxy.py
+"""
+Proxy con caché para imágenes externas de la galería (IMAGE_PROXY_ENABLED)
+- La imagen remota se descarga UNA vez y se guarda en disco (caché LRU
+  acotada por IMAGE_PROXY_CACHE_MB, con TTL IMAGE_PROXY_TTL)
+- Variantes redimensionadas (?w=) se generan desde el original cacheado
+  (anchos permitidos: IMAGE_PROXY_WIDTHS, así el total de variantes es acotado)
+- Las URLs del proxy van firmadas con HMAC (SECRET_KEY): solo se sirven las
+  que genera la API para items de la galería, no es un proxy abierto. La firma
+  cubre solo la URL de origen: el cliente agrega &w= (validado contra la lista)
+- El directorio de caché es compartido por todos los workers (escrituras atómicas)
+- Circuit breaker por host remoto y solo formatos raster (nada de SVG)
+"""
+
+import hashlib
+import hmac
+import io
+import ipaddress
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode, urlparse
+from flask import current_app
+from utils.outbound import get_provider
+from utils.tracing import KIND_CLIENT, traced
+
+# Formatos que se pueden redimensionar con Pillow (GIF animados se sirven originales)
+_RESIZABLE = {"image/jpeg": "JPEG", "image/png": "PNG", "image/webp": "WEBP"}
+# Solo formatos raster: un SVG puede traer scripts y se serviría desde el origen de la API
+SERVED_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif", "image/avif"}
+
+
+class ImageProxyError(Exception):
+    """La imagen no se puede servir (status HTTP sugerido en .status)"""
+
+    def __init__(self, message, status=502):
+        super().__init__(message)
+        self.status = status
+
+
+def _signature(url):
+    key = current_app.config["SECRET_KEY"].encode("utf-8")
+    return hmac.new(key, url.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def proxy_url(url, width=None):
+    """
+    URL del proxy para una imagen externa (None si el proxy está desactivado
+    o la URL no es http(s) externa, ej: /uploads/... o Cloudinary, que ya es CDN)
+    El cliente puede pedir otra variante agregando &w=<ancho de IMAGE_PROXY_WIDTHS>
+    """
+    config = current_app.config
+    if not config.get("IMAGE_PROXY_ENABLED") or not url:
+        return None
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or parsed.hostname in config.get("IMAGE_PROXY_SKIP_HOSTS", ()):
+        return None
+    params = {"url": url, "sig": _signature(url)}
+    if width:
+        params["w"] = width
+    return f"/api/galeria/proxy?{urlencode(params)}"
+
+
+def verify_signature(url, signature):
+    return hmac.compare_digest(_signature(url), signature or "")
+
+
+class DiskLRUCache:
+    """
+    Caché en disco: <dir>/<hash[:2]>/<hash> (contenido) + <hash>.json (metadatos)
+    El mtime del archivo es el "último uso": al superar max_bytes se borran los más viejos
+    """
+
+    def __init__(self, directory, max_bytes, ttl):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._approx_bytes = None  # Estimación del tamaño total (se recalcula al podar)
+
+    def _paths(self, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        folder = os.path.join(self.directory, digest[:2])
+        return folder, os.path.join(folder, digest), os.path.join(folder, digest + ".json")
+
+    def get(self, key):
+        """(path, metadatos) si está en caché y no venció; None si no"""
+        _folder, path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if time.time() - meta["stored_at"] > self.ttl or not os.path.exists(path):
+                return None
+            os.utime(path)  # Marca de uso reciente (LRU)
+            return path, meta
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key, data, meta):
+        """Guarda de forma atómica (tempfile + rename): otro worker nunca ve un archivo a medias"""
+        folder, path, meta_path = self._paths(key)
+        os.makedirs(folder, exist_ok=True)
+        meta = dict(meta, stored_at=time.time(), size=len(data),
+                    etag=hashlib.sha256(data).hexdigest()[:32])
+        for target, content in ((path, data), (meta_path, json.dumps(meta).encode("utf-8"))):
+            fd, tmp = tempfile.mkstemp(dir=folder)
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp, target)
+
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._scan_size()
+            self._approx_bytes += len(data)
+            over = self._approx_bytes > self.max_bytes
+        if over:
+            self.prune()
+        return path, meta
+
+    def _entries(self):
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json") or name.startswith("tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def _scan_size(self):
+        return sum(size for _mtime, size, _path in self._entries())
+
+    def prune(self):
+        """Borra los menos usados hasta quedar en el 90% de max_bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _mtime, size, _path in entries)
+        target = self.max_bytes * 0.9
+        for _mtime, size, path in entries:
+            if total <= target:
+                break
+            for victim in (path, path + ".json"):
+                try:
+                    os.remove(victim)
+                except OSError:
+                    pass
+            total -= size
+        with self._lock:
+            self._approx_bytes = total
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Caché del proceso (configurada una vez)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = current_app.config
+                # Fuera de uploads/ (que se sirve tal cual por /uploads/...)
+                directory = config.get("IMAGE_PROXY_CACHE_DIR") or os.path.join(current_app.instance_path, "proxy-cache")
+                _cache = DiskLRUCache(
+                    directory,
+                    max_bytes=config.get("IMAGE_PROXY_CACHE_MB", 500) * 1024 * 1024,
+                    ttl=config.get("IMAGE_PROXY_TTL", 7 * 24 * 3600)
+                )
+    return _cache
+
+
+def _check_host(hostname):
+    """Evita que el proxy llegue a la red interna (salvo IMAGE_PROXY_ALLOW_PRIVATE, para pruebas)"""
+    if current_app.config.get("IMAGE_PROXY_ALLOW_PRIVATE"):
+        return
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(hostname, None)}
+    except socket.gaierror:
+        raise ImageProxyError("Host de la imagen no encontrado", 404)
+    for address in addresses:
+        ip = ipaddress.ip_address(address)
+        if ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_reserved or ip.is_multicast:
+            raise ImageProxyError("Host de la imagen no permitido", 403)
+
+
+@traced("image_proxy.fetch", kind=KIND_CLIENT)
+def _fetch(url):
+    """Descarga la imagen remota (límite de tamaño, solo image/*) por la capa outbound"""
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ImageProxyError("URL inválida", 400)
+    _check_host(parsed.hostname)
+
+    max_bytes = current_app.config.get("IMAGE_PROXY_MAX_BYTES", 10 * 1024 * 1024)
+    # Breaker y bulkhead por host: un host caído no deja sin imágenes a los demás
+    provider = get_provider(f"images:{parsed.hostname}")
+    with provider.guard():
+        response = provider.session.get(url, stream=True, timeout=provider.timeout, allow_redirects=False)
+        try:
+            if response.status_code != 200:
+                raise ImageProxyError(f"La imagen remota respondió {response.status_code}", 502)
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type not in SERVED_TYPES:
+                raise ImageProxyError("La URL no es una imagen soportada (jpeg, png, webp, gif, avif)", 415)
+            chunks, size = [], 0
+            for chunk in response.iter_content(64 * 1024):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ImageProxyError("Imagen demasiado grande", 413)
+                chunks.append(chunk)
+        finally:
+            response.close()
+    return b"".join(chunks), content_type
+
+
+@traced("image_proxy.resize")
+def _resize(data, content_type, width):
+    """Variante de `width` px de ancho (sin agrandar); None si no se puede redimensionar"""
+    image_format = _RESIZABLE.get(content_type)
+    if image_format is None:
+        return None
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.width <= width:
+                return data
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            output = io.BytesIO()
+            options = {"quality": 85, "optimize": True} if image_format in ("JPEG", "WEBP") else {"optimize": True}
+            resized.save(output, image_format, **options)
+            return output.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # Imagen dañada o demasiado grande para decodificar
+        return None
+
+
+def get_image(url, width=None):
+    """
+    Imagen (o su variante) en disco, descargándola si hace falta
+    Returns:
+        (path, metadatos) - metadatos incluye content_type y etag (estable: el
+        mtime del archivo cambia con cada uso, así que no sirve para el ETag)
+    """
+    cache = get_cache()
+    variant_key = f"{url}|w={width}" if width else url
+    hit = cache.get(variant_key)
+    if hit:
+        return hit
+
+    original = cache.get(url)
+    if original is None:
+        data, content_type = _fetch(url)
+        original = cache.set(url, data, {"content_type": content_type, "url": url})
+    if not width:
+        return original
+
+    path, meta = original
+    with open(path, "rb") as f:
+        data = f.read()
+    resized = _resize(data, meta["content_type"], width)
+    if resized is None:
+        # Formato no redimensionable (o Pillow no instalado): se sirve el original
+        return original
+    return cache.set(variant_key, resized, {"content_type": meta["content_type"], "url": url, "width": width})
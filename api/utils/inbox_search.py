@@ -0,0 +1,82 @@
+# api/utils/inbox_search.py
+"""
+Búsqueda de texto completo en la bandeja de mensajes de contacto
+- search_text: nombre, email, asunto y mensaje en minúsculas y sin tildes
+  ("Matrícula" y "matricula" coinciden en cualquier motor)
+- PostgreSQL: to_tsvector(TS_CONFIG, search_text) con índice GIN, ranking ts_rank_cd
+- SQLite: tabla FTS5 mensajes_contacto_fts (triggers en el modelo), ranking bm25
+- Otros motores: LIKE sin índice (solo para desarrollo)
+Cada término se busca como prefijo: "matr" encuentra "matrícula"
+"""
+
+from sqlalchemy import Float, Integer, false, func, literal_column, text
+from extensions import db
+from utils.text import normalize
+
+# Configuración de PostgreSQL (stemming en español sobre texto ya sin tildes)
+TS_CONFIG = "spanish"
+# Términos máximos por búsqueda
+MAX_TERMS = 8
+
+
+def search_vector(column):
+    """
+    to_tsvector('spanish'::regconfig, column): la configuración va como literal
+    (no como parámetro) para que la consulta coincida con la expresión del índice GIN
+    """
+    return func.to_tsvector(literal_column(f"'{TS_CONFIG}'::regconfig"), column)
+
+
+def build_search_text(*fields):
+    """
+    Texto normalizado de los campos buscables
+    Los emails se agregan también separados en palabras ("juan.perez@gmail.com"
+    → "juan perez gmail com") para poder buscar por una parte
+    """
+    parts = []
+    for value in fields:
+        if not value:
+            continue
+        value = normalize(value)
+        parts.append(value)
+        if "@" in value:
+            parts.append("".join(ch if ch.isalnum() else " " for ch in value))
+    return " ".join(" ".join(parts).split())
+
+
+def query_terms(q):
+    """Términos alfanuméricos de la búsqueda (seguros para tsquery/MATCH)"""
+    return "".join(ch if ch.isalnum() else " " for ch in normalize(q)).split()[:MAX_TERMS]
+
+
+def apply_search(query, q):
+    """
+    Filtra `query` (sobre ContactMessage) por la búsqueda `q`
+    Returns:
+        (query filtrada, expresión de orden por relevancia o None)
+    """
+    from models.contact_message import ContactMessage
+
+    terms = query_terms(q)
+    if not terms:
+        return query.filter(false()), None
+
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        # Misma expresión que el índice ix_mensajes_contacto_search
+        vector = search_vector(ContactMessage.search_text)
+        tsquery = func.to_tsquery(literal_column(f"'{TS_CONFIG}'::regconfig"), " & ".join(f"{term}:*" for term in terms))
+        return query.filter(vector.op("@@")(tsquery)), func.ts_rank_cd(vector, tsquery).desc()
+
+    if dialect == "sqlite":
+        fts = text(
+            "SELECT rowid AS id, bm25(mensajes_contacto_fts) AS score "
+            "FROM mensajes_contacto_fts WHERE mensajes_contacto_fts MATCH :match"
+        ).bindparams(match=" ".join(f'"{term}"*' for term in terms))\
+         .columns(id=Integer, score=Float).subquery("fts")
+        query = query.join(fts, fts.c.id == ContactMessage.id)
+        return query, fts.c.score.asc()  # bm25: menor = más relevante
+
+    for term in terms:
+        query = query.filter(ContactMessage.search_text.like(f"%{term}%"))
+    return query, None
@@ -0,0 +1,292 @@
+# api/utils/invalidation.py
+"""
+Bus de invalidación de cachés entre workers de gunicorn
+Los cachés por proceso (utils/cache.py y cualquier handler de register_purge_handler)
+quedaban viejos en los demás workers cuando uno atendía la escritura.
+
+- after_flush: las filas escritas de los modelos registrados (_MODEL_KEYS) se
+  traducen a surrogate keys ("categories", "publication-42", "user-3"...) y se
+  acumulan en la sesión
+- after_commit: se purgan localmente y se publican a los demás workers;
+  after_rollback las descarta (nada cambió)
+- Transporte: PostgreSQL → NOTIFY en INVALIDATION_CHANNEL (un thread con LISTEN
+  por worker); otros motores (SQLite, un solo host) → sockets Unix de datagramas
+  en INVALIDATION_SOCKET_DIR, uno por worker
+- Cada evento lleva la hora de envío: el receptor mide la latencia de propagación
+  (GET /api/dashboard/invalidation)
+
+El listener arranca en el primer request de cada worker: antes de eso el worker
+no atendió nada, así que no tiene entradas en caché que invalidar.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import deque
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, text
+from extensions import db
+from models.category import Category
+from models.gallery_item import GalleryItem
+from models.publication import Publication
+from models.revoked_token import RevokedToken
+from models.user import User
+from utils.events import _notifications
+from utils.http_cache import run_purge_handlers
+
+INVALIDATION_CHANNEL = "colegio_invalidate"
+# Keys por NOTIFY (el payload admite hasta 8000 bytes)
+KEYS_PER_MESSAGE = 200
+# Latencias recientes para las métricas
+LATENCY_SAMPLES = 500
+_SESSION_KEY = "invalidation_keys"
+
+
+def _publication_keys(pub):
+    keys = ["publications", f"publication-{pub.id}"]
+    # Si cambió de categoría, también la anterior
+    history = inspect(pub).attrs.category_id.history
+    for category_id in list(history.added or ()) + list(history.deleted or ()) + [pub.category_id]:
+        if category_id:
+            keys.append(f"category-{category_id}")
+    return keys
+
+
+# Modelo → surrogate keys afectadas por una escritura de la fila
+_MODEL_KEYS = {
+    Category: lambda c: ["categories", f"category-{c.id}"],
+    Publication: _publication_keys,
+    GalleryItem: lambda g: ["gallery", f"gallery-{g.id}"],
+    User: lambda u: ["users", f"user-{u.id}"],
+    RevokedToken: lambda t: ["token-revocations"],
+}
+
+
+def _collect_keys(session, _flush_context):
+    """after_flush: acumula las keys de las filas insertadas, modificadas o borradas"""
+    keys = session.info.setdefault(_SESSION_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        builder = _MODEL_KEYS.get(type(obj))
+        if builder is None or (obj in session.dirty and not session.is_modified(obj)):
+            continue
+        keys.update(key for key in builder(obj) if key)
+
+
+def _after_commit(session):
+    keys = session.info.pop(_SESSION_KEY, None)
+    if keys and has_app_context():
+        bus.publish(sorted(keys))
+
+
+def _after_rollback(session):
+    session.info.pop(_SESSION_KEY, None)
+
+
+class InvalidationBus:
+    """Publica purgas al resto de los workers y aplica las que llegan"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listener_pid = None
+        self._socket = None
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.transport = None
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+        self.last_received_at = None
+
+    @staticmethod
+    def _origin():
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def publish(self, keys):
+        """Purga local inmediata + envío a los demás workers (llamar después del commit)"""
+        run_purge_handlers(keys)
+        for start in range(0, len(keys), KEYS_PER_MESSAGE):
+            payload = json.dumps({
+                "keys": keys[start:start + KEYS_PER_MESSAGE],
+                "origin": self._origin(),
+                "sent_at": time.time()
+            })
+            try:
+                if db.engine.dialect.name == "postgresql":
+                    # Conexión propia: la de la sesión ya hizo commit
+                    with db.engine.begin() as conn:
+                        conn.execute(text("SELECT pg_notify(:channel, :payload)"),
+                                     {"channel": INVALIDATION_CHANNEL, "payload": payload})
+                else:
+                    self._send_local(payload.encode("utf-8"))
+                with self._lock:
+                    self.published += 1
+            except Exception:
+                # Best-effort: el TTL de cada entrada acota el dato viejo en los otros workers
+                with self._lock:
+                    self.errors += 1
+
+    def _apply(self, app, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("origin") == self._origin():
+            return  # Ya se purgó localmente al publicar
+        latency_ms = max((time.time() - message.get("sent_at", time.time())) * 1000, 0)
+        with app.app_context():
+            run_purge_handlers(message.get("keys", []))
+        with self._lock:
+            self.received += 1
+            self.last_received_at = time.time()
+            self._latencies.append(latency_ms)
+
+    def ensure_listener(self, app):
+        """Arranca el thread receptor la primera vez (o después de un fork)"""
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            try:
+                with app.app_context():
+                    use_notify = db.engine.dialect.name == "postgresql"
+                if use_notify:
+                    self.transport = "notify"
+                    target = self._listen_notify
+                elif hasattr(socket, "AF_UNIX"):
+                    self.transport = "unix_socket"
+                    self._bind_socket(app)
+                    target = self._listen_socket
+                else:
+                    self.transport = "local"
+                    return
+                threading.Thread(target=target, args=(app,), name="invalidation-listen", daemon=True).start()
+            except Exception as e:
+                # Sin listener este worker solo depende del TTL de sus cachés
+                self.transport = "local"
+                app.logger.warning(f"No se pudo iniciar el bus de invalidación: {e}")
+
+    def _listen_notify(self, app):
+        """Loop de LISTEN con reconexión (misma estrategia que utils/events.py)"""
+        backoff = 1
+        while True:
+            try:
+                with app.app_context():
+                    conn = db.engine.raw_connection()
+                try:
+                    backoff = 1
+                    for payload in _notifications(conn.driver_connection, INVALIDATION_CHANNEL):
+                        self._apply(app, payload)
+                finally:
+                    conn.invalidate()
+            except Exception as e:
+                app.logger.warning(f"LISTEN {INVALIDATION_CHANNEL} interrumpido, reintentando en {backoff}s: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    # --- Fallback sin PostgreSQL: un socket de datagramas por worker ---
+
+    def _bind_socket(self, app):
+        directory = _socket_dir(app.config)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}.sock")
+        if os.path.exists(path):
+            os.remove(path)  # Resto de un proceso anterior con el mismo pid
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(path)
+        atexit.register(_unlink_quietly, path)
+        self._socket = sock
+
+    def _listen_socket(self, app):
+        sock = self._socket
+        while True:
+            try:
+                payload, _addr = sock.recvfrom(65536)
+                self._apply(app, payload.decode("utf-8"))
+            except Exception as e:
+                app.logger.warning(f"Error recibiendo invalidación: {e}")
+
+    def _send_local(self, data):
+        """Envía el datagrama a cada worker con socket en el directorio (y limpia los de procesos muertos)"""
+        directory = _socket_dir(current_app.config)
+        if not hasattr(socket, "AF_UNIX") or not os.path.isdir(directory):
+            return
+        # Socket de envío sin bind y no bloqueante (también sirve desde manage.py)
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sender.setblocking(False)
+        own = f"{os.getpid()}.sock"
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".sock") or entry.name == own:
+                        continue
+                    try:
+                        sender.sendto(data, entry.path)
+                    except (ConnectionRefusedError, FileNotFoundError):
+                        _unlink_quietly(entry.path)  # Worker que ya no existe
+                    except BlockingIOError:
+                        # Cola del receptor llena: esa purga se pierde (el TTL la acota)
+                        with self._lock:
+                            self.errors += 1
+        finally:
+            sender.close()
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "transport": self.transport,
+                "pid": os.getpid(),
+                "published": self.published,
+                "received": self.received,
+                "errors": self.errors,
+                "last_received_at": self.last_received_at,
+                "latency_ms": {
+                    "avg": round(sum(latencies) / len(latencies), 2) if latencies else None,
+                    "p50": round(latencies[len(latencies) // 2], 2) if latencies else None,
+                    "p95": round(latencies[max(int(len(latencies) * 0.95) - 1, 0)], 2) if latencies else None,
+                    "max": round(latencies[-1], 2) if latencies else None
+                }
+            }
+
+
+def _socket_dir(config):
+    """Directorio de sockets: uno por base de datos (dos apps en el mismo host no se mezclan)"""
+    directory = config.get("INVALIDATION_SOCKET_DIR")
+    if not directory:
+        digest = hashlib.sha1(config["SQLALCHEMY_DATABASE_URI"].encode("utf-8")).hexdigest()[:10]
+        directory = os.path.join(tempfile.gettempdir(), f"colegio-invalidation-{digest}")
+    return directory
+
+
+def _unlink_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# Bus compartido por el proceso
+bus = InvalidationBus()
+_listeners_registered = False
+
+
+def init_invalidation_bus(app):
+    """Registra los eventos de sesión (una vez) y el arranque del listener por worker"""
+    global _listeners_registered
+    if not app.config.get("INVALIDATION_BUS_ENABLED", True):
+        return
+    if not _listeners_registered:
+        event.listen(db.session, "after_flush", _collect_keys)
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
+        _listeners_registered = True
+
+    @app.before_request
+    def _start_invalidation_listener():
+        bus.ensure_listener(app)
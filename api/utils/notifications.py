@@ -0,0 +1,191 @@
+# api/utils/notifications.py
+"""
+Política de notificación por email de mensajes de contacto (CONTACT_NOTIFY_MODE)
+- "immediate": un email por mensaje, al recibirlo (comportamiento original)
+- "batch": un email cada CONTACT_NOTIFY_BATCH_MINUTES con todos los pendientes
+- "daily": un email por día (a la hora CONTACT_DIGEST_HOUR, UTC) con los pendientes
+
+Pendiente = ContactMessage.notified_at IS NULL y creado en las últimas
+CONTACT_NOTIFY_MAX_AGE_HOURS: las filas guardadas antes de esta columna (todas
+NULL) nunca llegan en un digest gigante con la bandeja histórica; además
+`python manage.py backfill_notified` las marca como notificadas. El envío "reclama" las filas con
+un único UPDATE ... WHERE notified_at IS NULL, así que si varios workers (o el
+comando `python manage.py send_contact_digest` desde un cron) lo intentan a la
+vez, cada mensaje se envía una sola vez. Si el envío falla, se liberan para el
+próximo intento.
+
+El scheduler (un thread por worker) arranca con el primer request (init_notifications);
+en modo immediate reintenta los envíos que fallaron.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+from extensions import db
+from models.contact_message import ContactMessage
+from utils.email import send_contact_notification, send_contact_digest
+
+NOTIFY_MODES = ("immediate", "batch", "daily")
+# Segundos entre chequeos del scheduler en segundo plano
+SCHEDULER_TICK = 60
+
+
+def _admin_email():
+    return os.environ.get("ADMIN_EMAIL", "delacruzantony32@gmail.com")
+
+
+def notify_mode():
+    mode = current_app.config.get("CONTACT_NOTIFY_MODE", "immediate")
+    return mode if mode in NOTIFY_MODES else "immediate"
+
+
+def notify_new_message(message):
+    """
+    Llamar después de guardar un mensaje nuevo
+    Returns:
+        "sent", "failed" o "queued" (se enviará en el próximo digest)
+    """
+    if notify_mode() != "immediate":
+        return "queued"
+
+    result = send_contact_notification(
+        contact_name=message.name,
+        contact_email=message.email,
+        contact_phone=message.phone,
+        subject=message.subject,
+        message=message.message,
+        admin_email=_admin_email()
+    )
+    if not result.get("success"):
+        return "failed"
+    ContactMessage.query.filter_by(id=message.id).update({"notified_at": datetime.utcnow()})
+    db.session.commit()
+    return "sent"
+
+
+def _pending(now=None):
+    """Condición de mensaje pendiente de notificar (sin notificar y reciente)"""
+    max_age = timedelta(hours=current_app.config.get("CONTACT_NOTIFY_MAX_AGE_HOURS", 72))
+    return db.and_(ContactMessage.notified_at.is_(None),
+                   ContactMessage.created_at >= (now or datetime.utcnow()) - max_age)
+
+
+def backfill_notified():
+    """
+    Marca como notificados (notified_at = created_at) los mensajes que nunca se
+    notificaron: correr una vez al desplegar el digest. Returns: filas marcadas
+    """
+    marked = ContactMessage.query.filter(ContactMessage.notified_at.is_(None))\
+        .update({"notified_at": func.coalesce(ContactMessage.created_at, datetime.utcnow())},
+                synchronize_session=False)
+    db.session.commit()
+    return marked
+
+
+def digest_due(now=None):
+    """¿Corresponde enviar el digest? (según el modo, los pendientes y el último envío)"""
+    now = now or datetime.utcnow()
+    mode = notify_mode()
+    oldest_pending = db.session.query(func.min(ContactMessage.created_at))\
+        .filter(_pending(now)).scalar()
+    if oldest_pending is None:
+        return False
+
+    if mode == "batch":
+        minutes = current_app.config.get("CONTACT_NOTIFY_BATCH_MINUTES", 15)
+        return oldest_pending <= now - timedelta(minutes=minutes)
+
+    if mode == "daily":
+        digest_time = now.replace(hour=current_app.config.get("CONTACT_DIGEST_HOUR", 13), minute=0,
+                                  second=0, microsecond=0)
+        if now < digest_time:
+            return False
+        last_sent = db.session.query(func.max(ContactMessage.notified_at)).scalar()
+        return last_sent is None or last_sent < digest_time
+
+    # immediate: pendientes cuyo envío falló se reintentan con el digest
+    return oldest_pending <= now - timedelta(minutes=5)
+
+
+def send_pending_digest():
+    """
+    Reclama todos los mensajes pendientes y los envía en un solo email
+    Returns:
+        cantidad de mensajes enviados (0 si no había o si otro proceso los reclamó)
+    """
+    claimed_at = datetime.utcnow()
+    claimed = ContactMessage.query.filter(_pending(claimed_at))\
+        .update({"notified_at": claimed_at}, synchronize_session=False)
+    db.session.commit()
+    if not claimed:
+        return 0
+
+    messages = ContactMessage.query.filter(ContactMessage.notified_at == claimed_at)\
+        .order_by(ContactMessage.created_at).all()
+    payload = [
+        {
+            "name": m.name,
+            "email": m.email,
+            "phone": m.phone,
+            "subject": m.subject,
+            "message": m.message,
+            "created_at": m.created_at.strftime("%d/%m/%Y %H:%M") if m.created_at else None
+        }
+        for m in messages
+    ]
+    result = send_contact_digest(payload, admin_email=_admin_email())
+    if not result.get("success"):
+        # Liberar para el próximo intento
+        ContactMessage.query.filter(ContactMessage.notified_at == claimed_at)\
+            .update({"notified_at": None}, synchronize_session=False)
+        db.session.commit()
+        current_app.logger.warning(f"Digest de contacto no enviado ({len(payload)} mensajes): {result.get('error')}")
+        return 0
+    return len(payload)
+
+
+class DigestScheduler:
+    """Thread por worker que revisa cada minuto si corresponde enviar el digest"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread_pid = None
+
+    def ensure_started(self, app):
+        """Arranca el thread la primera vez (o después de un fork)"""
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            threading.Thread(target=self._run, args=(app,), name="contact-digest", daemon=True).start()
+
+    def _run(self, app):
+        while True:
+            time.sleep(SCHEDULER_TICK)
+            try:
+                with app.app_context():
+                    if digest_due():
+                        send_pending_digest()
+            except Exception as e:
+                app.logger.warning(f"Error en el scheduler de digest: {e}")
+
+
+# Instancia compartida por el proceso
+scheduler = DigestScheduler()
+
+
+def init_notifications(app):
+    """
+    Arranca el scheduler en el primer request de cada worker, en todos los modos:
+    - batch/daily: los pendientes no esperan a que llegue otro mensaje (reinicio, spin-down)
+    - immediate: los envíos fallidos (ej: circuito abierto) se reintentan con el digest
+    """
+
+    @app.before_request
+    def _start_digest_scheduler():
+        scheduler.ensure_started(app)
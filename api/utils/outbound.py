@@ -0,0 +1,300 @@
+# api/utils/outbound.py
+"""
+Capa compartida para llamadas a servicios externos (Resend, Cloudinary)
+- Sesión HTTP con keep-alive y pool de conexiones, creada una vez por proceso
+- Circuit breaker por proveedor: después de N fallas seguidas las llamadas
+  fallan al instante (ProviderUnavailable) durante OUTBOUND_BREAKER_RESET
+  segundos; luego se deja pasar una llamada de prueba (half-open)
+- Bulkhead: máximo de llamadas simultáneas por proveedor y worker; el resto
+  falla rápido en lugar de dejar todos los threads esperando al proveedor lento
+- Métricas de latencia por proveedor (GET /api/dashboard/outbound)
+
+Las URLs base son configurables (RESEND_API_URL, CLOUDINARY_UPLOAD_PREFIX)
+para poder probar contra un servidor HTTP falso local.
+"""
+
+import os
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from flask import current_app, has_app_context
+from utils.tracing import KIND_CLIENT, inject_traceparent, span
+
+
+class ProviderUnavailable(Exception):
+    """El proveedor no se llama: circuito abierto o límite de concurrencia alcanzado"""
+
+
+class ProviderError(Exception):
+    """Falla del proveedor que cuenta para el circuit breaker (5xx, 429, timeout, conexión)"""
+
+
+def _settings():
+    """Configuración de la app (o la clase de config activa fuera de un request/CLI)"""
+    if has_app_context():
+        return current_app.config
+    from config import ActiveConfig
+    return {key: getattr(ActiveConfig, key) for key in dir(ActiveConfig) if key.isupper()}
+
+
+class CircuitBreaker:
+    """closed → (N fallas seguidas) → open → (reset_timeout) → half_open → closed/open"""
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """True si la llamada puede hacerse (en half_open solo una de prueba a la vez)"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release_probe(self):
+        """La llamada de prueba no llegó a hacerse: otra puede intentarlo"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                # Abrir (o reabrir si falló la llamada de prueba)
+                self._opened_at = time.monotonic()
+
+
+class Provider:
+    """Proveedor externo con breaker, bulkhead, métricas y (opcional) sesión HTTP"""
+
+    def __init__(self, name, base_url=None, failure_threshold=5, reset_timeout=30, max_concurrent=4,
+                 timeout=(3.05, 10), propagate_trace=False):
+        self.name = name
+        self.base_url = (base_url or "").rstrip("/")
+        self.timeout = timeout
+        self.propagate_trace = propagate_trace  # Mandar traceparent (solo a proveedores de confianza)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._bulkhead = threading.BoundedSemaphore(max_concurrent)
+        self.max_concurrent = max_concurrent
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+        # Métricas
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._latencies = deque(maxlen=200)
+
+    @property
+    def session(self):
+        """requests.Session con pool keep-alive (una por proceso: no se comparte entre forks)"""
+        if self._session_pid != os.getpid():
+            with self._lock:
+                if self._session_pid != os.getpid():
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrent)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+                    self._session_pid = os.getpid()
+        return self._session
+
+    @contextmanager
+    def guard(self):
+        """
+        Envuelve una llamada al proveedor:
+        - ProviderUnavailable si el circuito está abierto o no hay lugar en el bulkhead
+        - ProviderError (o timeouts/errores de conexión) cuentan como falla del breaker
+        """
+        if not self.breaker.allow():
+            with self._lock:
+                self.rejected += 1
+            raise ProviderUnavailable(f"{self.name}: circuito abierto")
+        if not self._bulkhead.acquire(blocking=False):
+            self.breaker.release_probe()
+            with self._lock:
+                self.rejected += 1
+            raise ProviderUnavailable(f"{self.name}: demasiadas llamadas simultáneas")
+
+        started = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+        failed = False
+        try:
+            yield
+        except Exception as e:
+            failed = _is_provider_failure(e)
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._bulkhead.release()
+            with self._lock:
+                self.in_flight -= 1
+                self.calls += 1
+                self.total_ms += elapsed_ms
+                self.max_ms = max(self.max_ms, elapsed_ms)
+                self._latencies.append(elapsed_ms)
+                if failed:
+                    self.failures += 1
+            if failed:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+    def request(self, method, path, **kwargs):
+        """
+        Llamada HTTP por la sesión compartida (con breaker y bulkhead)
+        Respuestas 5xx/429 cuentan como falla, pero se devuelven igual al que llama
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        response = None
+        with span(f"{method} {self.name}", kind=KIND_CLIENT, **{"http.request.method": method,
+                                                               "server.provider": self.name}) as client_span:
+            if self.propagate_trace:
+                kwargs["headers"] = inject_traceparent(dict(kwargs.get("headers") or {}))
+            try:
+                with self.guard():
+                    response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+                    client_span.set_attribute("http.response.status_code", response.status_code)
+                    if response.status_code >= 500 or response.status_code == 429:
+                        raise ProviderError(f"{self.name}: HTTP {response.status_code}")
+            except ProviderError as e:
+                client_span.record_error(e)
+        return response
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "provider": self.name,
+                "state": self.breaker.state,
+                "calls": self.calls,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "in_flight": self.in_flight,
+                "max_concurrent": self.max_concurrent,
+                "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else None,
+                "p95_ms": round(latencies[max(int(len(latencies) * 0.95) - 1, 0)], 1) if latencies else None,
+                "max_ms": round(self.max_ms, 1)
+            }
+
+
+def _is_provider_failure(exc):
+    """
+    Errores del proveedor (no del request que armamos): cuentan para abrir el circuito
+    Solo red/timeout: un OSError local (disco, archivo del upload) no es una caída del proveedor
+    """
+    if isinstance(exc, (ProviderError, ConnectionError, TimeoutError, socket.gaierror)):
+        return True
+    try:
+        import requests
+        if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+    except ImportError:
+        pass
+    try:
+        from urllib3 import exceptions as urllib3_exceptions
+        if isinstance(exc, (urllib3_exceptions.MaxRetryError, urllib3_exceptions.NewConnectionError,
+                            urllib3_exceptions.ProtocolError, urllib3_exceptions.TimeoutError)):
+            return True
+    except ImportError:
+        pass
+    try:
+        from cloudinary import exceptions
+        # Error "base" = red/timeout/respuesta inválida; 4xx tienen subclases propias
+        if type(exc) is exceptions.Error or isinstance(exc, (exceptions.GeneralError, exceptions.RateLimited)):
+            return True
+    except ImportError:
+        pass
+    return False
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name):
+    """Proveedor configurado una sola vez por proceso ('resend', 'cloudinary' o 'images:<host>')"""
+    provider = _providers.get(name)
+    if provider is None:
+        with _providers_lock:
+            provider = _providers.get(name)
+            if provider is None:
+                config = _settings()
+                propagate = [p.strip() for p in (config.get("TRACE_PROPAGATE_PROVIDERS") or "").split(",")]
+                provider = Provider(
+                    name,
+                    base_url=config.get("RESEND_API_URL") if name == "resend" else None,
+                    failure_threshold=config.get("OUTBOUND_BREAKER_FAILURES", 5),
+                    reset_timeout=config.get("OUTBOUND_BREAKER_RESET", 30),
+                    max_concurrent=config.get("OUTBOUND_MAX_CONCURRENT", 4),
+                    timeout=(config.get("OUTBOUND_CONNECT_TIMEOUT", 3.05), config.get("OUTBOUND_READ_TIMEOUT", 10)),
+                    propagate_trace=name in propagate
+                )
+                _providers[name] = provider
+    return provider
+
+
+def get_outbound_stats():
+    """Métricas de todos los proveedores usados por este worker"""
+    return [provider.stats() for provider in list(_providers.values())]
+
+
+_cloudinary_configured = False
+
+
+def cloudinary_client():
+    """
+    Módulo cloudinary.uploader configurado una sola vez por proceso
+    (el SDK mantiene su propio pool urllib3 con keep-alive)
+    """
+    global _cloudinary_configured
+    try:
+        import cloudinary
+        import cloudinary.uploader
+    except ImportError:
+        raise Exception("cloudinary no instalado. Ejecuta: pip install cloudinary")
+
+    if not _cloudinary_configured:
+        options = {
+            "cloud_name": os.environ.get("CLOUDINARY_CLOUD_NAME"),
+            "api_key": os.environ.get("CLOUDINARY_API_KEY"),
+            "api_secret": os.environ.get("CLOUDINARY_API_SECRET"),
+        }
+        upload_prefix = _settings().get("CLOUDINARY_UPLOAD_PREFIX")
+        if upload_prefix:
+            options["upload_prefix"] = upload_prefix
+        cloudinary.config(**options)
+        _cloudinary_configured = True
+    return cloudinary.uploader
@@ -0,0 +1,64 @@
+# api/utils/passwords.py
+"""
+Hash de contraseñas con algoritmo y costo configurables (PASSWORD_HASH_METHOD)
+Formato de werkzeug: "scrypt:32768:8:1$salt$hash" o "pbkdf2:sha256:600000$salt$hash"
+
+- hash_password(): usa el método configurado
+- verify_password(): verifica y, si el hash guardado usa otros parámetros
+  (cambió PASSWORD_HASH_METHOD), devuelve el hash nuevo para guardarlo:
+  la migración de los hashes ocurre sola en el login, sin pedir nada al usuario
+"""
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Prefijo normalizado por método configurado ("scrypt" → "scrypt:32768:8:1")
+_method_prefixes = {}
+
+
+def _method():
+    return current_app.config.get("PASSWORD_HASH_METHOD", "scrypt")
+
+
+def method_prefix(method):
+    """Parámetros completos del método (werkzeug completa los valores por defecto)"""
+    prefix = _method_prefixes.get(method)
+    if prefix is None:
+        # Con costo mínimo no sirve: hay que generar uno real (una vez por proceso y método)
+        prefix = generate_password_hash("", method=method).split("$", 1)[0]
+        _method_prefixes[method] = prefix
+    return prefix
+
+
+def init_passwords(app):
+    """
+    Valida PASSWORD_HASH_METHOD al arrancar (un método inválido haría fallar cada login con 500)
+    De paso deja calculado el prefijo del método para needs_rehash()
+    """
+    method = app.config.get("PASSWORD_HASH_METHOD", "scrypt")
+    try:
+        method_prefix(method)
+    except (ValueError, TypeError, AttributeError) as e:
+        raise ValueError(f"PASSWORD_HASH_METHOD inválido ({method!r}): {e}")
+
+
+def hash_password(password):
+    """Hash con el método configurado"""
+    return generate_password_hash(password, method=_method())
+
+
+def needs_rehash(password_hash):
+    """True si el hash fue generado con otro algoritmo o costo que el configurado"""
+    return password_hash.split("$", 1)[0] != method_prefix(_method())
+
+
+def verify_password(password_hash, password):
+    """
+    Returns:
+        (ok, nuevo_hash) - nuevo_hash es None salvo que haya que actualizar el guardado
+    """
+    if not password_hash or not check_password_hash(password_hash, password):
+        return False, None
+    if needs_rehash(password_hash):
+        return True, hash_password(password)
+    return True, None
@@ -0,0 +1,37 @@
+# api/utils/request_id.py
+"""
+ID de request para correlacionar logs (slow queries, errores, trazas)
+- Se toma del header X-Request-ID (ej: asignado por el proxy de Render) o se genera
+- Se devuelve en la respuesta con el mismo header
+"""
+
+import re
+import uuid
+from flask import g, request, has_request_context
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Solo se aceptan IDs cortos y sin caracteres raros (evita inyección en logs)
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+def get_request_id():
+    """Devuelve el ID del request actual (None fuera de un request)"""
+    if not has_request_context():
+        return None
+    return g.get("request_id")
+
+
+def init_request_id(app):
+    """Registra los hooks que asignan y propagan el ID de request"""
+
+    @app.before_request
+    def _assign_request_id():
+        incoming = request.headers.get(REQUEST_ID_HEADER, "")
+        g.request_id = incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+
+    @app.after_request
+    def _echo_request_id(response):
+        if g.get("request_id"):
+            response.headers[REQUEST_ID_HEADER] = g.request_id
+        return response
@@ -0,0 +1,165 @@
+# api/utils/slow_queries.py
+"""
+Log de consultas SQL lentas con atribución por endpoint
+
+Hooks before/after_cursor_execute de SQLAlchemy (instalados por create_app):
+- Registra toda sentencia que supere SLOW_QUERY_MS
+- Incluye endpoint Flask, ID de request, fingerprint normalizado y cantidad de parámetros
+- Opcional (SLOW_QUERY_EXPLAIN): captura un EXPLAIN (ANALYZE, BUFFERS) por fingerprint
+- Agrega estadísticas por fingerprint (ver GET /api/dashboard/slow-queries)
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+from flask import request, has_request_context
+from sqlalchemy import event
+from utils.request_id import get_request_id
+
+# Estadísticas agregadas por fingerprint (por proceso/worker)
+_stats = {}
+_stats_lock = threading.Lock()
+
+# Normalización: literales y placeholders → "?", listas IN colapsadas, espacios simples
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement):
+    """
+    Normaliza una sentencia SQL para agrupar ejecuciones equivalentes
+
+    Ej: "SELECT ... WHERE title ILIKE %(title_1)s LIMIT 10"
+      → "SELECT ... WHERE title ILIKE ? LIMIT ?"
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _IN_LIST.sub("(?+)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def _param_count(parameters, executemany):
+    """Cantidad de parámetros enlazados (por fila si es executemany)"""
+    if executemany and parameters:
+        parameters = parameters[0]
+    return len(parameters) if parameters else 0
+
+
+def _explain(conn, cursor, statement, parameters):
+    """
+    Ejecuta EXPLAIN sobre la misma conexión DBAPI (sin pasar por los hooks)
+    PostgreSQL: EXPLAIN (ANALYZE, BUFFERS) → re-ejecuta la consulta, por eso solo SELECT
+    SQLite: EXPLAIN QUERY PLAN (no ejecuta)
+    """
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    if conn.dialect.name == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+    elif conn.dialect.name == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        return None
+    try:
+        explain_cursor = cursor.connection.cursor()
+        explain_cursor.execute(prefix + statement, parameters or ())
+        rows = explain_cursor.fetchall()
+        explain_cursor.close()
+        return "\n".join(" ".join(str(col) for col in row) for row in rows)
+    except Exception as e:
+        return f"EXPLAIN falló: {e}"
+
+
+def _record(app, conn, cursor, statement, parameters, executemany, elapsed_ms):
+    """Registra una consulta lenta: log + agregación por fingerprint"""
+    fp = fingerprint(statement)
+    endpoint = request.endpoint if has_request_context() else None
+    params = _param_count(parameters, executemany)
+
+    app.logger.warning(
+        f"Slow query {elapsed_ms:.1f}ms endpoint={endpoint} request_id={get_request_id()} "
+        f"params={params} sql={fp}"
+    )
+
+    with _stats_lock:
+        entry = _stats.get(fp)
+        if entry is None:
+            if len(_stats) >= app.config.get("SLOW_QUERY_MAX_FINGERPRINTS", 500):
+                return
+            entry = _stats[fp] = {
+                "fingerprint": fp,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "params": params,
+                "endpoints": Counter(),
+                "explain": None,
+            }
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["endpoints"][endpoint or "-"] += 1
+        needs_explain = entry["explain"] is None and app.config.get("SLOW_QUERY_EXPLAIN")
+
+    # Una muestra de EXPLAIN por fingerprint (fuera del lock: re-ejecuta la consulta)
+    if needs_explain and not executemany:
+        entry["explain"] = _explain(conn, cursor, statement, parameters)
+
+
+def get_slow_query_stats(limit=20):
+    """Fingerprints ordenados por tiempo total (el principal culpable primero)"""
+    with _stats_lock:
+        entries = sorted(_stats.values(), key=lambda e: e["total_ms"], reverse=True)[:limit]
+        return [
+            {
+                "fingerprint": e["fingerprint"],
+                "count": e["count"],
+                "total_ms": round(e["total_ms"], 1),
+                "avg_ms": round(e["total_ms"] / e["count"], 1),
+                "max_ms": round(e["max_ms"], 1),
+                "params": e["params"],
+                "endpoints": dict(e["endpoints"].most_common(5)),
+                "explain": e["explain"],
+            }
+            for e in entries
+        ]
+
+
+def reset_slow_query_stats():
+    """Limpia las estadísticas acumuladas"""
+    with _stats_lock:
+        _stats.clear()
+
+
+def init_slow_query_log(app, db):
+    """
+    Instala los hooks de timing en todos los engines (primario y réplica)
+    Se desactiva con SLOW_QUERY_MS=0
+    """
+    threshold_ms = app.config.get("SLOW_QUERY_MS", 200)
+    if not threshold_ms:
+        return
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+        if elapsed_ms >= threshold_ms:
+            _record(app, conn, cursor, statement, parameters, executemany, elapsed_ms)
+
+    def _handle_error(exception_context):
+        # La sentencia falló: after_cursor_execute no corre, descartar su timestamp
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,206 @@
+# api/utils/suggest.py
+"""
+Índice en memoria para sugerencias type-ahead de publicaciones
+- Prefijos: lista ordenada de (palabra normalizada, id) → búsqueda con bisect O(log n)
+- Fuzzy: índice invertido de trigramas (fallback cuando el prefijo no alcanza)
+- Se construye la primera vez que se usa (por worker) y se actualiza de forma
+  incremental con los eventos de purga que emiten las escrituras de publicaciones
+"""
+
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from sqlalchemy import func
+from extensions import db
+from models.publication import Publication
+from models.category import Category
+from utils.http_cache import register_purge_handler
+from utils.text import normalize
+
+
+def _words(text):
+    """Palabras normalizadas (solo alfanuméricas)"""
+    return "".join(ch if ch.isalnum() else " " for ch in normalize(text)).split()
+
+
+def _trigrams(word):
+    """Trigramas de una palabra con padding (igual criterio que pg_trgm)"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SuggestIndex:
+    """Índice de títulos/categorías de publicaciones publicadas"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._docs = {}  # id → {"id", "title", "slug", "category", "rank"}
+        self._keys = []  # [(palabra, id)] ordenada
+        self._trigrams = defaultdict(set)  # trigrama → {id}
+        self.loaded = False
+        self.version = 0
+
+    def _doc_words(self, doc):
+        return set(_words(doc["title"]) + _words(doc["category"]))
+
+    def _add(self, doc):
+        self._docs[doc["id"]] = doc
+        for word in self._doc_words(doc):
+            insort(self._keys, (word, doc["id"]))
+            for tri in _trigrams(word):
+                self._trigrams[tri].add(doc["id"])
+
+    def _remove(self, pub_id):
+        doc = self._docs.pop(pub_id, None)
+        if doc is None:
+            return
+        for word in self._doc_words(doc):
+            i = bisect_left(self._keys, (word, pub_id))
+            if i < len(self._keys) and self._keys[i] == (word, pub_id):
+                del self._keys[i]
+            for tri in _trigrams(word):
+                self._trigrams[tri].discard(pub_id)
+
+    def load(self, docs):
+        """Reconstruye el índice completo"""
+        with self._lock:
+            self._docs, self._keys, self._trigrams = {}, [], defaultdict(set)
+            for doc in docs:
+                self._add(doc)
+            self.loaded = True
+            self.version += 1
+
+    def upsert(self, doc):
+        """Agrega o reemplaza una publicación"""
+        with self._lock:
+            self._remove(doc["id"])
+            self._add(doc)
+            self.version += 1
+
+    def remove(self, pub_id):
+        """Quita una publicación (eliminada o ya no publicada)"""
+        with self._lock:
+            self._remove(pub_id)
+            self.version += 1
+
+    def invalidate(self):
+        """Marca el índice para reconstruirse en el próximo uso"""
+        with self._lock:
+            self.loaded = False
+
+    def _prefix_matches(self, prefix):
+        """ids cuyas palabras empiezan con `prefix`"""
+        ids = set()
+        i = bisect_left(self._keys, (prefix,))
+        while i < len(self._keys) and self._keys[i][0].startswith(prefix):
+            ids.add(self._keys[i][1])
+            i += 1
+        return ids
+
+    def search(self, query, limit=8):
+        """
+        Sugerencias para `query`
+        - Todas las palabras deben coincidir como prefijo ("proc matri" → "Proceso de matrícula")
+        - Si no hay suficientes, completa con coincidencias por trigramas (errores de tipeo)
+        Devuelve (docs, fuzzy_usado)
+        """
+        words = _words(query)
+        if not words:
+            return [], False
+
+        with self._lock:
+            ids = None
+            for word in words:
+                matches = self._prefix_matches(word)
+                ids = matches if ids is None else ids & matches
+
+            full = normalize(query).strip()
+            results = sorted(
+                (self._docs[i] for i in ids),
+                key=lambda d: (not normalize(d["title"]).startswith(full), d["rank"])
+            )[:limit]
+
+            fuzzy = False
+            if len(results) < limit:
+                query_tris = set()
+                for word in words:
+                    query_tris |= _trigrams(word)
+                scores = defaultdict(int)
+                for tri in query_tris:
+                    for pub_id in self._trigrams.get(tri, ()):
+                        if pub_id not in ids:
+                            scores[pub_id] += 1
+                # Similaridad mínima: al menos la mitad de los trigramas de la consulta
+                threshold = max(2, len(query_tris) // 2)
+                extra = sorted(
+                    (pub_id for pub_id, score in scores.items() if score >= threshold),
+                    key=lambda pub_id: (-scores[pub_id], self._docs[pub_id]["rank"])
+                )[:limit - len(results)]
+                fuzzy = bool(extra)
+                results += [self._docs[pub_id] for pub_id in extra]
+
+            return results, fuzzy
+
+
+# Índice compartido por el proceso
+suggest_index = SuggestIndex()
+
+
+def load_suggest_docs(pub_id=None):
+    """
+    Lee título, slug y categoría de las publicaciones publicadas (una sola consulta)
+    Con pub_id solo lee esa fila (actualización incremental)
+    """
+    query = db.session.query(
+        Publication.id,
+        Publication.title,
+        Publication.slug,
+        Category.name,
+        func.coalesce(Publication.published_at, Publication.created_at)
+    ).outerjoin(Category, Publication.category_id == Category.id)\
+     .filter(Publication.status == "Publicado")
+    if pub_id is not None:
+        query = query.filter(Publication.id == pub_id)
+
+    return [
+        {
+            "id": row[0],
+            "title": row[1],
+            "slug": row[2],
+            "category": row[3],
+            # Orden secundario: más recientes primero
+            "rank": -row[4].timestamp() if row[4] else 0
+        }
+        for row in query.all()
+    ]
+
+
+def get_suggest_index():
+    """Devuelve el índice, construyéndolo si todavía no se cargó en este worker"""
+    if not suggest_index.loaded:
+        suggest_index.load(load_suggest_docs())
+    return suggest_index
+
+
+def _on_purge(keys):
+    """
+    Actualización incremental con los eventos de purga (después del commit):
+    - "categories": un cambio de nombre de categoría afecta muchas filas → reconstruir
+    - "publication-<id>": recargar solo esa publicación
+    """
+    if not suggest_index.loaded:
+        return
+    if "categories" in keys:
+        suggest_index.invalidate()
+        return
+    for key in keys:
+        if key.startswith("publication-"):
+            pub_id = int(key.split("-", 1)[1])
+            docs = load_suggest_docs(pub_id)
+            if docs:
+                suggest_index.upsert(docs[0])
+            else:
+                suggest_index.remove(pub_id)
+
+
+register_purge_handler(_on_purge)
@@ -0,0 +1,318 @@
+# api/utils/synthetic_data.py
+"""
+Datos sintéticos para pruebas de escala (python manage.py generate_data)
+- Deterministas: la misma semilla genera exactamente las mismas filas (cada
+  tabla usa su propio generador, así cambiar una cantidad no altera las demás)
+- Texto en español con tamaños realistas (títulos, publicaciones de 150 a
+  ~3000 palabras, mensajes cortos) y fechas con más actividad reciente, en días
+  hábiles y horario escolar
+- Inserción con INSERT masivos (Core, sin objetos ORM) en transacciones por
+  lotes: funciona igual en PostgreSQL y SQLite
+- Los usuarios no pueden iniciar sesión (hash inutilizable): una corrida por
+  error contra una BD compartida no deja cuentas admin con contraseña conocida
+- Las filas generadas se reconocen (slug "syn-...", emails @SYNTHETIC_DOMAIN)
+  y se pueden borrar con purge_synthetic(); generate() no corre si ya hay
+  filas sintéticas (los slugs chocarían a mitad de la carga)
+
+Las columnas que normalmente calculan los eventos del ORM (content_html,
+search_text, fingerprint, minhash...) se calculan acá, porque el INSERT masivo no los dispara.
+"""
+
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.engine import make_url
+from extensions import db
+from models.category import Category
+from models.contact_message import ContactMessage
+from models.gallery_item import GalleryItem
+from models.publication import Publication
+from models.user import User
+from utils.content import make_excerpt, reading_time
+from utils.dedup import content_fingerprint, minhash_signature
+from utils.inbox_search import build_search_text
+
+SYNTHETIC_DOMAIN = "datos-sinteticos.test"
+# Ningún hash de werkzeug coincide con esto: check_password_hash siempre da False
+UNUSABLE_PASSWORD_HASH = "!"
+# Hosts considerados locales (fuera de estos generate_data pide --i-know)
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+# Fecha de referencia por defecto: las fechas no dependen del día en que se corre
+REFERENCE_DATE = datetime(2026, 1, 1)
+# Años hacia atrás que cubren las fechas generadas
+HISTORY_YEARS = 5
+
+_WORDS = (
+    "colegio estudiantes docentes padres familia aula clase curso grado sección nivel primaria secundaria "
+    "inicial director directora profesor profesora tutor tutora alumno alumna comunidad educativa proyecto "
+    "actividad taller feria ciencia matemática comunicación arte música deporte campeonato olimpiada "
+    "concurso lectura biblioteca laboratorio computación inglés historia geografía ciudadanía religión "
+    "educación física salud nutrición medio ambiente reciclaje huerto escolar desfile aniversario "
+    "ceremonia premiación reconocimiento logro esfuerzo compromiso valores respeto responsabilidad "
+    "solidaridad puntualidad disciplina convivencia participación matrícula inscripción horario "
+    "calendario bimestre trimestre examen evaluación libreta notas reunión asamblea jornada semana "
+    "mes año día mañana tarde patio auditorio local institución región ciudad distrito ministerio "
+    "importante nuevo nueva gran especial anual primer segundo tercer último mejor destacado "
+    "realizó organizó presentó celebró participó invitó informó anunció recordó agradeció felicitó "
+    "invitamos comunicamos informamos felicitamos agradecemos recordamos convocamos "
+    "con para por sobre entre durante desde hasta según mediante"
+).split()
+_CONNECTORS = ("el", "la", "los", "las", "un", "una", "de", "del", "en", "y", "que", "a", "al", "su", "sus")
+
+_CATEGORY_NAMES = (
+    "Noticias", "Eventos", "Comunicados", "Académico", "Deportes", "Cultura", "Ciencia y Tecnología",
+    "Arte y Música", "Padres de Familia", "Admisión", "Convivencia Escolar", "Medio Ambiente",
+    "Biblioteca", "Tutoría", "Aniversario", "Logros", "Salud", "Inicial", "Primaria", "Secundaria"
+)
+_GALLERY_CATEGORIES = ("eventos", "instalaciones", "deportes", "aniversario", "actividades", "graduacion",
+                       "ferias", "talleres")
+_FIRST_NAMES = ("María", "José", "Luis", "Ana", "Carlos", "Rosa", "Jorge", "Carmen", "Miguel", "Lucía",
+                "Juan", "Sofía", "Pedro", "Valeria", "Diego", "Camila", "Andrés", "Daniela", "Ricardo", "Gabriela")
+_LAST_NAMES = ("Quispe", "Flores", "García", "Rodríguez", "Huamán", "Mamani", "Sánchez", "Torres", "Ramírez",
+               "Vargas", "Castillo", "Mendoza", "Rojas", "Chávez", "Gutiérrez", "Díaz", "Pérez", "Cruz")
+_SUBJECTS = ("Consulta sobre matrícula", "Información de vacantes", "Horario de atención", "Reunión con tutor",
+             "Solicitud de constancia", "Consulta de pensiones", "Uniforme escolar", "Talleres extracurriculares",
+             "Traslado de colegio", "Felicitaciones", "Sugerencia", "Reclamo", None)
+
+
+def _sentence(rng, min_words=6, max_words=18):
+    words = []
+    for _ in range(rng.randint(min_words, max_words)):
+        words.append(rng.choice(_CONNECTORS) if rng.random() < 0.35 else rng.choice(_WORDS))
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng, sentences):
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def _words_target(rng, median, sigma, low, high):
+    """Largo en palabras con distribución log-normal (muchos cortos, pocos muy largos)"""
+    return int(min(max(rng.lognormvariate(math.log(median), sigma), low), high))
+
+
+def _date(rng, now, years=HISTORY_YEARS):
+    """Fecha sesgada a lo reciente, en días hábiles (80%) y horario escolar"""
+    days_ago = years * 365 * rng.betavariate(1, 2.5)
+    moment = now - timedelta(days=days_ago)
+    if moment.weekday() >= 5 and rng.random() < 0.8:
+        moment -= timedelta(days=moment.weekday() - rng.randint(0, 4))
+    return moment.replace(hour=rng.randint(7, 18), minute=rng.randint(0, 59), second=rng.randint(0, 59),
+                          microsecond=0)
+
+
+def _slugify(text):
+    table = str.maketrans("áéíóúñü", "aeiounu")
+    return "-".join(text.lower().translate(table).replace(".", "").split())[:120]
+
+
+def _person(rng):
+    return f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)} {rng.choice(_LAST_NAMES)}"
+
+
+# --- Generadores de filas (dicts de columnas) ---
+
+def category_rows(rng, count, now):
+    for i in range(count):
+        base = _CATEGORY_NAMES[i % len(_CATEGORY_NAMES)]
+        name = base if i < len(_CATEGORY_NAMES) else f"{base} {i // len(_CATEGORY_NAMES) + 1}"
+        yield {
+            "name": name,
+            "slug": f"syn-{_slugify(name)}",
+            "description": _sentence(rng, 8, 20),
+            "updated_at": now
+        }
+
+
+def user_rows(rng, count, now, password_hash):
+    for i in range(count):
+        yield {
+            "email": f"usuario{i + 1}@{SYNTHETIC_DOMAIN}",
+            "password_hash": password_hash,
+            "name": _person(rng),
+            "role": "editor" if rng.random() < 0.7 else "admin",
+            "created_at": _date(rng, now),
+            "updated_at": now
+        }
+
+
+def publication_rows(rng, count, now, category_ids, author_ids):
+    for i in range(count):
+        title = _sentence(rng, 5, 12).rstrip(".")
+        target = _words_target(rng, median=450, sigma=0.6, low=150, high=3000)
+        paragraphs, words = [], 0
+        while words < target:
+            paragraph = _paragraph(rng, rng.randint(2, 6))
+            paragraphs.append(paragraph)
+            words += len(paragraph.split())
+        text = " ".join(paragraphs)
+        created_at = _date(rng, now)
+        roll = rng.random()
+        status = "Publicado" if roll < 0.85 else ("Borrador" if roll < 0.95 else "Archivado")
+        yield {
+            "title": title,
+            "slug": f"syn-{_slugify(title)[:100]}-{i + 1}",
+            "excerpt": make_excerpt(text),
+            "content": "\n\n".join(paragraphs),
+            # Párrafos de texto plano: el Markdown renderizado es exactamente esto
+            "content_html": "".join(f"<p>{p}</p>\n" for p in paragraphs),
+            "content_text": text,
+            "reading_time": reading_time(text),
+            "status": status,
+            "published_at": created_at + timedelta(hours=rng.randint(0, 48)) if status == "Publicado" else None,
+            "author_id": rng.choice(author_ids) if author_ids else None,
+            "category_id": rng.choice(category_ids) if category_ids and rng.random() < 0.95 else None,
+            "image_url": f"https://picsum.photos/seed/syn{i + 1}/1280/720" if rng.random() < 0.7 else None,
+            "created_at": created_at,
+            "updated_at": created_at + timedelta(days=rng.random() * 3)
+        }
+
+
+def gallery_rows(rng, count, now):
+    for i in range(count):
+        created_at = _date(rng, now)
+        if rng.random() < 0.6:
+            url = f"https://res.cloudinary.com/demo/image/upload/colegio/galeria/syn_{i + 1}.jpg"
+        else:
+            url = f"https://picsum.photos/seed/galeria{i + 1}/1600/1067"
+        yield {
+            "title": _sentence(rng, 3, 8).rstrip("."),
+            "url": url,
+            "caption": _sentence(rng, 6, 20) if rng.random() < 0.8 else None,
+            "category": rng.choice(_GALLERY_CATEGORIES),
+            "created_at": created_at,
+            "updated_at": created_at
+        }
+
+
+def message_rows(rng, count, now):
+    for i in range(count):
+        name = _person(rng)
+        email = f"{_slugify(name).replace('-', '.')}.{i + 1}@{SYNTHETIC_DOMAIN}"
+        subject = rng.choice(_SUBJECTS)
+        message = " ".join(_sentence(rng) for _ in range(rng.randint(1, 6)))
+        created_at = _date(rng, now, years=2)
+        # Los viejos ya fueron leídos y notificados (no disparan digests)
+        old = created_at < now - timedelta(days=30)
+        yield {
+            "name": name,
+            "email": email,
+            "phone": f"9{rng.randint(10000000, 99999999)}" if rng.random() < 0.6 else None,
+            "subject": subject,
+            "message": message,
+            "created_at": created_at,
+            "leido": old or rng.random() < 0.3,
+            "fingerprint": content_fingerprint(email, message),
+            "minhash": minhash_signature(message),
+            "duplicate_count": 0,
+            "notified_at": created_at,
+            "search_text": build_search_text(name, email, subject, message)
+        }
+
+
+def is_local_database(uri):
+    """¿La URI apunta a una BD local? (SQLite o PostgreSQL en localhost)"""
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" or (url.host or "localhost") in LOCAL_HOSTS
+
+
+class SyntheticDataExists(Exception):
+    """Ya hay datos sintéticos en la BD (hay que borrarlos antes con purge_synthetic)"""
+
+
+def _synthetic_filters():
+    """(tabla, modelo, condición) de las filas generadas, en orden de borrado (hijas primero)"""
+    synthetic_users = db.session.query(User.id).filter(User.email.like(f"%@{SYNTHETIC_DOMAIN}"))
+    return [
+        ("publicaciones", Publication,
+         db.or_(Publication.slug.like("syn-%"), Publication.author_id.in_(synthetic_users))),
+        ("galeria", GalleryItem,
+         db.or_(GalleryItem.url.like("%/colegio/galeria/syn\\_%", escape="\\"),
+                GalleryItem.url.like("https://picsum.photos/seed/galeria%"))),
+        ("mensajes_contacto", ContactMessage, ContactMessage.email.like(f"%@{SYNTHETIC_DOMAIN}")),
+        ("usuarios", User, User.email.like(f"%@{SYNTHETIC_DOMAIN}")),
+        ("categorias", Category, Category.slug.like("syn-%")),
+    ]
+
+
+def existing_synthetic():
+    """Tablas que ya tienen filas sintéticas (lista vacía si no hay ninguna)"""
+    return [name for name, model, condition in _synthetic_filters()
+            if db.session.query(model.query.filter(condition).exists()).scalar()]
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_insert(model, rows, batch_size=5000, progress=None):
+    """INSERT masivo por lotes (un commit por lote). Returns: filas insertadas"""
+    total = 0
+    started = time.perf_counter()
+    for batch in _batches(rows, batch_size):
+        db.session.execute(insert(model.__table__), batch)
+        db.session.commit()
+        total += len(batch)
+        if progress:
+            progress(model.__tablename__, total, time.perf_counter() - started)
+    return total
+
+
+def generate(counts, seed=42, batch_size=5000, progress=None, until=None):
+    """
+    Genera e inserta los datos
+    Args:
+        counts: dict con categories, users, publications, gallery, messages
+        until: fecha más reciente generada (default: REFERENCE_DATE)
+    Returns:
+        dict tabla → filas insertadas
+    Raises:
+        SyntheticDataExists: si quedan datos de una corrida anterior (los lotes
+        ya commiteados no se deshacen, así que se verifica antes de insertar)
+    """
+    existing = existing_synthetic()
+    if existing:
+        raise SyntheticDataExists(
+            "Ya hay datos sintéticos en: " + ", ".join(existing) + ". Usa --purge para regenerarlos")
+    now = until or REFERENCE_DATE
+    # Un generador por tabla (semilla derivada): las tablas son independientes entre sí
+    rngs = {name: random.Random(f"{seed}:{name}") for name in ("categories", "users", "publications",
+                                                               "gallery", "messages")}
+    result = {}
+    result["categorias"] = bulk_insert(
+        Category, category_rows(rngs["categories"], counts.get("categories", 0), now), batch_size, progress)
+    result["usuarios"] = bulk_insert(
+        User, user_rows(rngs["users"], counts.get("users", 0), now, UNUSABLE_PASSWORD_HASH), batch_size, progress)
+
+    # Solo las filas de esta corrida: las publicaciones no deben colgar de categorías/usuarios reales
+    category_ids = [row[0] for row in db.session.query(Category.id)
+                    .filter(Category.slug.like("syn-%")).order_by(Category.id)]
+    author_ids = [row[0] for row in db.session.query(User.id)
+                  .filter(User.email.like(f"%@{SYNTHETIC_DOMAIN}")).order_by(User.id)]
+    result["publicaciones"] = bulk_insert(
+        Publication,
+        publication_rows(rngs["publications"], counts.get("publications", 0), now, category_ids, author_ids),
+        batch_size, progress)
+    result["galeria"] = bulk_insert(
+        GalleryItem, gallery_rows(rngs["gallery"], counts.get("gallery", 0), now), batch_size, progress)
+    result["mensajes_contacto"] = bulk_insert(
+        ContactMessage, message_rows(rngs["messages"], counts.get("messages", 0), now), batch_size, progress)
+    return result
+
+
+def purge_synthetic():
+    """Borra las filas generadas (reconocibles por slug/email). Returns: dict tabla → filas borradas"""
+    result = {}
+    for name, model, condition in _synthetic_filters():
+        result[name] = model.query.filter(condition).delete(synchronize_session=False)
+    db.session.commit()
+    return result
@@ -0,0 +1,13 @@
+# api/utils/text.py
+"""
+Normalización de texto compartida (sugerencias, búsqueda en la bandeja, duplicados)
+Sin dependencias de modelos: se puede importar desde cualquier módulo
+"""
+
+import unicodedata
+
+
+def normalize(text):
+    """Minúsculas y sin tildes: 'Matrícula' → 'matricula'"""
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
@@ -0,0 +1,255 @@
+# api/utils/token_revocation.py
+"""
+Revocación de tokens JWT (logout, revocar sesiones de un usuario)
+Verificar una tabla de revocados en cada request sumaría una consulta a todos
+los endpoints con JWT; en cambio cada worker mantiene en memoria:
+
+- Un filtro de Bloom con los jti revocados y vigentes (se reconstruye cada
+  REVOCATION_REBUILD_SECONDS, así los vencidos salen del filtro)
+- Un set exacto con los jti revocados desde la última reconstrucción
+- Las fechas de corte por usuario (revocar todas sus sesiones)
+
+El caso común (token no revocado) se resuelve en memoria sin I/O; solo un
+falso positivo del Bloom (~REVOCATION_BLOOM_ERROR) confirma contra la BD.
+
+Propagación: RevokedToken publica la key "token-revocations" por el bus de
+invalidación (utils/invalidation.py) y cada worker trae las filas nuevas en el
+siguiente request. REVOCATION_REFRESH_SECONDS es la red de seguridad si se
+pierde un mensaje del bus.
+
+Las filas nuevas NO se detectan solo por id > último visto: en PostgreSQL dos
+transacciones pueden tomar ids 10 y 11 y hacer commit en orden inverso, y la
+10 quedaría oculta hasta la reconstrucción. Cada lectura incremental vuelve a
+leer también las filas con revoked_at dentro de REVOCATION_OVERLAP_SECONDS
+antes de la lectura anterior (aplicar una fila dos veces no cambia nada).
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app, jsonify
+from extensions import db
+from models.refresh_session import RefreshSession
+from models.revoked_token import RevokedToken
+from utils.http_cache import register_purge_handler
+
+REVOCATION_KEY = "token-revocations"
+# Resultados de confirmación en BD (falsos positivos del Bloom) recordados por worker
+CONFIRMED_CACHE_SIZE = 1024
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre un bytearray (k posiciones por doble hashing de un SHA-256)"""
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.sha256(value.encode("utf-8")).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+def _token_lifetime():
+    """Vida máxima de un token emitido (None si los tokens no vencen)"""
+    config = current_app.config
+    lifetimes = []
+    for key, default in (("JWT_ACCESS_TOKEN_EXPIRES", timedelta(minutes=15)),
+                         ("JWT_REFRESH_TOKEN_EXPIRES", timedelta(days=30))):
+        value = config.get(key, default)
+        if value is False:
+            return None
+        lifetimes.append(value if isinstance(value, timedelta) else timedelta(seconds=value))
+    return max(lifetimes)
+
+
+class RevocationList:
+    """Estado de revocaciones del worker (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(1024)
+        self._recent = set()
+        self._user_cutoffs = {}  # user_id → revoked_at (timestamp UTC)
+        self._confirmed = OrderedDict()  # jti → bool (consultas por falsos positivos)
+        self._last_id = 0
+        self._read_since = None  # Hora (UTC) de la última lectura: inicio de la ventana de solapamiento
+        self._loaded_at = None
+        self._rebuilt_at = None
+        self._dirty = True
+        # Métricas
+        self.checks = 0
+        self.bloom_hits = 0
+        self.db_lookups = 0
+
+    def mark_dirty(self, keys=None):
+        """Handler de purga: otra revocación llegó por el bus"""
+        if keys is None or REVOCATION_KEY in keys:
+            self._dirty = True
+
+    def _rebuild(self, now):
+        """Reconstrucción completa: solo revocaciones vigentes (los vencidos salen del Bloom)"""
+        rows = db.session.query(RevokedToken.id, RevokedToken.jti, RevokedToken.user_id, RevokedToken.revoked_at)\
+            .filter(db.or_(RevokedToken.expires_at.is_(None), RevokedToken.expires_at > now)).all()
+        jti_count = sum(1 for row in rows if row.jti)
+        bloom = BloomFilter(max(jti_count * 2, 1024), current_app.config.get("REVOCATION_BLOOM_ERROR", 0.01))
+        cutoffs = {}
+        for row in rows:
+            self._apply_row(row, bloom, cutoffs)
+        last_id = db.session.query(db.func.max(RevokedToken.id)).scalar() or 0
+        self._bloom, self._recent, self._user_cutoffs = bloom, set(), cutoffs
+        self._confirmed.clear()
+        self._last_id = last_id
+        self._read_since = now
+        self._rebuilt_at = time.monotonic()
+
+    def _refresh_incremental(self, now):
+        """
+        Filas nuevas desde la última lectura (van al set exacto): id mayor al último
+        visto, o revoked_at dentro de la ventana de solapamiento (commits fuera de orden)
+        """
+        overlap = timedelta(seconds=current_app.config.get("REVOCATION_OVERLAP_SECONDS", 60))
+        since = (self._read_since or now) - overlap
+        rows = db.session.query(RevokedToken.id, RevokedToken.jti, RevokedToken.user_id, RevokedToken.revoked_at)\
+            .filter(db.or_(RevokedToken.id > self._last_id, RevokedToken.revoked_at >= since))\
+            .order_by(RevokedToken.id).all()
+        for row in rows:
+            if row.jti:
+                self._recent.add(row.jti)
+                self._confirmed.pop(row.jti, None)
+            else:
+                self._apply_row(row, None, self._user_cutoffs)
+            self._last_id = max(self._last_id, row.id)
+        self._read_since = now
+
+    @staticmethod
+    def _apply_row(row, bloom, cutoffs):
+        if row.jti:
+            bloom.add(row.jti)
+        elif row.user_id is not None:
+            cutoff = row.revoked_at.timestamp() if row.revoked_at.tzinfo else \
+                (row.revoked_at - datetime(1970, 1, 1)).total_seconds()
+            cutoffs[row.user_id] = max(cutoffs.get(row.user_id, 0), cutoff)
+
+    def _ensure_fresh(self):
+        config = current_app.config
+        now = time.monotonic()
+        rebuild_due = self._rebuilt_at is None or now - self._rebuilt_at > config.get("REVOCATION_REBUILD_SECONDS", 3600)
+        refresh_due = self._dirty or self._loaded_at is None or \
+            now - self._loaded_at > config.get("REVOCATION_REFRESH_SECONDS", 300)
+        if not (rebuild_due or refresh_due):
+            return
+        with self._lock:
+            self._dirty = False
+            if rebuild_due:
+                self._rebuild(datetime.utcnow())
+            else:
+                self._refresh_incremental(datetime.utcnow())
+            self._loaded_at = time.monotonic()
+
+    def is_revoked(self, jwt_payload):
+        """Verificación por request (token_in_blocklist_loader)"""
+        self._ensure_fresh()
+        self.checks += 1
+        jti = jwt_payload.get("jti")
+
+        cutoff = self._user_cutoffs.get(_user_id(jwt_payload))
+        if cutoff is not None and jwt_payload.get("iat", 0) <= cutoff:
+            return True
+        if not jti:
+            return False
+        if jti in self._recent:
+            return True
+        if jti not in self._bloom:
+            return False
+
+        # Posible falso positivo: confirmar contra la BD (y recordarlo)
+        self.bloom_hits += 1
+        with self._lock:
+            if jti in self._confirmed:
+                self._confirmed.move_to_end(jti)
+                return self._confirmed[jti]
+        self.db_lookups += 1
+        revoked = db.session.query(RevokedToken.id).filter(RevokedToken.jti == jti).first() is not None
+        with self._lock:
+            self._confirmed[jti] = revoked
+            while len(self._confirmed) > CONFIRMED_CACHE_SIZE:
+                self._confirmed.popitem(last=False)
+        return revoked
+
+    def stats(self):
+        return {
+            "checks": self.checks,
+            "bloom_hits": self.bloom_hits,
+            "db_lookups": self.db_lookups,
+            "bloom_bits": self._bloom.size,
+            "recent_exact": len(self._recent),
+            "users_revoked": len(self._user_cutoffs)
+        }
+
+
+def _user_id(jwt_payload):
+    try:
+        return int(jwt_payload.get("sub"))
+    except (TypeError, ValueError):
+        return None
+
+
+# Lista compartida por el proceso
+revocation_list = RevocationList()
+register_purge_handler(revocation_list.mark_dirty)
+
+
+def revoke_token(jwt_payload):
+    """
+    Revoca un token puntual (logout). No hace commit: lo hace el que llama
+    (el commit publica la revocación a los demás workers)
+    """
+    expires = jwt_payload.get("exp")
+    db.session.add(RevokedToken(
+        jti=jwt_payload["jti"],
+        user_id=_user_id(jwt_payload),
+        expires_at=datetime.utcfromtimestamp(expires) if expires else None
+    ))
+    revocation_list.mark_dirty()  # Este worker la ve aunque el bus esté desactivado
+
+
+def revoke_all_for_user(user_id):
+    """Revoca todos los tokens emitidos hasta ahora para el usuario y sus sesiones de refresh (sin commit)"""
+    now = datetime.utcnow()
+    RefreshSession.query.filter_by(user_id=user_id, revoked_at=None)\
+        .update({"revoked_at": now}, synchronize_session=False)
+    lifetime = _token_lifetime()
+    db.session.add(RevokedToken(
+        jti=None,
+        user_id=user_id,
+        revoked_at=now,
+        expires_at=now + lifetime if lifetime else None
+    ))
+    revocation_list.mark_dirty()
+
+
+def init_token_revocation(jwt_manager):
+    """Conecta la lista de revocados con Flask-JWT-Extended"""
+
+    @jwt_manager.token_in_blocklist_loader
+    def _check_if_token_revoked(_jwt_header, jwt_payload):
+        return revocation_list.is_revoked(jwt_payload)
+
+    @jwt_manager.revoked_token_loader
+    def _revoked_token_response(_jwt_header, _jwt_payload):
+        return jsonify({"msg": "Token revocado. Inicia sesión nuevamente"}), 401
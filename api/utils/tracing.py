@@ -0,0 +1,502 @@
+# api/utils/tracing.py
+"""
+Trazas por request con spans (dónde se fue el tiempo de un request lento)
+
+- Un span raíz por request (X-Request-ID como atributo) y spans hijos para:
+  parseo del body (Werkzeug), cada sentencia SQL y commit, uploads (local/Cloudinary),
+  llamadas salientes (utils/outbound.py), emails y serialización JSON
+- Muestreo: TRACE_SAMPLE_RATE de los requests. El header W3C traceparent
+  entrante solo se respeta con TRACE_TRUST_TRACEPARENT (detrás de un proxy
+  propio), con un tope de TRACE_FORCED_PER_MINUTE trazas forzadas por worker.
+  Los requests no muestreados no crean spans: cada punto instrumentado cuesta
+  una lectura de ContextVar
+- Exportación en formato OTLP/JSON (una línea por traza, el mismo que escribe
+  el file exporter del OpenTelemetry Collector) a TRACE_EXPORT_FILE (por defecto
+  instance/traces.jsonl, rotado a .1 al pasar TRACE_EXPORT_MAX_MB) o a la consola.
+  La escritura la hace un thread aparte: el request no espera el disco
+- Los sub-requests de /api/batch son spans hijos del span del batch (una sola traza)
+- El traceparent saliente solo se manda a los proveedores de TRACE_PROPAGATE_PROVIDERS
+
+Instrumentar código propio:
+    with span("pdf.render", pages=3): ...
+    @traced("upload.local")
+    def upload_to_local(...): ...
+"""
+
+import functools
+import json
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from utils.request_id import get_request_id
+from utils.slow_queries import fingerprint
+
+TRACEPARENT_HEADER = "traceparent"
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# Tipos de span de OTLP
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+# Códigos de estado de OTLP
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Sentencias SQL más largas se truncan en el atributo db.statement
+MAX_STATEMENT_CHARS = 2000
+
+# Span activo del contexto (None = request no muestreado o fuera de un request)
+_current_span = ContextVar("trace_span", default=None)
+# Pila de (request, span raíz, span activo antes del request) de los requests
+# trazados en curso: los sub-requests de /api/batch se apilan sobre el batch
+_request_traces = ContextVar("request_traces", default=())
+
+
+class Span:
+    """Intervalo de tiempo con nombre y atributos dentro de una traza"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "attributes",
+                 "start_ns", "end_ns", "status", "status_message", "_token")
+
+    def __init__(self, trace, name, parent_id=None, kind=KIND_INTERNAL, attributes=None):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = None
+        self.status_message = None
+        self._token = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_error(self, exc):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"[:500]
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.spans.append(self)
+
+    def child(self, name, kind=KIND_INTERNAL, attributes=None):
+        return Span(self.trace, name, parent_id=self.span_id, kind=kind, attributes=attributes)
+
+    # Context manager: activa el span (los spans creados adentro son sus hijos)
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record_error(exc)
+        self.end()
+        _current_span.reset(self._token)
+        return False
+
+    def to_otlp(self):
+        data = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items() if v is not None],
+        }
+        if self.parent_id:
+            data["parentSpanId"] = self.parent_id
+        if self.status is not None:
+            data["status"] = {"code": self.status}
+            if self.status_message:
+                data["status"]["message"] = self.status_message
+        return data
+
+
+class Trace:
+    """Spans terminados de un request muestreado"""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id=None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.spans = []
+
+
+class _NoopSpan:
+    """Span de los requests no muestreados: no mide ni guarda nada"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def record_error(self, exc):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def current_span():
+    """Span activo (None si el request no se está trazando)"""
+    return _current_span.get()
+
+
+def span(name, kind=KIND_INTERNAL, **attributes):
+    """
+    Span hijo del activo (context manager). Sin traza activa devuelve un no-op
+    Ej: with span("cloudinary.upload", folder=folder): ...
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return _NOOP_SPAN
+    return parent.child(name, kind=kind, attributes=attributes)
+
+
+def traced(name=None, kind=KIND_INTERNAL):
+    """Decorador: la función completa como span (nombre por defecto: módulo.función)"""
+
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name, kind=kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def inject_traceparent(headers):
+    """Agrega el header traceparent (propagación a servicios externos) si hay traza activa"""
+    active = _current_span.get()
+    if active is not None:
+        headers[TRACEPARENT_HEADER] = f"00-{active.trace.trace_id}-{active.span_id}-01"
+    return headers
+
+
+# --- Exportación ---
+
+class TraceExporter:
+    """Cola acotada + thread escritor por worker (si la cola se llena se descartan trazas)"""
+
+    def __init__(self):
+        self._queue = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.sampled = 0
+        self.exported = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def ensure_started(self, app):
+        """Arranca el thread la primera vez (o después de un fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=app.config.get("TRACE_QUEUE_SIZE", 1000))
+            target = app.config.get("TRACE_EXPORTER", "file")
+            path = app.config.get("TRACE_EXPORT_FILE") or os.path.join(app.instance_path, "traces.jsonl")
+            max_bytes = int(app.config.get("TRACE_EXPORT_MAX_MB", 100) * 1024 * 1024)
+            resource = {"attributes": [
+                _otlp_attribute("service.name", app.config.get("TRACE_SERVICE_NAME", "colegio-api")),
+                _otlp_attribute("process.pid", os.getpid()),
+            ]}
+            thread = threading.Thread(
+                target=self._run, args=(target, path, max_bytes, resource), name="trace-exporter", daemon=True
+            )
+            thread.start()
+            self._pid = os.getpid()
+
+    def submit(self, trace):
+        self.sampled += 1
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self, target, path, max_bytes, resource):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 100:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = "".join(json.dumps(self._encode(trace, resource), separators=(",", ":")) + "\n"
+                            for trace in batch)
+            try:
+                if target == "console":
+                    sys.stdout.write(lines)
+                    sys.stdout.flush()
+                else:
+                    _append(path, lines, max_bytes)
+                self.exported += len(batch)
+            except OSError:
+                self.errors += 1
+
+    @staticmethod
+    def _encode(trace, resource):
+        return {"resourceSpans": [{
+            "resource": resource,
+            "scopeSpans": [{
+                "scope": {"name": "colegio-api.tracing"},
+                "spans": [s.to_otlp() for s in trace.spans]
+            }]
+        }]}
+
+    def stats(self):
+        return {
+            "sampled": self.sampled,
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "queued": self._queue.qsize() if self._queue is not None else 0
+        }
+
+
+exporter = TraceExporter()
+
+
+def _append(path, lines, max_bytes):
+    """Agrega al archivo; si pasó max_bytes lo rota antes a <path>.1 (se conserva uno)"""
+    try:
+        if max_bytes and os.path.getsize(path) >= max_bytes:
+            os.replace(path, f"{path}.1")
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(lines)
+
+
+def get_tracing_stats(app):
+    stats = exporter.stats()
+    stats.update({
+        "enabled": app.config.get("TRACING_ENABLED", False),
+        "sample_rate": app.config.get("TRACE_SAMPLE_RATE", 0.01),
+        "trust_traceparent": app.config.get("TRACE_TRUST_TRACEPARENT", False),
+        "exporter": app.config.get("TRACE_EXPORTER", "file")
+    })
+    return stats
+
+
+# --- Instrumentación ---
+
+class TracingJSONProvider(DefaultJSONProvider):
+    """jsonify() con su propio span (serializar listas grandes también cuesta)"""
+
+    def response(self, *args, **kwargs):
+        with span("json.serialize"):
+            return super().response(*args, **kwargs)
+
+
+class _ForcedSampleLimit:
+    """Tope de trazas forzadas por traceparent por minuto (por worker)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._minute = None
+        self._count = 0
+
+    def allow(self, per_minute):
+        minute = int(time.monotonic() // 60)
+        with self._lock:
+            if minute != self._minute:
+                self._minute, self._count = minute, 0
+            if self._count >= per_minute:
+                return False
+            self._count += 1
+            return True
+
+
+_forced_samples = _ForcedSampleLimit()
+
+
+def _sampling_decision(app):
+    """
+    (trace_id, parent_span_id, sampled) según TRACE_SAMPLE_RATE
+    El traceparent entrante solo cuenta con TRACE_TRUST_TRACEPARENT: si no,
+    cualquier cliente anónimo podría forzar la traza de todos sus requests
+    """
+    if app.config.get("TRACE_TRUST_TRACEPARENT"):
+        match = _TRACEPARENT.match(request.headers.get(TRACEPARENT_HEADER, ""))
+        if match:
+            forced = bool(int(match.group(3), 16) & 1) and \
+                _forced_samples.allow(app.config.get("TRACE_FORCED_PER_MINUTE", 60))
+            return match.group(1), match.group(2), forced
+    return None, None, random.random() < app.config.get("TRACE_SAMPLE_RATE", 0.01)
+
+
+def _install_sql_hooks(app, db):
+    """Un span por sentencia SQL (solo si hay traza activa)"""
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        if parent is None:
+            return
+        child = parent.child("db.query", kind=KIND_CLIENT, attributes={
+            "db.system": conn.dialect.name,
+            "db.statement": fingerprint(statement)[:MAX_STATEMENT_CHARS],
+            "db.executemany": executemany or None
+        })
+        conn.info.setdefault("trace_spans", []).append(child)
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_span.get() is not None and conn.info.get("trace_spans"):
+            conn.info["trace_spans"].pop().end()
+
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("trace_spans"):
+            failed = conn.info["trace_spans"].pop()
+            failed.record_error(exception_context.original_exception)
+            failed.end()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(engine, "handle_error", _handle_error)
+
+
+def _install_commit_hooks(db):
+    """Span db.commit: flush de la sesión + COMMIT (las sentencias del flush quedan como hijas)"""
+
+    def _before_commit(session):
+        parent = _current_span.get()
+        if parent is not None and "trace_commit_span" not in session.info:
+            session.info["trace_commit_span"] = parent.child("db.commit", kind=KIND_CLIENT).__enter__()
+
+    def _after_commit(session):
+        commit_span = session.info.pop("trace_commit_span", None)
+        if commit_span is not None:
+            commit_span.__exit__(None, None, None)
+
+    def _after_rollback(session):
+        commit_span = session.info.pop("trace_commit_span", None)
+        if commit_span is not None:
+            commit_span.status = STATUS_ERROR
+            commit_span.__exit__(None, None, None)
+
+    event.listen(db.session, "before_commit", _before_commit)
+    event.listen(db.session, "after_commit", _after_commit)
+    event.listen(db.session, "after_rollback", _after_rollback)
+
+
+_hooks_registered = False
+
+
+def init_tracing(app, db):
+    """
+    Registra los hooks de request, SQL y JSON
+    Se activa con TRACING_ENABLED=1 (llamar después de init_request_id)
+    """
+    if not app.config.get("TRACING_ENABLED"):
+        return
+
+    global _hooks_registered
+    app.json = TracingJSONProvider(app)
+    _install_sql_hooks(app, db)
+    if not _hooks_registered:
+        # db.session es global: sus eventos se registran una sola vez por proceso
+        _install_commit_hooks(db)
+        _hooks_registered = True
+
+    def _request_trace():
+        """Entrada de la pila del request actual (None si no se traza)"""
+        stack = _request_traces.get()
+        if stack and stack[-1][0] is request._get_current_object():
+            return stack[-1]
+        return None
+
+    @app.before_request
+    def _start_trace():
+        rule = request.url_rule.rule if request.url_rule else None
+        name = f"{request.method} {rule or request.path}"
+        attributes = {
+            "http.request.method": request.method,
+            "http.route": rule,
+            "url.path": request.path,
+            "request.id": get_request_id(),
+            "http.request.body.size": request.content_length
+        }
+        previous = _current_span.get()
+        if previous is not None:
+            # Sub-request de un request trazado (batch): span hijo en la misma traza
+            root = previous.child(name, kind=KIND_SERVER, attributes=attributes)
+        else:
+            trace_id, parent_id, sampled = _sampling_decision(app)
+            if not sampled:
+                return
+            exporter.ensure_started(app)
+            root = Span(Trace(trace_id), name, parent_id=parent_id, kind=KIND_SERVER, attributes=attributes)
+        _request_traces.set(_request_traces.get() + ((request._get_current_object(), root, previous),))
+        _current_span.set(root)
+
+        # Parseo del body: Werkzeug lo hace perezoso; acá se fuerza para medirlo aparte
+        if request.mimetype in ("multipart/form-data", "application/x-www-form-urlencoded"):
+            with span("http.parse_body", **{"http.request.mimetype": request.mimetype}):
+                request.form
+        elif request.is_json:
+            with span("http.parse_json"):
+                request.get_json(silent=True)
+
+    @app.after_request
+    def _finish_trace_response(response):
+        entry = _request_trace()
+        if entry is not None:
+            root = entry[1]
+            root.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 500:
+                root.status = STATUS_ERROR
+            response.headers[TRACEPARENT_HEADER] = f"00-{root.trace.trace_id}-{root.span_id}-01"
+        return response
+
+    @app.teardown_request
+    def _end_trace(exc):
+        entry = _request_trace()
+        if entry is None:
+            return
+        _request_traces.set(_request_traces.get()[:-1])
+        _, root, previous = entry
+        if exc is not None:
+            root.record_error(exc)
+        root.end()
+        # Siempre se vuelve al span de antes del request: un span muerto en la
+        # ContextVar haría que los requests siguientes del thread le agreguen spans
+        _current_span.set(previous)
+        if previous is None:
+            exporter.submit(root.trace)
@@ -5,6 +5,8 @@ Soporta Cloudinary (servicio externo) y filesystem local
 import os
 from werkzeug.utils import secure_filename
 from flask import current_app
+from utils.outbound import cloudinary_client, get_provider, ProviderUnavailable
+from utils.tracing import traced
 
 # Extensiones permitidas para imágenes y videos
 ALLOWED_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'bmp', 'tiff'}
@@ -22,6 +24,7 @@ def allowed_file(filename):
 # OPCIÓN 1: CLOUDINARY (Servicio Externo - CDN)
 # ==============================================
 
+@traced("upload.cloudinary")
 def upload_to_cloudinary(file, folder="colegio"):
     """
     Sube archivo a Cloudinary (servicio cloud con CDN)
@@ -40,26 +43,23 @@ def upload_to_cloudinary(file, folder="colegio"):
         dict con url, public_id, width, height
     """
     try:
-        import cloudinary
-        import cloudinary.uploader
+        # Cliente configurado una vez por proceso (utils/outbound.py)
+        uploader = cloudinary_client()
+        provider = get_provider("cloudinary")
         
-        # Configurar Cloudinary con variables de entorno
-        cloudinary.config(
-            cloud_name=os.environ.get("CLOUDINARY_CLOUD_NAME"),
-            api_key=os.environ.get("CLOUDINARY_API_KEY"),
-            api_secret=os.environ.get("CLOUDINARY_API_SECRET")
-        )
-        
-        # Upload con opciones
-        result = cloudinary.uploader.upload(
-            file,
-            folder=folder,  # Organizar en carpetas
-            resource_type="auto",  # Detecta si es imagen o video
-            transformation=[
-                {"quality": "auto"},  # Optimización automática
-                {"fetch_format": "auto"}  # Formato óptimo (WebP si el navegador lo soporta)
-            ]
-        )
+        # Upload con opciones (falla al instante si el circuito está abierto)
+        with provider.guard():
+            result = uploader.upload(
+                file,
+                folder=folder,  # Organizar en carpetas
+                resource_type="auto",  # Detecta si es imagen o video
+                # Timeout propio: resource_type="auto" incluye videos (el de lectura genérico es de segundos)
+                timeout=current_app.config.get("CLOUDINARY_UPLOAD_TIMEOUT", 100),
+                transformation=[
+                    {"quality": "auto"},  # Optimización automática
+                    {"fetch_format": "auto"}  # Formato óptimo (WebP si el navegador lo soporta)
+                ]
+            )
         
         return {
             "url": result.get("url", ""),  # URL HTTP del archivo
@@ -71,8 +71,8 @@ def upload_to_cloudinary(file, folder="colegio"):
             "resource_type": result.get("resource_type", "image")  # image o video
         }
         
-    except ImportError:
-        raise Exception("cloudinary no instalado. Ejecuta: pip install cloudinary")
+    except ProviderUnavailable as e:
+        raise Exception(f"Cloudinary no disponible: {str(e)}")
     except Exception as e:
         raise Exception(f"Error subiendo a Cloudinary: {str(e)}")
 
@@ -85,16 +85,11 @@ def delete_from_cloudinary(public_id):
         public_id: ID del archivo en Cloudinary
     """
     try:
-        import cloudinary
-        import cloudinary.uploader
-        
-        cloudinary.config(
-            cloud_name=os.environ.get("CLOUDINARY_CLOUD_NAME"),
-            api_key=os.environ.get("CLOUDINARY_API_KEY"),
-            api_secret=os.environ.get("CLOUDINARY_API_SECRET")
-        )
+        uploader = cloudinary_client()
+        provider = get_provider("cloudinary")
         
-        result = cloudinary.uploader.destroy(public_id)
+        with provider.guard():
+            result = uploader.destroy(public_id, timeout=provider.timeout[1])
         return result
         
     except Exception as e:
@@ -105,6 +100,7 @@ def delete_from_cloudinary(public_id):
 # OPCIÓN 2: FILESYSTEM LOCAL (Servidor)
 # ==============================================
 
+@traced("upload.local")
 def upload_to_local(file, subfolder="galeria"):
     """
     Sube archivo al filesystem del servidor
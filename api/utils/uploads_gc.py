@@ -0,0 +1,240 @@
+# api/utils/uploads_gc.py
+"""
+Recolector de archivos huérfanos en uploads/ (subidos localmente, sin fila que los use)
+Aparecen al reemplazar image_url de una publicación, al fallar el commit después
+de file.save o si falla el borrado en delete_galeria_item.
+
+- Referencias: galeria.url y publicaciones.image_url, leídas en lotes por id
+  (solo las columnas, sin objetos ORM)
+- Archivos: recorrido con os.scandir en streaming (no se arma la lista completa)
+- Solo se tocan archivos más viejos que el período de gracia (un upload recién
+  guardado todavía puede estar esperando su commit) y se re-verifica cada lote
+  de candidatos contra la BD justo antes de borrarlo
+- Modos: "dry-run" (solo reporte), "quarantine" (mover a uploads/.quarantine/<fecha>/)
+  o "delete"
+- Directorios ocultos (.quarantine) no se recorren ni se sirven (serve_uploads
+  rechaza rutas con segmentos que empiezan con punto)
+
+Uso: python manage.py gc_uploads, o UPLOADS_GC_INTERVAL_HOURS > 0 para el job en segundo plano
+"""
+
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+from extensions import db
+from models.gallery_item import GalleryItem
+from models.publication import Publication
+
+GC_MODES = ("dry-run", "quarantine", "delete")
+QUARANTINE_DIR = ".quarantine"
+# Rutas de ejemplo incluidas en el reporte
+REPORT_SAMPLE = 50
+# Columnas con URLs de archivos subidos
+_REFERENCE_COLUMNS = ((GalleryItem, GalleryItem.url), (Publication, Publication.image_url))
+
+
+def _relative_upload_path(url):
+    """'/uploads/galeria/a.jpg' (o URL absoluta a /uploads/...) → 'galeria/a.jpg'; None si no es local"""
+    if not url:
+        return None
+    path = urlparse(url).path
+    marker = path.find("/uploads/")
+    if marker == -1:
+        return None
+    return os.path.normpath(path[marker + len("/uploads/"):])
+
+
+def referenced_paths(batch_size=1000):
+    """Conjunto de rutas (relativas a uploads/) referenciadas por alguna fila"""
+    referenced = set()
+    for model, column in _REFERENCE_COLUMNS:
+        last_id = 0
+        while True:
+            rows = db.session.query(model.id, column)\
+                .filter(model.id > last_id, column.like("%/uploads/%"))\
+                .order_by(model.id).limit(batch_size).all()
+            if not rows:
+                break
+            for row_id, url in rows:
+                relative = _relative_upload_path(url)
+                if relative:
+                    referenced.add(relative)
+            last_id = rows[-1][0]
+    return referenced
+
+
+def _still_referenced(relative_paths):
+    """Cuáles de los candidatos aparecieron referenciados desde que se armó el conjunto"""
+    urls = [f"/uploads/{path}" for path in relative_paths]
+    found = set()
+    for model, column in _REFERENCE_COLUMNS:
+        for (url,) in db.session.query(column).filter(column.in_(urls)):
+            found.add(_relative_upload_path(url))
+    return found
+
+
+def iter_upload_files(root):
+    """(ruta relativa, DirEntry) de cada archivo bajo root, recorriendo con os.scandir"""
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield os.path.relpath(entry.path, root), entry
+        except FileNotFoundError:
+            continue
+
+
+def _remove(root, relative, mode, quarantine_root):
+    source = os.path.join(root, relative)
+    if mode == "delete":
+        os.remove(source)
+    else:
+        target = os.path.join(quarantine_root, relative)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(source, target)
+
+
+def purge_quarantine(root, retention_days):
+    """Borra las carpetas de cuarentena (una por fecha) más viejas que retention_days"""
+    base = os.path.join(root, QUARANTINE_DIR)
+    cutoff = time.time() - retention_days * 86400
+    removed = 0
+    if not os.path.isdir(base):
+        return removed
+    with os.scandir(base) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+    return removed
+
+
+def collect_orphans(root, mode="dry-run", grace_hours=24, batch_size=1000):
+    """
+    Busca (y según el modo, mueve o borra) los archivos de uploads/ que ninguna fila referencia
+    Returns:
+        dict con el reporte: scanned, orphans, orphan_bytes, skipped_recent, removed, sample
+    """
+    if mode not in GC_MODES:
+        raise ValueError(f"Modo inválido: {mode}. Usa: {', '.join(GC_MODES)}")
+
+    referenced = referenced_paths(batch_size)
+    cutoff = time.time() - grace_hours * 3600
+    quarantine_root = os.path.join(root, QUARANTINE_DIR, datetime.utcnow().strftime("%Y%m%d-%H%M%S"))
+    report = {"mode": mode, "scanned": 0, "orphans": 0, "orphan_bytes": 0, "skipped_recent": 0,
+              "removed": 0, "errors": 0, "sample": []}
+
+    def flush(candidates):
+        # Re-verificar contra la BD justo antes de tocar los archivos
+        if mode != "dry-run":
+            rescued = _still_referenced([relative for relative, _size in candidates])
+            candidates = [(relative, size) for relative, size in candidates if relative not in rescued]
+        for relative, size in candidates:
+            report["orphans"] += 1
+            report["orphan_bytes"] += size
+            if len(report["sample"]) < REPORT_SAMPLE:
+                report["sample"].append(relative)
+            if mode == "dry-run":
+                continue
+            try:
+                _remove(root, relative, mode, quarantine_root)
+                report["removed"] += 1
+            except OSError:
+                report["errors"] += 1
+
+    candidates = []
+    for relative, entry in iter_upload_files(root):
+        report["scanned"] += 1
+        if relative in referenced:
+            continue
+        stat = entry.stat(follow_symlinks=False)
+        if stat.st_mtime > cutoff:
+            report["skipped_recent"] += 1
+            continue
+        candidates.append((relative, stat.st_size))
+        if len(candidates) >= batch_size:
+            flush(candidates)
+            candidates = []
+    if candidates:
+        flush(candidates)
+    return report
+
+
+class UploadsGCScheduler:
+    """
+    Thread por worker que corre el GC cada UPLOADS_GC_INTERVAL_HOURS
+    Un lock de archivo (uploads/.gc.lock) hace que solo un worker lo ejecute por intervalo
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread_pid = None
+
+    def ensure_started(self, app):
+        """Arranca el thread la primera vez (o después de un fork)"""
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            threading.Thread(target=self._run, args=(app,), name="uploads-gc", daemon=True).start()
+
+    def _run(self, app):
+        interval = app.config["UPLOADS_GC_INTERVAL_HOURS"] * 3600
+        while True:
+            time.sleep(min(interval, 600))
+            try:
+                self._maybe_collect(app, interval)
+            except Exception as e:
+                app.logger.warning(f"Error en el GC de uploads: {e}")
+
+    def _maybe_collect(self, app, interval):
+        import fcntl
+
+        root = os.path.join(app.root_path, "uploads")
+        os.makedirs(root, exist_ok=True)
+        lock_path = os.path.join(root, ".gc.lock")
+        with open(lock_path, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return  # Otro worker lo está ejecutando
+            # El mtime del lock marca la última ejecución (compartido entre workers)
+            if time.time() - os.path.getmtime(lock_path) < interval and os.path.getsize(lock_path):
+                return
+            config = app.config
+            with app.app_context():
+                report = collect_orphans(
+                    root,
+                    mode=config.get("UPLOADS_GC_MODE", "quarantine"),
+                    grace_hours=config.get("UPLOADS_GC_GRACE_HOURS", 24)
+                )
+            purge_quarantine(root, config.get("UPLOADS_GC_QUARANTINE_DAYS", 30))
+            lock_file.truncate(0)
+            lock_file.write(f"{datetime.utcnow().isoformat()} {report['removed']} {report['orphan_bytes']}\n")
+            app.logger.info(
+                f"GC de uploads: {report['removed']} archivos ({report['orphan_bytes']} bytes) en modo {report['mode']}"
+            )
+
+
+# Instancia compartida por el proceso
+gc_scheduler = UploadsGCScheduler()
+
+
+def init_uploads_gc(app):
+    """Arranca el job en el primer request de cada worker (los threads no sobreviven al fork de --preload)"""
+
+    @app.before_request
+    def _start_uploads_gc():
+        gc_scheduler.ensure_started(app)
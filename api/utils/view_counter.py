@@ -0,0 +1,130 @@
+# api/utils/view_counter.py
+"""
+Contador de vistas de publicaciones con escritura en lotes
+- record_view() solo incrementa un Counter en memoria (sin I/O en el request)
+- Un thread por worker hace flush cada VIEW_FLUSH_INTERVAL segundos:
+  un único INSERT ... ON CONFLICT DO UPDATE (views = views + n) por lote
+- Evita el UPDATE por request sobre filas "calientes" (serializaría los workers)
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from flask import current_app
+from extensions import db
+from models.publication import Publication
+from models.publication_view import PublicationView
+
+
+class ViewCounter:
+    """Incrementos pendientes por (publication_id, día) de este proceso"""
+
+    def __init__(self):
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._app = None
+        self._thread_pid = None
+        self._last_flush = time.monotonic()
+
+    def record(self, publication_id):
+        """Suma una vista (O(1), sin consultar la BD)"""
+        day = datetime.utcnow().date()
+        with self._lock:
+            self._pending[(publication_id, day)] += 1
+        self._ensure_flusher()
+
+    def _ensure_flusher(self):
+        """
+        Arranca el thread de flush la primera vez (o después de un fork:
+        los threads del master no existen en los workers de gunicorn)
+        """
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._app = current_app._get_current_object()
+            self._thread_pid = os.getpid()
+            thread = threading.Thread(target=self._run, name="view-counter-flush", daemon=True)
+            thread.start()
+
+    def _run(self):
+        interval = self._app.config.get("VIEW_FLUSH_INTERVAL", 30)
+        while True:
+            time.sleep(interval)
+            self.flush()
+
+    def flush(self):
+        """Escribe los incrementos pendientes en un solo lote; si falla, se reintentan después"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending or self._app is None:
+            return 0
+
+        try:
+            with self._app.app_context():
+                _write_batch(pending)
+        except Exception as e:
+            with self._lock:
+                self._pending.update(pending)
+            self._app.logger.warning(f"No se pudieron guardar las vistas ({len(pending)} filas): {e}")
+            return 0
+        self._last_flush = time.monotonic()
+        return sum(pending.values())
+
+    def backlog(self):
+        """(filas pendientes, segundos desde el último flush exitoso o None si no hay pendientes)"""
+        with self._lock:
+            rows = len(self._pending)
+        return rows, (time.monotonic() - self._last_flush) if rows else None
+
+
+def _write_batch(pending):
+    """Upsert de (publication_id, day, views) sumando a lo que ya existe"""
+    # Publicaciones eliminadas desde que se contaron: se descartan (evita violar la FK)
+    ids = {pub_id for pub_id, _day in pending}
+    existing = {row[0] for row in db.session.query(Publication.id).filter(Publication.id.in_(ids))}
+    rows = [
+        {"publication_id": pub_id, "day": day, "views": views}
+        for (pub_id, day), views in pending.items()
+        if pub_id in existing
+    ]
+    if not rows:
+        return
+
+    dialect = db.engine.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(PublicationView).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["publication_id", "day"],
+            set_={"views": PublicationView.views + stmt.excluded.views}
+        )
+        db.session.execute(stmt)
+    else:
+        # Otros motores: UPDATE y, si no existía la fila, INSERT
+        for row in rows:
+            updated = PublicationView.query.filter_by(
+                publication_id=row["publication_id"], day=row["day"]
+            ).update({"views": PublicationView.views + row["views"]})
+            if not updated:
+                db.session.add(PublicationView(**row))
+    db.session.commit()
+
+
+# Instancia compartida por el proceso
+view_counter = ViewCounter()
+
+# Al apagar el worker, guardar lo pendiente
+atexit.register(view_counter.flush)
+
+
+def record_view(publication_id):
+    """Registra una vista de la publicación (se persiste en el próximo flush)"""
+    view_counter.record(publication_id)
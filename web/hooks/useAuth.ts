@@ -42,8 +42,8 @@ export function useAuth() {
   };
 
   const logout = () => {
+    authService.logout(); // Primero: necesita el token para revocarlo
     logoutStore();
-    authService.logout();
     
     showToast({
       type: 'success',
@@ -76,6 +76,7 @@ export const ROUTES = {
 // Local Storage Keys
 export const STORAGE_KEYS = {
   AUTH_TOKEN: 'auth_token',
+  REFRESH_TOKEN: 'refresh_token',
   USER: 'user',
 } as const;
 
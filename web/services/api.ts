@@ -5,7 +5,7 @@
 
 import axios, { AxiosError, InternalAxiosRequestConfig } from 'axios';
 import { STORAGE_KEYS } from '@/lib/constants';
-import type { ApiError } from '@/types';
+import type { ApiError, RefreshResponse } from '@/types';
 
 // Determinar la URL correcta según el entorno
 // Server-side (dentro de Docker): usa API_URL interna
@@ -48,20 +48,54 @@ api.interceptors.request.use(
   }
 );
 
+// Renovación del access token con el refresh token (una sola a la vez por pestaña)
+let refreshPromise: Promise<string | null> | null = null;
+
+const refreshAccessToken = (): Promise<string | null> => {
+  if (!refreshPromise) {
+    refreshPromise = (async () => {
+      const refreshToken = localStorage.getItem(STORAGE_KEYS.REFRESH_TOKEN);
+      if (!refreshToken) return null;
+      try {
+        // axios "pelado": sin interceptores (evita loops con este mismo handler)
+        const { data } = await axios.post<RefreshResponse>(
+          `${getApiUrl()}/administracion/refresh`,
+          null,
+          { headers: { Authorization: `Bearer ${refreshToken}` } }
+        );
+        localStorage.setItem(STORAGE_KEYS.AUTH_TOKEN, data.access_token);
+        localStorage.setItem(STORAGE_KEYS.REFRESH_TOKEN, data.refresh_token);
+        return data.access_token;
+      } catch (err) {
+        // 409: otra pestaña acaba de renovar; su token nuevo ya está en localStorage
+        if (axios.isAxiosError(err) && err.response?.status === 409) {
+          await new Promise((resolve) => setTimeout(resolve, 500));
+          const current = localStorage.getItem(STORAGE_KEYS.REFRESH_TOKEN);
+          return current && current !== refreshToken ? localStorage.getItem(STORAGE_KEYS.AUTH_TOKEN) : null;
+        }
+        return null;
+      } finally {
+        refreshPromise = null;
+      }
+    })();
+  }
+  return refreshPromise;
+};
+
 // Response interceptor: Manejo global de errores
 api.interceptors.response.use(
   (response) => {
     // Si la respuesta es exitosa, retornarla directamente
     return response;
   },
-  (error: AxiosError<ApiError>) => {
+  async (error: AxiosError<ApiError>) => {
     // Manejo de errores comunes
     if (error.response) {
       const status = error.response.status;
       
       switch (status) {
         case 401:
-          // No autorizado: limpiar sesión y redirect a login
+          // No autorizado: intentar renovar el token; si no se puede, limpiar sesión y redirect a login
           if (typeof window !== 'undefined') {
             const currentPath = window.location.pathname;
             const isLoginPage = currentPath.includes('/login');
@@ -73,9 +107,21 @@ api.interceptors.response.use(
               break;
             }
             
+            // Access token vencido: renovar y reintentar la petición una vez
+            const original = error.config as (InternalAxiosRequestConfig & { _retried?: boolean }) | undefined;
+            if (original && !original._retried) {
+              original._retried = true;
+              const newToken = await refreshAccessToken();
+              if (newToken) {
+                original.headers.Authorization = `Bearer ${newToken}`;
+                return api(original);
+              }
+            }
+            
             // Para otras rutas protegidas, limpiar sesión y redirigir
             console.warn('⚠️ Sesión expirada. Redirigiendo a login...');
             localStorage.removeItem(STORAGE_KEYS.AUTH_TOKEN);
+            localStorage.removeItem(STORAGE_KEYS.REFRESH_TOKEN);
             localStorage.removeItem(STORAGE_KEYS.USER);
             
             // Mostrar mensaje antes de redirigir
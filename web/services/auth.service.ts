@@ -3,7 +3,9 @@
  * Servicios de autenticación y perfil de usuario
  */
 
+import axios from 'axios';
 import api from './api';
+import { STORAGE_KEYS } from '@/lib/constants';
 import type { LoginCredentials, LoginResponse, User } from '@/types';
 
 export const authService = {
@@ -12,6 +14,10 @@ export const authService = {
    */
   login: async (credentials: LoginCredentials): Promise<LoginResponse> => {
     const response = await api.post<LoginResponse>('/administracion/login', credentials);
+    if (typeof window !== 'undefined' && response.data.refresh_token) {
+      // El interceptor de api.ts lo usa para renovar el access token sin pedir la contraseña
+      localStorage.setItem(STORAGE_KEYS.REFRESH_TOKEN, response.data.refresh_token);
+    }
     return response.data;
   },
 
@@ -24,12 +30,32 @@ export const authService = {
   },
 
   /**
-   * Logout (limpia localStorage)
+   * Logout: revoca el token en la API (best-effort) y limpia localStorage
    */
   logout: (): void => {
     if (typeof window !== 'undefined') {
-      localStorage.removeItem('auth_token');
-      localStorage.removeItem('user');
+      const token = localStorage.getItem(STORAGE_KEYS.AUTH_TOKEN);
+      const refreshToken = localStorage.getItem(STORAGE_KEYS.REFRESH_TOKEN);
+      if (refreshToken || token) {
+        // Con el refresh token: el access pudo vencer si la sesión quedó inactiva.
+        // axios "pelado" con header explícito: sin el interceptor de 401 (que renovaría
+        // o redirigiría) y porque localStorage se limpia antes de que responda
+        axios.post(
+          `${api.defaults.baseURL}/administracion/logout`,
+          refreshToken && token ? { access_token: token } : null,
+          { headers: { Authorization: `Bearer ${refreshToken || token}` } }
+        ).catch(() => undefined);
+      }
+      localStorage.removeItem(STORAGE_KEYS.AUTH_TOKEN);
+      localStorage.removeItem(STORAGE_KEYS.REFRESH_TOKEN);
+      localStorage.removeItem(STORAGE_KEYS.USER);
     }
   },
+
+  /**
+   * Cerrar todas las sesiones del usuario (revoca todos sus tokens)
+   */
+  logoutAll: async (): Promise<void> => {
+    await api.post('/administracion/logout-all');
+  },
 };
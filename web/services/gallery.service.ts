@@ -9,6 +9,7 @@ import type {
   CreateGalleryItemDto,
   UpdateGalleryItemDto,
   GalleryFilters,
+  GalleryFacetsResponse,
   ApiResponse,
 } from '@/types';
 
@@ -23,6 +24,15 @@ export const galleryService = {
     return response.data;
   },
 
+  /**
+   * Obtener categorías de galería con cantidad de items y portada
+   * (evita descargar todos los items para agrupar en el cliente)
+   */
+  getFacets: async (): Promise<GalleryFacetsResponse> => {
+    const response = await api.get<GalleryFacetsResponse>('/galeria/facets');
+    return response.data;
+  },
+
   /**
    * Obtener item de galería por ID
    */
@@ -7,6 +7,8 @@ import api from './api';
 import type {
   ContactMessage,
   CreateContactMessageDto,
+  MessageSearchFilters,
+  PaginatedResponse,
   ApiResponse,
 } from '@/types';
 
@@ -27,6 +29,26 @@ export const messagesService = {
     return response.data;
   },
 
+  /**
+   * Buscar mensajes por nombre, email, asunto o contenido (requiere JWT admin, paginado)
+   */
+  search: async (filters: MessageSearchFilters): Promise<PaginatedResponse<ContactMessage>> => {
+    const response = await api.get<any>('/mensajes_contacto/search', {
+      params: filters,
+    });
+
+    // El backend retorna { items, total, page, per_page }
+    return {
+      data: response.data.items || [],
+      pagination: {
+        page: response.data.page || 1,
+        per_page: response.data.per_page || 20,
+        total: response.data.total || 0,
+        total_pages: Math.ceil((response.data.total || 0) / (response.data.per_page || 20)),
+      },
+    };
+  },
+
   /**
    * Obtener mensaje por ID (requiere JWT admin)
    */
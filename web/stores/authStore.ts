@@ -55,6 +55,7 @@ export const useAuthStore = create<AuthState>()(
         // Limpiar localStorage
         if (typeof window !== 'undefined') {
           localStorage.removeItem(STORAGE_KEYS.AUTH_TOKEN);
+          localStorage.removeItem(STORAGE_KEYS.REFRESH_TOKEN);
           localStorage.removeItem(STORAGE_KEYS.USER);
         }
       },
@@ -9,6 +9,8 @@ export interface GalleryItem {
   url: string;
   caption: string | null;
   category: string | null;
+  /** URL servida por el proxy con caché de la API (solo imágenes externas, si está activo); admite &w=320|640|960|1280 */
+  proxy_url?: string | null;
   created_at: string;
 }
 
@@ -29,3 +31,14 @@ export interface UpdateGalleryItemDto {
 export interface GalleryFilters {
   category?: string;
 }
+
+export interface GalleryFacet {
+  category: string | null;
+  count: number;
+  cover: Pick<GalleryItem, 'id' | 'title' | 'url'>;
+}
+
+export interface GalleryFacetsResponse {
+  facets: GalleryFacet[];
+  total: number;
+}
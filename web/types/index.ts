@@ -8,6 +8,7 @@ export type {
   User,
   LoginCredentials,
   LoginResponse,
+  RefreshResponse,
   CreateUserDto,
   UpdateUserDto,
 } from './user.types';
@@ -33,12 +34,15 @@ export type {
   CreateGalleryItemDto,
   UpdateGalleryItemDto,
   GalleryFilters,
+  GalleryFacet,
+  GalleryFacetsResponse,
 } from './gallery.types';
 
 // Message types
 export type {
   ContactMessage,
   CreateContactMessageDto,
+  MessageSearchFilters,
 } from './message.types';
 
 // API types
@@ -10,9 +10,21 @@ export interface ContactMessage {
   phone: string | null;
   subject: string;
   message: string;
+  leido?: boolean;
+  duplicate_count?: number;
+  spam_cluster_id?: number | null;
   created_at: string;
 }
 
+export interface MessageSearchFilters {
+  q: string;
+  leido?: boolean;
+  date_from?: string;
+  date_to?: string;
+  page?: number;
+  per_page?: number;
+}
+
 export interface CreateContactMessageDto {
   name: string;
   email: string;
@@ -19,9 +19,17 @@ export interface LoginCredentials {
 
 export interface LoginResponse {
   access_token: string;
+  refresh_token: string;
+  expires_in: number | null;
   user: User;
 }
 
+export interface RefreshResponse {
+  access_token: string;
+  refresh_token: string;
+  expires_in: number | null;
+}
+
 export interface CreateUserDto {
   email: string;
   password: string;